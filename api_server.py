@@ -0,0 +1,394 @@
+"""
+Local HTTP JSON API for score submission (rink tablets, scripts, scoreboards).
+
+    python -m api_server                       # http://127.0.0.1:8765, events in data/
+    python -m api_server --data-dir data --port 8765 --batch-ms 25
+
+An event id maps to `<data-dir>/<id>.json`, so `event` is the app's own
+`data/event.json`. Only existing files are served.
+
+    GET  /health
+    GET  /metrics                                  storage/API counters (JSON)
+    GET  /events/{id}                              name, sections, rounds, version
+    GET  /events/{id}/standings[?section=...]      cached per file version (ETag)
+    POST /events/{id}/scores                       one or many results
+
+A result names its rink by `key` ("SEKSIE 1:2:3", or "SEKSIE 1:2:3:2" for the
+second sitting) or by section/round/rink with an optional `sitting` (default 1).
+`b` is mirrored from `a` when left out, like mirror mode in the app; `ends`
+([{"a": 2, "b": 0}, ...]) stores per-end data and derives the totals:
+
+    {"key": "SEKSIE 1:2:3", "a": {"vir": 14, "teen": 9}}
+    {"scores": [{"section": "SEKSIE 1", "round": 2, "rink": 3, "ends": [...]}, ...]}
+
+Writes are coalesced: one writer thread per event drains everything posted
+within --batch-ms, reloads the file if the app changed it, applies every
+result, appends one audit entry and saves once. A request returns after its
+batch is on disk, with per-result accept/reject details.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from engine import parse_slot_key, slot_key
+from storage import Store
+from storage_metrics import COUNT_BUCKETS, METRICS
+
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_MS = 25
+MAX_BODY = 1 << 20
+SUBMIT_TIMEOUT = 30.0
+
+_EVENT_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_ROUTE = re.compile(r"^/events/([^/]+)(/standings|/scores)?/?$")
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# ---------------- request parsing (no state needed) ----------------
+
+def _int(v: Any, what: str) -> int:
+    if isinstance(v, bool):
+        raise BadRequest(f"{what} must be an integer")
+    try:
+        n = int(v)
+    except (TypeError, ValueError):
+        raise BadRequest(f"{what} must be an integer")
+    if n < 0:
+        raise BadRequest(f"{what} must be >= 0")
+    return n
+
+
+def _side(v: Any, what: str) -> Dict[str, int]:
+    if not isinstance(v, dict):
+        raise BadRequest(f"{what} must be an object with vir/teen")
+    return {"vir": _int(v.get("vir"), f"{what}.vir"), "teen": _int(v.get("teen"), f"{what}.teen")}
+
+
+def parse_result(item: Any) -> Dict[str, Any]:
+    """Validate one result's shape -> {key, section, round, rink, sitting, score, ends}."""
+    if not isinstance(item, dict):
+        raise BadRequest("each result must be an object")
+    if "key" in item:
+        parsed = parse_slot_key(str(item["key"]))
+        if not parsed:
+            raise BadRequest(f"bad key {item['key']!r}; expected section:round:rink[:sitting]")
+        section, rnd, rink, sitting = parsed
+    else:
+        section, rnd, rink = item.get("section"), item.get("round"), item.get("rink")
+        sitting = item.get("sitting", 1)
+        if not section:
+            raise BadRequest("result needs key or section/round/rink")
+    rnd, rink, sitting = _int(rnd, "round"), _int(rink, "rink"), max(1, _int(sitting, "sitting"))
+    section = str(section)
+
+    ends = None
+    if item.get("ends") is not None:
+        if not isinstance(item["ends"], list) or not item["ends"]:
+            raise BadRequest("ends must be a non-empty list")
+        ends = [{"a": _int(e.get("a") if isinstance(e, dict) else None, "ends[].a"),
+                 "b": _int(e.get("b") if isinstance(e, dict) else None, "ends[].b")} for e in item["ends"]]
+        ta, tb = sum(e["a"] for e in ends), sum(e["b"] for e in ends)
+        score = {"a": {"vir": ta, "teen": tb}, "b": {"vir": tb, "teen": ta}}
+    else:
+        a = _side(item.get("a"), "a")
+        b = _side(item["b"], "b") if item.get("b") is not None else {"vir": a["teen"], "teen": a["vir"]}
+        score = {"a": a, "b": b}
+    return {"key": slot_key(f"{section}:{rnd}", rink, sitting), "section": section, "round": rnd,
+            "rink": rink, "sitting": sitting, "score": score, "ends": ends}
+
+
+def parse_scores_body(body: Any) -> List[Dict[str, Any]]:
+    if isinstance(body, dict) and "scores" in body:
+        items = body["scores"]
+        if isinstance(items, dict):  # {"SEKSIE 1:2:3": {"a": ...}, ...}
+            items = [dict(v, key=k) if isinstance(v, dict) else v for k, v in items.items()]
+    elif isinstance(body, list):
+        items = body
+    else:
+        items = [body]
+    if not isinstance(items, list) or not items:
+        raise BadRequest("no results in body")
+    return [parse_result(i) for i in items]
+
+
+# ---------------- batched writer ----------------
+
+def _check(state: Dict[str, Any], r: Dict[str, Any]) -> Optional[str]:
+    """Reason a result can't be applied to the current state, or None."""
+    if r["section"] in (state.get("brackets") or {}):
+        pass  # knockout games (bracket.py): any round that has the pairing
+    elif r["section"] not in state.get("sections", []):
+        return "unknown section"
+    elif not 1 <= r["round"] <= int(state.get("rounds", 6)):
+        return "round out of range"
+    if state.get("locks", {}).get(f"{r['section']}:{r['round']}", False):
+        return "round is locked"
+    pairs = state.get("pairings", {}).get(f"{r['section']}:{r['round']}", [])
+    if not any(int(p.get("rink", 0)) == r["rink"] and int(p.get("sitting") or 1) == r["sitting"] for p in pairs):
+        return "no pairing on this rink" if r["sitting"] == 1 else "no pairing on this rink and sitting"
+    return None
+
+
+class EventWriter:
+    """Owns one event file; coalesces score submissions into single saves."""
+
+    def __init__(self, path: str, batch_sec: float):
+        self.path = path
+        self.batch_sec = batch_sec
+        self.store = Store(path)
+        self.q: "queue.Queue[Tuple[List[Dict[str, Any]], Future]]" = queue.Queue()
+        threading.Thread(target=self._run, name=f"writer:{path}", daemon=True).start()
+
+    def submit(self, results: List[Dict[str, Any]]) -> Future:
+        fut: Future = Future()
+        self.q.put((results, fut))
+        return fut
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.q.get()]
+            deadline = time.monotonic() + self.batch_sec
+            while True:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                try:
+                    batch.append(self.q.get(timeout=left))
+                except queue.Empty:
+                    break
+            # anything that queued up while we were saving joins this batch too
+            while True:
+                try:
+                    batch.append(self.q.get_nowait())
+                except queue.Empty:
+                    break
+            self._apply(batch)
+
+    def _apply(self, batch: List[Tuple[List[Dict[str, Any]], Future]]) -> None:
+        try:
+            with METRICS.timed("api.apply"):
+                store = self.store
+                if store.has_changed():
+                    store.load()  # keep edits made in the app since our last save
+                state = store.state
+                outcomes, accepted = [], []
+                for results, _ in batch:
+                    ok, rejected = [], []
+                    for r in results:
+                        why = _check(state, r)
+                        if why:
+                            rejected.append({"key": r["key"], "error": why})
+                            continue
+                        state.setdefault("scores", {})[r["key"]] = r["score"]
+                        if r["ends"] is not None:
+                            state.setdefault("scores_per_end", {})[r["key"]] = {"n": len(r["ends"]), "ends": r["ends"]}
+                        ok.append(r["key"])
+                    accepted.extend(ok)
+                    outcomes.append((ok, rejected))
+                if accepted:
+                    state.setdefault("audit", []).append({
+                        "ts": time.time(), "action": "api_scores",
+                        "payload": {"keys": accepted, "requests": len(batch)},
+                    })
+                    store.save()
+                METRICS.observe("api.batch_requests", len(batch), COUNT_BUCKETS)
+                METRICS.incr("api.results_accepted", len(accepted))
+            for (ok, rejected), (_, fut) in zip(outcomes, batch):
+                fut.set_result({"accepted": ok, "rejected": rejected, "batch_requests": len(batch),
+                                "version": store.updated_at})
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+
+
+# ---------------- service ----------------
+
+class ScoreService:
+    """Event lookup, writers and the standings cache shared by all request threads."""
+
+    def __init__(self, data_dir: str, batch_ms: int = DEFAULT_BATCH_MS, cache_size: int = 16):
+        self.data_dir = data_dir
+        self.batch_sec = max(0, batch_ms) / 1000.0
+        self.cache_size = cache_size
+        self._writers: Dict[str, EventWriter] = {}
+        self._cache: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path_for(self, event_id: str) -> Optional[str]:
+        if not _EVENT_ID.match(event_id):
+            return None
+        path = os.path.join(self.data_dir, f"{event_id}.json")
+        return path if os.path.isfile(path) else None
+
+    def writer(self, event_id: str, path: str) -> EventWriter:
+        with self._lock:
+            w = self._writers.get(event_id)
+            if w is None:
+                w = self._writers[event_id] = EventWriter(path, self.batch_sec)
+            return w
+
+    @staticmethod
+    def version(path: str) -> str:
+        try:
+            return str(os.stat(path).st_mtime_ns)
+        except OSError:
+            return ""
+
+    def standings(self, event_id: str, path: str, section: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+        """(version, standings) computed at most once per file version and section filter."""
+        from rolbal import cmd_standings
+
+        version = self.version(path)
+        key = (event_id, version, section or "")
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+        if hit is not None:
+            METRICS.incr("api.standings.cache_hit")
+            return version, hit
+        METRICS.incr("api.standings.cache_miss")
+        with METRICS.timed("api.standings.compute"):
+            tables = cmd_standings(path, {"section": section})["standings"]
+        with self._lock:
+            self._cache[key] = tables
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return version, tables
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "rolbal-api/1"
+    protocol_version = "HTTP/1.1"  # keep-alive for scoreboards that poll
+    service: ScoreService  # set by make_server
+
+    def log_message(self, fmt, *args):  # quiet by default; --verbose restores it
+        if getattr(self.server, "verbose", False):
+            super().log_message(fmt, *args)
+
+    def _send(self, status: int, body: Any = None, headers: Optional[Dict[str, str]] = None) -> None:
+        data = b"" if body is None else json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+    def _event(self, event_id: str) -> Optional[str]:
+        path = self.service.path_for(event_id)
+        if path is None:
+            self._send(404, {"error": f"unknown event {event_id!r}"})
+        return path
+
+    def do_GET(self):
+        METRICS.incr("api.requests")
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self._send(200, {"ok": True})
+        if url.path == "/metrics":
+            return self._send(200, METRICS.snapshot())
+        m = _ROUTE.match(url.path)
+        if not m or m.group(2) == "/scores":
+            return self._send(404, {"error": "not found"})
+        path = self._event(m.group(1))
+        if path is None:
+            return
+        if m.group(2) is None:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            return self._send(200, {
+                "id": m.group(1), "event_name": state.get("event_name"), "sections": state.get("sections", []),
+                "rounds": state.get("rounds"), "rinks": state.get("rinks"), "version": self.service.version(path),
+            })
+        section = (parse_qs(url.query).get("section") or [None])[0]
+        version, tables = self.service.standings(m.group(1), path, section)
+        etag = f'"{version}:{section or ""}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, headers={"ETag": etag})
+        self._send(200, {"version": version, "standings": tables}, {"ETag": etag, "Cache-Control": "no-cache"})
+
+    def do_POST(self):
+        METRICS.incr("api.requests")
+        m = _ROUTE.match(urlparse(self.path).path)
+        if not m or m.group(2) != "/scores":
+            return self._send(404, {"error": "not found"})
+        path = self._event(m.group(1))
+        if path is None:
+            return
+        try:
+            n = int(self.headers.get("Content-Length") or 0)
+            if n <= 0 or n > MAX_BODY:
+                raise BadRequest("missing or oversized body")
+            try:
+                body = json.loads(self.rfile.read(n))
+            except ValueError:
+                raise BadRequest("body is not valid JSON")
+            results = parse_scores_body(body)
+        except BadRequest as e:
+            return self._send(400, {"error": str(e)})
+
+        with METRICS.timed("api.post_scores"):
+            try:
+                out = self.service.writer(m.group(1), path).submit(results).result(timeout=SUBMIT_TIMEOUT)
+            except Exception as e:
+                return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+        self._send(200 if not out["rejected"] else 422, dict(out, ok=not out["rejected"]))
+
+
+def make_server(host: str, port: int, data_dir: str, batch_ms: int = DEFAULT_BATCH_MS,
+                verbose: bool = False) -> ThreadingHTTPServer:
+    """Build (but don't start) the server; `server.service` exposes the ScoreService."""
+    service = ScoreService(data_dir, batch_ms)
+    handler = type("Handler", (ApiHandler,), {"service": service})
+    # the stdlib backlog of 5 makes bursts of tablets retry their connect after 1s
+    server_cls = type("Server", (ThreadingHTTPServer,), {"request_queue_size": 128})
+    srv = server_cls((host, port), handler)
+    srv.daemon_threads = True
+    srv.service = service
+    srv.verbose = verbose
+    return srv
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    default_dir = os.path.dirname(os.getenv("ROLBAL_DATA_PATH", "data/event.json")) or "."
+    ap = argparse.ArgumentParser(prog="api_server", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--data-dir", default=default_dir, help="directory holding <event_id>.json files")
+    ap.add_argument("--batch-ms", type=int, default=DEFAULT_BATCH_MS, help="coalescing window for score writes")
+    ap.add_argument("--verbose", action="store_true", help="log every request")
+    args = ap.parse_args(argv)
+
+    srv = make_server(args.host, args.port, args.data_dir, args.batch_ms, args.verbose)
+    print(f"rolbal API on http://{args.host}:{args.port}  (events in {os.path.abspath(args.data_dir)})")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,24 +4,47 @@ import streamlit.components.v1 as components
 from storage import Store
 from storage_supabase import SupabaseStore
 from engine import (
-    PlayerStanding, compute_standings, round_result,
-    round_robin_pairs, build_history,
-    strong_vs_strong_pairs, assign_rinks_with_preferences, last_rink_map, sort_standings
+    PlayerStanding, compute_standings, compute_all_standings, round_result, sort_standings,
+    generate_round, generate_all_sections, PARALLEL_MIN_PLAYERS, standings_history, validate_event, ISSUE_KINDS,
 )
+from event_model import Event
+from bracket import bracket_rounds, create_knockout, delete_bracket, qualifiers
+from session_keys import begin_run, drop_view, prune, view_keys
+from leaderboard_view import standings_rows
+from player_index import clear_player, player_games
 from config import EVENT_NAME, DEFAULT_RINKS, DEFAULT_ROUNDS, DEFAULT_SECTIONS
 import os
 import auth_supabase as auth
-import csv, io, datetime as dt, random, re
+import datetime as dt, re
 import json, hashlib, time
-import pandas as pd
-try:
-    import openpyxl  # needed by pandas for .xlsx/.xlsm
-except ImportError:
-    st.error("Missing dependency: openpyxl. Install with:  pip install openpyxl")
-    st.stop()
+from bisect import bisect_left, insort
+from profiler import RerunProfiler
+from storage_metrics import METRICS, rerun_started
+# pandas/openpyxl/xlsxwriter are imported by excel_io only when Import/Export is used
 
 st.set_page_config(page_title="Rolbal Unified", layout="wide")
 
+
+def _query_params() -> dict:
+    try:
+        return dict(st.query_params)  # 1.36+
+    except Exception:
+        try:
+            return st.experimental_get_query_params()
+        except Exception:
+            return {}
+
+
+rerun_started()  # storage I/O metrics: close out the previous run's save count
+begin_run(st.session_state)  # per-view widget keys (session_keys): views rendered from here on are kept
+_qp_early = _query_params()
+want_debug = str(_qp_early.get("debug", "0")).lower() in ("1","true","yes")
+
+# Hot-path timings in the sidebar (?debug=1); no-op otherwise
+prof = RerunProfiler(enabled=want_debug)
+compute_standings = prof.wrap("compute_standings", compute_standings)
+compute_all_standings = prof.wrap("compute_all_standings", compute_all_standings)
+
 # Capture Supabase recovery hash (#access_token=...&type=recovery) into query string
 components.html(
     """
@@ -43,6 +66,17 @@ components.html(
     """,
     height=0,
 )
+def _slot_tag(rink, sitting=1) -> str:
+    """Widget-key suffix for a game slot: "3", or "3_2" for rink 3 in the second sitting."""
+    sitting = int(sitting or 1)
+    return f"{rink}" if sitting <= 1 else f"{rink}_{sitting}"
+
+
+def _slot_label(rink, sitting=1) -> str:
+    sitting = int(sitting or 1)
+    return f"{rink}" if sitting <= 1 else f"{rink}·{sitting}"
+
+
 def render_rink_score(section: str, round_no: int, rink: int, pr: dict, store, mirror_on: bool):
     """Compact row renderer for a single rink."""
     a_id = pr.get("a_id"); b_id = pr.get("b_id")
@@ -50,13 +84,13 @@ def render_rink_score(section: str, round_no: int, rink: int, pr: dict, store, m
     b = store.state["players"].get(str(b_id), {}) if b_id else {}
     a_name = a.get("name",""); b_name = b.get("name","")
 
-    sk = store.key_score(section, int(round_no), int(rink))
+    sitting = int(pr.get("sitting") or 1)
+    sk = store.key_score(section, int(round_no), int(rink), sitting)
     sc = store.state["scores"].get(sk, {"a": {"vir": 0, "teen": 0}, "b": {"vir": 0, "teen": 0}})
-    # Keys are already namespaced by section/round/rink (safe to re-use)
-    key_va = f"score_va_{section}_{round_no}_{rink}"
-    key_ta = f"score_ta_{section}_{round_no}_{rink}"
-    key_vb = f"score_vb_{section}_{round_no}_{rink}"
-    key_tb = f"score_tb_{section}_{round_no}_{rink}"
+    # Keys are namespaced by section/round view, then rink (safe to re-use)
+    tag = _slot_tag(rink, sitting)
+    keys = view_keys(st.session_state, "score", section, round_no)
+    key_va, key_ta, key_vb, key_tb = (keys(f"{f}_{tag}") for f in ("va", "ta", "vb", "tb"))
 
     # Inputs (A always editable)
     va = st.number_input("", min_value=0, value=int(sc["a"]["vir"]), step=1, key=key_va, label_visibility="collapsed")
@@ -77,7 +111,7 @@ def render_rink_score(section: str, round_no: int, rink: int, pr: dict, store, m
     st.markdown(
         f"""
         <div class="score-row">
-          <div><span class="rink-chip" style="color:{sec_color};border-color:{sec_color}44">{rink}</span></div>
+          <div><span class="rink-chip" style="color:{sec_color};border-color:{sec_color}44">{_slot_label(rink, sitting)}</span></div>
           <div class="name">A&nbsp;#{a_id or '—'} {a_name or ''}</div>
           <div class="name">B&nbsp;#{b_id or '—'} {b_name or ''}</div>
           <div>{st.session_state[key_va]}</div>
@@ -95,14 +129,14 @@ def render_rink_score(section: str, round_no: int, rink: int, pr: dict, store, m
     # Put the actual editable widgets after the row so layout remains tight
     col_va, col_ta, col_vb, col_tb, col_btn = st.columns([0.001,0.001,0.001,0.001,0.001])
     with col_btn:
-        if st.button(f"Save", key=f"save_rink_{section}_{round_no}_{rink}"):
+        if st.button(f"Save", key=f"save_rink_{section}_{round_no}_{tag}"):
             store.state["scores"][sk] = {
                 "a": {"vir": int(st.session_state[key_va]), "teen": int(st.session_state[key_ta])},
                 "b": {"vir": int(vb if mirror_on else st.session_state.get(key_vb, 0)),
                       "teen": int(tb if mirror_on else st.session_state.get(key_tb, 0))},
             }
             store.save()
-            st.success(f"Saved Rink {rink}")
+            st.success(f"Saved Rink {_slot_label(rink, sitting)}")
 
 
 def render_rink_score_compact(section: str, round_no: int, rink: int, pr: dict, store, mirror_on: bool):
@@ -116,20 +150,20 @@ def render_rink_score_compact(section: str, round_no: int, rink: int, pr: dict,
     b = store.state["players"].get(str(b_id), {}) if b_id else {}
     a_name = a.get("name", ""); b_name = b.get("name", "")
 
-    sk = store.key_score(section, int(round_no), int(rink))
+    sitting = int(pr.get("sitting") or 1)
+    sk = store.key_score(section, int(round_no), int(rink), sitting)
     sc = store.state.get("scores", {}).get(sk, {"a": {"vir": 0, "teen": 0}, "b": {"vir": 0, "teen": 0}})
 
-    key_va = f"score_va_{section}_{round_no}_{rink}"
-    key_ta = f"score_ta_{section}_{round_no}_{rink}"
-    key_vb = f"score_vb_{section}_{round_no}_{rink}"
-    key_tb = f"score_tb_{section}_{round_no}_{rink}"
+    tag = _slot_tag(rink, sitting)
+    keys = view_keys(st.session_state, "score", section, round_no)
+    key_va, key_ta, key_vb, key_tb = (keys(f"{f}_{tag}") for f in ("va", "ta", "vb", "tb"))
 
     sec_color = SECTION_COLORS.get(section, "#a78bfa")
     # Rink | Teams | A | A | B | B | Save (headers below clarify Vir/Teen)
     c_rk, c_team, c_av, c_at, c_bv, c_bt, c_btn = st.columns([0.7, 2.8, 0.8, 0.8, 0.8, 0.8, 0.8])
 
     with c_rk:
-        st.markdown(f'<span class="rink-chip" style="color:{sec_color};border-color:{sec_color}44">{rink}</span>', unsafe_allow_html=True)
+        st.markdown(f'<span class="rink-chip" style="color:{sec_color};border-color:{sec_color}44">{_slot_label(rink, sitting)}</span>', unsafe_allow_html=True)
     with c_team:
         a_txt = f"#{a_id or '—'} {a_name or ''}".strip()
         b_txt = f"#{b_id or '—'} {b_name or ''}".strip()
@@ -204,13 +238,13 @@ def render_rink_score_compact(section: str, round_no: int, rink: int, pr: dict,
             )
 
     with c_btn:
-        if st.button(f"Save", key=f"save_rink_{section}_{round_no}_{rink}"):
+        if st.button(f"Save", key=f"save_rink_{section}_{round_no}_{tag}"):
             store.state.setdefault("scores", {})[sk] = {
                 "a": {"vir": int(va), "teen": int(ta)},
                 "b": {"vir": int(vb), "teen": int(tb)},
             }
             store.save()
-            st.success(f"Saved Rink {rink}")
+            st.success(f"Saved Rink {_slot_label(rink, sitting)}")
 
 
 def _section_player_options(store, section):
@@ -218,9 +252,30 @@ def _section_player_options(store, section):
     Returns a list like [(None, "—"), (1, "1 — Alice"), (2, "2 — Bob"), ...]
     filtered to the selected section.
     """
-    rows = [(int(k), v["name"]) for k, v in store.state["players"].items() if v["section"] == section]
-    rows.sort(key=lambda x: x[0])
-    return [(None, "—")] + [(pid, f"{pid} — {name}") for pid, name in rows]
+    return [(None, "—")] + _player_options_by_section(store.state["players"]).get(section, [])
+
+
+def _player_options_by_section(players: dict) -> dict:
+    """One pass over all players -> {section: [(pid, "pid — name"), ...]} sorted by pid."""
+    by_sec = {}
+    for k, v in players.items():
+        by_sec.setdefault(v["section"], []).append((int(k), v["name"]))
+    return {sec: [(pid, f"{pid} — {name}") for pid, name in sorted(rows)] for sec, rows in by_sec.items()}
+
+
+def _options_without(base, used_pos, keep_pos):
+    """`base` minus the (sorted) positions in `used_pos`, keeping `keep_pos`.
+
+    Built from list slices, so the Python-level work is O(len(used_pos)).
+    """
+    out, start = [], 0
+    for p in used_pos:
+        if p == keep_pos:
+            continue
+        out.extend(base[start:p])
+        start = p + 1
+    out.extend(base[start:])
+    return out
 
 
 ENTER_SCORES_CSS = """
@@ -245,7 +300,6 @@ ENTER_SCORES_CSS = """
 </style>
 """
 
-st.markdown(ENTER_SCORES_CSS, unsafe_allow_html=True)
 ENTER_SCORES_CSS_COMPACT = """
 <style>
 /* Slimmer controls specifically for Scores tab (overrides) */
@@ -285,7 +339,6 @@ ENTER_SCORES_CSS_COMPACT = """
 .readout.teen { background: var(--teen-bg); color: var(--teen-fg); }
 </style>
 """
-st.markdown(ENTER_SCORES_CSS_COMPACT, unsafe_allow_html=True)
 SELECTS_SIMPLE_CSS = """
 <style>
 /* Make selectboxes act like simple dropdowns (no typing) */
@@ -294,14 +347,35 @@ SELECTS_SIMPLE_CSS = """
 .stSelectbox [data-baseweb="select"] > div { box-shadow: none !important; }
 </style>
 """
-st.markdown(SELECTS_SIMPLE_CSS, unsafe_allow_html=True)
+# st.fragment is GA from 1.37; 1.36 only ships the experimental name
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment")
+
+
+def _poll_for_changes(store_obj, every_sec: int):
+    """Poll the store's cheap version marker and rerun only when it moved.
+
+    Replaces the old full-page reload: the websocket stays up and nothing
+    else reruns while the event is unchanged.
+    """
+    @_fragment(run_every=every_sec)
+    def _poller():
+        if st.session_state.get("pairings_dirty_any"):
+            st.caption("Auto-refresh paused: unsaved pairings")
+            return
+        if store_obj.has_changed():
+            prof.rerun()
+        st.caption(f"Auto-refresh on · checks every {every_sec}s")
+
+    _poller()
+
+
 # ---- Authentication (Supabase) & per-user data path ----
-SUPABASE_CONFIGURED = auth.get_client() is not None
+SUPABASE_CONFIGURED = auth.is_configured()  # cached per process
 REQUIRE_AUTH = True
 try:
     # Allow override via secrets or env for local development
     REQUIRE_AUTH = bool(int(os.getenv("REQUIRE_AUTH", "1")))
-    if "auth" in st.secrets:
+    if auth.has_secrets() and "auth" in st.secrets:
         require_val = st.secrets["auth"].get("require")
         if require_val is not None:
             REQUIRE_AUTH = bool(require_val)
@@ -318,7 +392,7 @@ def _render_auth_gate():
         # If auth is required but client is missing, block access with guidance
         if REQUIRE_AUTH:
             st.error("Authentication required but Supabase is not configured. Add secrets or env keys.")
-            st.stop()
+            prof.stop()
         # Otherwise allow guest mode
         return
 
@@ -352,10 +426,10 @@ def _render_auth_gate():
                     except Exception:
                         pass
                     st.success("Password updated. Signed in.")
-                    st.rerun()
+                    prof.rerun()
                 except Exception as e:
                     st.error(f"Could not update password: {e}")
-        st.stop()
+        prof.stop()
 
     st.markdown("## Sign in to continue")
     tabs = st.tabs(["Sign In", "Sign Up"])
@@ -370,7 +444,7 @@ def _render_auth_gate():
                 sess = auth.sign_in(email.strip(), password)
                 st.session_state["auth_user"] = {"id": sess.user.get("id"), "email": sess.user.get("email")}
                 st.success("Signed in")
-                st.rerun()
+                prof.rerun()
             except Exception as e:
                 st.error(f"Login failed: {e}")
         # Forgot password
@@ -397,10 +471,21 @@ def _render_auth_gate():
                 st.error(f"Sign up failed: {e}")
 
     # Always stop until user signs in
-    st.stop()
+    prof.stop()
+
 
+# Read-only projector/leaderboard mode: no auth gate, no editing UI
+if str(_qp_early.get("view", "")).lower() == "leaderboard":
+    from leaderboard_view import render_projector
+    try:
+        _every = int(_qp_early.get("every", 10))
+    except (TypeError, ValueError):
+        _every = 10
+    render_projector(_qp_early.get("event"), _qp_early.get("section"), _every)
+    prof.stop()
 
-_render_auth_gate()
+with prof.span("auth gate"):
+    _render_auth_gate()
 
 # Compute data path / event selection when auth is enabled
 _user = st.session_state.get("auth_user") if SUPABASE_CONFIGURED else None
@@ -409,7 +494,8 @@ if SUPABASE_CONFIGURED and _user and _user.get("id"):
     # Multi-event selection UI (before opening the store)
     with st.sidebar:
         st.markdown("### Event")
-        events = SupabaseStore.list_events_for(_user["id"]) or []
+        with prof.span("list_events_for"):
+            events = SupabaseStore.list_events_for(_user["id"]) or []
         # Resolve current selection
         if "current_event_id" not in st.session_state:
             st.session_state["current_event_id"] = (events[0]["event_id"] if events else None)
@@ -443,7 +529,7 @@ if SUPABASE_CONFIGURED and _user and _user.get("id"):
         _event_id = label_to_id.get(sel_label)
         if _event_id != current_id:
             st.session_state["current_event_id"] = _event_id
-            st.rerun()
+            prof.rerun()
 
         # Actions as toggled forms to avoid sticky inputs
         c1, c2, c3, c4 = st.columns(4)
@@ -465,14 +551,14 @@ if SUPABASE_CONFIGURED and _user and _user.get("id"):
                 cancel = cc2.form_submit_button("Cancel")
             if cancel:
                 st.session_state["ev_show_create"] = False
-                st.rerun()
+                prof.rerun()
             if create_ok and nm.strip():
                 try:
                     new_id = SupabaseStore.create_event(_user["id"], nm.strip())
                     st.session_state["ev_show_create"] = False
                     st.session_state["current_event_id"] = new_id
                     st.success("Event created")
-                    st.rerun()
+                    prof.rerun()
                 except Exception as e:
                     st.error(f"Could not create: {e}")
 
@@ -485,13 +571,13 @@ if SUPABASE_CONFIGURED and _user and _user.get("id"):
                 cancel = rc2.form_submit_button("Cancel")
             if cancel:
                 st.session_state["ev_show_rename"] = False
-                st.rerun()
+                prof.rerun()
             if apply and nm.strip():
                 try:
                     SupabaseStore.rename_event(_user["id"], _event_id, nm.strip())
                     st.session_state["ev_show_rename"] = False
                     st.success("Renamed")
-                    st.rerun()
+                    prof.rerun()
                 except Exception as e:
                     st.error(f"Could not rename: {e}")
 
@@ -504,7 +590,7 @@ if SUPABASE_CONFIGURED and _user and _user.get("id"):
                 cancel = dc2.form_submit_button("Cancel")
             if cancel:
                 st.session_state["ev_show_dup"] = False
-                st.rerun()
+                prof.rerun()
             if do_dup and nm.strip():
                 try:
                     src = _event_id
@@ -512,7 +598,7 @@ if SUPABASE_CONFIGURED and _user and _user.get("id"):
                     st.session_state["ev_show_dup"] = False
                     st.session_state["current_event_id"] = new_id
                     st.success("Duplicated")
-                    st.rerun()
+                    prof.rerun()
                 except Exception as e:
                     st.error(f"Could not duplicate: {e}")
 
@@ -528,36 +614,41 @@ if SUPABASE_CONFIGURED and _user and _user.get("id"):
                     st.session_state["ev_show_del"] = False
                     st.session_state["current_event_id"] = None
                     st.success("Deleted")
-                    st.rerun()
+                    prof.rerun()
                 except Exception as e:
                     st.error(f"Could not delete: {e}")
             elif del_ok:
                 st.error("Confirmation text mismatch.")
 
         st.markdown("---")
-        auto = st.checkbox("Auto-refresh every 5s", value=False, key="sb_auto")
-        if auto:
-            components.html("""
-                <script>
-                setTimeout(function(){ try { window.location.reload(); } catch(e){} }, 5000);
-                </script>
-            """, height=0)
+        auto = st.checkbox("Auto-refresh when the event changes", value=False, key="sb_auto")
+        auto_every = st.number_input("Check every (seconds)", 2, 120, 5, 1, key="sb_auto_int", disabled=not auto)
 
     # Initialize cloud store for the selected event
-    store = SupabaseStore(_user["id"], _event_id)
+    with prof.span("store init + load"):
+        store = SupabaseStore(_user["id"], _event_id)
+
+    _outbox = store.outbox()
+    if _outbox["offline"] or _outbox["pending"]:
+        with st.sidebar:
+            if _outbox["pending"]:
+                st.warning(f"Offline · {_outbox['pending']} save(s) kept on this device; "
+                           "they sync when the connection returns.")
+            else:
+                st.info("Offline · showing the copy saved on this device.")
+            if st.button("Retry sync now", key="sb_outbox_retry") and store.flush():
+                prof.rerun()
+
+    if auto:
+        with st.sidebar:
+            _poll_for_changes(store, int(auto_every))
 else:
-    DATA_PATH = "data/event.json"
-    store = Store(DATA_PATH)
+    DATA_PATH = os.getenv("ROLBAL_DATA_PATH", "data/event.json")
+    with prof.span("store init + load"):
+        store = Store(DATA_PATH)
+store.save = prof.wrap("store.save", store.save)
 
 # Optional auth diagnostics (only when debug=1 in URL)
-try:
-    qp = dict(st.query_params)  # 1.36+
-except Exception:
-    try:
-        qp = st.experimental_get_query_params()
-    except Exception:
-        qp = {}
-want_debug = str(qp.get("debug", "0")).lower() in ("1","true","yes")
 if want_debug:
     diag = auth.diagnose_config()
     with st.sidebar:
@@ -580,7 +671,25 @@ def _autosave(store_obj, throttle_sec: int = 8):
         # autosave is best-effort; never crash UI
         pass
 
-_autosave(store)
+with prof.span("_autosave hash"):
+    _autosave(store)
+
+
+def _event() -> Event:
+    """The store's state as an Event (event_model), parsed once per save, reload or rules edit."""
+    key = (store.updated_at, st.session_state.get("last_saved_hash"),
+           json.dumps(store.state.get("rules", {}), sort_keys=True))
+    cached = st.session_state.get("_event_model")
+    if not cached or cached[0] != key:
+        with prof.span("Event.from_state"):
+            cached = (key, Event.from_state(store.state))
+        st.session_state["_event_model"] = cached
+    return cached[1]
+
+
+# Issues found by the validator on this session's last save (storage.check_event) or Tools visit
+if st.session_state.get("event_issues"):
+    st.sidebar.warning(f"{len(st.session_state['event_issues'])} consistency issue(s); see Tools → Consistency.")
 
 # ---- Styles for Schedule tab ----
 SECTION_COLORS = {
@@ -601,7 +710,6 @@ SCHEDULE_CSS = """
 </style>
 """
 
-st.markdown(SCHEDULE_CSS, unsafe_allow_html=True)
 
 # ---- Styles for Players tab ----
 PLAYERS_CSS = """
@@ -614,7 +722,6 @@ PLAYERS_CSS = """
 </style>
 """
 
-st.markdown(PLAYERS_CSS, unsafe_allow_html=True)
 
 # -------- Sidebar Global Settings --------
 if SUPABASE_CONFIGURED:
@@ -627,7 +734,7 @@ if SUPABASE_CONFIGURED:
                 except Exception:
                     pass
                 st.session_state.pop("auth_user", None)
-                st.rerun()
+                prof.rerun()
     else:
         with st.sidebar:
             st.info("Guest mode (auth not active)")
@@ -673,7 +780,11 @@ STATUS_CSS = """
 .hdrsave .stButton>button:hover { background:rgba(239,68,68,.18); }
 </style>
 """
-st.markdown(STATUS_CSS, unsafe_allow_html=True)
+# All page CSS goes out in one element instead of one st.markdown per block
+st.markdown(
+    "".join((ENTER_SCORES_CSS, ENTER_SCORES_CSS_COMPACT, SELECTS_SIMPLE_CSS, SCHEDULE_CSS, PLAYERS_CSS, STATUS_CSS)),
+    unsafe_allow_html=True,
+)
 
 def _render_saved_status():
     try:
@@ -715,19 +826,19 @@ with hdr_r:
             try:
                 store.save()
                 st.toast("Saved", icon="✅")
-                st.rerun()
+                prof.rerun()
             except Exception as e:
                 st.error(f"Save failed: {e}")
         st.markdown("</div>", unsafe_allow_html=True)
     else:
         _render_saved_status()
 
-tab_rules, tab_players, tab_schedule, tab_scores, tab_perend, tab_standings, tab_lb, tab_io, tab_tools = st.tabs([
-    "Rules", "Players", "Schedule", "Enter Scores", "Per-end", "Standings", "Leaderboard", "Import/Export", "Tools"
+tab_rules, tab_players, tab_schedule, tab_scores, tab_perend, tab_standings, tab_ko, tab_lb, tab_proj, tab_io, tab_tools = st.tabs([
+    "Rules", "Players", "Schedule", "Enter Scores", "Per-end", "Standings", "Knockout", "Leaderboard", "Projections", "Import/Export", "Tools"
 ])
 
 # -------- Rules --------
-with tab_rules:
+with tab_rules, prof.span("tab: Rules"):
     st.subheader("Scoring Rules & Tiebreakers")
     if st.session_state.get("pairings_dirty_any"):
         st.warning("Unsaved pairings detected in Schedule. Save or clear them before leaving.")
@@ -750,8 +861,14 @@ with tab_rules:
     st.markdown("---")
     rules["ENDS_PER_GAME"] = st.number_input("Ends per game", 1, 30, int(rules.get("ENDS_PER_GAME", 18)), key="rl_ends")
     st.markdown("---")
+    c1,c2 = st.columns(2)
+    with c1:
+        rules["RR_DOUBLE"] = st.checkbox("Round-robin: double (play everyone twice, A/B swapped)", value=bool(rules.get("RR_DOUBLE", False)), key="rl_rr_double")
+    with c2:
+        rules["RR_BALANCED"] = st.checkbox("Round-robin: balance A/B (alternate sides)", value=bool(rules.get("RR_BALANCED", False)), key="rl_rr_balanced")
+    st.markdown("---")
     st.caption("Tiebreakers (choose up to 3; leave later ones as '— None —')")
-    TB_OPTIONS = ["— None —","Total","Punte","Bonus","Verskil","Player#","Coinflip","Skips draw to Jack"]
+    TB_OPTIONS = ["— None —","Total","Punte","Bonus","Verskil","Rating","Player#","Coinflip","Skips draw to Jack"]
     cur = rules.get("TIEBREAKERS", ["Total","Verskil","Player#"]) + ["— None —","— None —","— None —"]
 
     tb1 = st.selectbox("1st", TB_OPTIONS, index=TB_OPTIONS.index(cur[0] if cur[0] in TB_OPTIONS else "Total"), key="tb1")
@@ -766,7 +883,7 @@ with tab_rules:
         st.success("Rules saved.")
 
 # -------- Players --------
-with tab_players:
+with tab_players, prof.span("tab: Players"):
     st.subheader("Players")
     if st.session_state.get("pairings_dirty_any"):
         st.warning("Unsaved pairings detected in Schedule. Save or clear them before leaving.")
@@ -850,14 +967,10 @@ with tab_players:
             if str(confirm_text).strip() != ("" if sel_pid is None else str(sel_pid)):
                 st.error("Confirmation number does not match the selected player.")
             else:
-                # Safety: check usage in pairings first
-                used = 0
-                where = []
-                for key, prs in store.state.get("pairings", {}).items():
-                    for pr in prs:
-                        if pr.get("a_id") == sel_pid or pr.get("b_id") == sel_pid:
-                            used += 1
-                            where.append((key, pr.get("rink")))
+                # Safety: check usage in pairings first (reverse index lookup)
+                slots = store.player_index().games(sel_pid)
+                used = len(slots)
+                where = [(s.pair_key, s.rink if s.sitting <= 1 else f"{s.rink}·{s.sitting}") for s in slots]
                 if used > 0:
                     # stage force-remove in session so the confirm button works on its own rerun
                     st.session_state["pl_pending_remove"] = {"pid": sel_pid, "used": used, "where": where}
@@ -880,21 +993,27 @@ with tab_players:
                 pid_fr = int(pending["pid"])
                 # 1) remove from players
                 store.state["players"].pop(str(pid_fr), None)
-                # 2) clear from pairings
-                for key, prs in store.state.get("pairings", {}).items():
-                    for pr in prs:
-                        if pr.get("a_id") == pid_fr:
-                            pr["a_id"] = None
-                        if pr.get("b_id") == pid_fr:
-                            pr["b_id"] = None
-                store.log("remove_player_forced", {"player_id": pid_fr, "affected_pairings": pending["used"]})
-                store.save()
+                # 2) clear from pairings, dropping the scores of those games
+                n_rows, n_scores = clear_player(store.state, store.player_index(), pid_fr)
+                store.log("remove_player_forced", {"player_id": pid_fr, "affected_pairings": n_rows,
+                                                   "removed_scores": n_scores})  # log() saves
                 st.session_state["pl_pending_remove"] = None
-                st.success(f"Removed player #{pid_fr} and cleared them from {pending['used']} pairing(s).")
+                st.success(f"Removed player #{pid_fr}, cleared them from {n_rows} pairing(s) "
+                           f"and removed {n_scores} score(s).")
         with cfr2:
             if st.button("Cancel", key="pl_force_remove_cancel"):
                 st.session_state["pl_pending_remove"] = None
 
+    # A player's games, straight from the reverse index
+    st.markdown("### Player games")
+    games_idx = st.selectbox("Show games for", options=list(range(len(opt_labels))),
+                             format_func=lambda i: opt_labels[i], key="pl_games_idx")
+    if opt_values[games_idx] is not None:
+        games = player_games(store.state, store.player_index(), opt_values[games_idx])
+        if games:
+            st.dataframe(games, use_container_width=True, hide_index=True)
+        else:
+            st.info("Not paired in any round yet.")
 
     st.markdown("---")
 
@@ -929,14 +1048,34 @@ with tab_players:
         st.info("No players yet.")
 
 # -------- Schedule (Pairings) --------
-with tab_schedule:
+with tab_schedule, prof.span("tab: Schedule"):
     st.subheader("Generate / Edit Pairings (both sections)")
     rnd = st.number_input("Round", 1, int(store.state.get("rounds", rounds)), 1, key="sc_round_combined")
 
     rules = store.state.get("rules", {})
     tiebreakers = rules.get("TIEBREAKERS", ["Total", "Verskil", "Player#"])
     all_sections = store.state.get("sections", DEFAULT_SECTIONS) or DEFAULT_SECTIONS
-    rinksN_global = int(store.state.get("rinks", rinks))
+
+    GEN_MODE_BY_LABEL = {
+        "Round 1: Random (within section)": "random",
+        "Round 1: Seeded by rating (top half vs bottom half)": "seeded",
+        "Strong vs Strong (standings, no repeats)": "strong",
+        "Swiss: Score groups (Dutch, large fields)": "dutch",
+        "Round-robin": "roundrobin",
+        "Finals: Mix Sections (standings, no repeats)": "finals",
+    }
+    GEN_AUDIT = {
+        "random": ("generate_r1_random", "Round 1 random pairs generated."),
+        "seeded": ("generate_r1_seeded", "Round 1 seeded pairs generated."),
+        "strong": ("generate_strong_vs_strong", "Strong-vs-strong pairs generated."),
+        "dutch": ("generate_dutch_swiss", "Score-group Swiss pairs generated."),
+        "roundrobin": ("generate_roundrobin", "Round-robin pairs generated."),
+    }
+
+    def _clear_pairing_editor(sec: str):
+        """Drop this round's editor widgets for `sec` (every rink and sitting) so saved pairs show."""
+        ksec = re.sub(r"[^A-Za-z0-9_]+", "_", str(sec)).lower()
+        drop_view(st.session_state, "sc", ksec, int(rnd), fields=("a_", "b_", "sittings"))
 
     # Helper renders one section’s generator + editor for the current round
     def render_section_pairings(sec: str):
@@ -962,116 +1101,43 @@ with tab_schedule:
 
         # ---- Generator (per section) ----
         gcol1, gcol2, gcol3 = st.columns([3,2,1])
-        algo = gcol1.selectbox(
-            "Mode",
-            [
-                "Round 1: Random (within section)",
-                "Strong vs Strong (standings, no repeats)",
-                "Round-robin",
-                "Finals: Mix Sections (standings, no repeats)",
-            ],
-            key=f"gen_mode_{sec}"
-        )
+        algo = gcol1.selectbox("Mode", list(GEN_MODE_BY_LABEL), key=f"gen_mode_{sec}")
         gcol2.selectbox("Apply to", ["This round"], key=f"gen_apply_{sec}")
 
         if gcol3.button("Generate", key=f"gen_go_{sec}"):
-            players = [int(k) for k, v in store.state["players"].items() if v["section"] == sec]
-            players.sort()
-
-            if algo.startswith("Round 1"):
-                ids = players[:]
-                random.shuffle(ids)
-                pairs = [(ids[i], ids[i+1] if i+1 < len(ids) else None) for i in range(0, len(ids), 2)]
-                lmap = last_rink_map(store.state, sec, int(rnd))
-                new_pairs = assign_rinks_with_preferences(rinksN, pairs, lmap)
-                store.state["pairings"][key_pair] = new_pairs
-                store.log("generate_r1_random", {"section": sec, "round": int(rnd), "pairs": new_pairs})
-                store.save()
-                st.success(f"{sec}: Round 1 random pairs generated.")
-
-            elif algo.startswith("Strong vs Strong"):
-                table = compute_standings(store.state, sec, rules, tiebreakers)
-                prev = {r: store.state["pairings"].get(store.key_pair(sec, r), []) for r in range(1, int(rnd))}
-                hist = build_history(prev)
-                pairs = strong_vs_strong_pairs(table, hist)
-                lmap = last_rink_map(store.state, sec, int(rnd))
-                new_pairs = assign_rinks_with_preferences(rinksN, pairs, lmap)
-                store.state["pairings"][key_pair] = new_pairs
-                store.log("generate_strong_vs_strong", {"section": sec, "round": int(rnd), "pairs": new_pairs})
-                store.save()
-                st.success(f"{sec}: Strong-vs-strong pairs generated.")
-
-            elif algo.startswith("Round-robin"):
-                rr = round_robin_pairs(players)
-                pairs = rr[int(rnd) - 1] if 1 <= int(rnd) <= len(rr) else []
-                lmap = last_rink_map(store.state, sec, int(rnd))
-                new_pairs = assign_rinks_with_preferences(rinksN, pairs, lmap)
-                store.state["pairings"][key_pair] = new_pairs
-                store.log("generate_roundrobin", {"section": sec, "round": int(rnd), "pairs": new_pairs})
-                store.save()
-                st.success(f"{sec}: Round-robin pairs generated.")
-
-            elif algo.startswith("Finals"):
-                # Build combined standings (both sections) and global history so pairs are identical
+            mode = GEN_MODE_BY_LABEL[algo]
+            table = None
+            if mode in ("strong", "dutch"):
+                # standings from the already parsed event instead of re-reading the state
+                rl = store.state.get("rules", {})
+                table = compute_standings(_event(), sec, rl, rl.get("TIEBREAKERS", ["Total", "Verskil", "Player#"]))
+            generated = generate_round(store.state, sec, int(rnd), mode, table=table)
+            for k_gen, prs_gen in generated.items():
+                store.set_pairings(k_gen, prs_gen)
+
+            if mode == "finals":
                 sections_all = store.state.get("sections", ["SEKSIE 1", "SEKSIE 2"])
-                all_rows = []
-                for s in sections_all:
-                    all_rows.extend(compute_standings(store.state, s, rules, tiebreakers))
-                combined = sort_standings(all_rows, tiebreakers)
-
-                prev_all = {}
-                for s in sections_all:
-                    for rprev in range(1, int(rnd)):
-                        prev_all.setdefault(rprev, [])
-                        prev_all[rprev].extend(store.state["pairings"].get(store.key_pair(s, rprev), []))
-                hist = build_history(prev_all)
-
-                pairs = strong_vs_strong_pairs(combined, hist)
-
-                # Use a COMBINED last-rink map so rink assignment is the same no matter which section triggers Generate
-                lmap_combined = {}
-                for s in sections_all:
-                    lmap_combined.update(last_rink_map(store.state, s, int(rnd)))
-
-                new_pairs = assign_rinks_with_preferences(rinksN, pairs, lmap_combined)
-
-                # Save IDENTICAL finals pairings to BOTH sections
-                for s in sections_all:
-                    store.state["pairings"][store.key_pair(s, int(rnd))] = new_pairs
-
-                store.log("generate_finals_mix_both", {"sections": sections_all, "round": int(rnd), "pairs": new_pairs})
-                store.save()
+                store.log("generate_finals_mix_both", {"sections": sections_all, "round": int(rnd), "pairs": next(iter(generated.values()), [])})
                 st.success("Finals (mixed sections) pairs generated for both sections.")
 
                 # Clear editors for BOTH sections so they immediately reflect the identical finals
                 for s in sections_all:
-                    ksec2 = re.sub(r"[^A-Za-z0-9_]+", "_", str(s)).lower()
-                    k_prefix2 = f"sc_{ksec2}_{int(rnd)}"
-                    for i in range(1, rinksN + 1):
-                        st.session_state.pop(f"{k_prefix2}_a_{i}", None)
-                        st.session_state.pop(f"{k_prefix2}_b_{i}", None)
-
-                # Ensure the current editor also refreshes this render
-                pairings = store.state["pairings"].get(key_pair, new_pairs)
-
+                    _clear_pairing_editor(s)
+            else:
+                action, done_msg = GEN_AUDIT[mode]
+                store.log(action, {"section": sec, "round": int(rnd), "pairs": generated[key_pair]})  # log() saves
+                st.success(f"{sec}: {done_msg}")
 
             # clear ONLY this section/round’s widgets so fresh pairs show
-            ksec = re.sub(r"[^A-Za-z0-9_]+", "_", str(sec)).lower()
-            k_prefix = f"sc_{ksec}_{int(rnd)}"
-            for i in range(1, rinksN + 1):
-                st.session_state.pop(f"{k_prefix}_a_{i}", None)
-                st.session_state.pop(f"{k_prefix}_b_{i}", None)
+            _clear_pairing_editor(sec)
             # refresh local pairings for this render
             pairings = store.state["pairings"].get(key_pair, pairings)
 
         # ---- Editor (duplicate-safe, namespaced by section+round) ----
-        def _section_player_options(store, section):
-            rows = [(int(k), v["name"]) for k, v in store.state["players"].items() if v["section"] == section]
-            rows.sort(key=lambda x: x[0])
-            return [(None, "—")] + [(pid, f"{pid} — {name}") for pid, name in rows]
-
-        def _options_for_round(store, sec, pairings):
-            base = _section_player_options(store, sec)
+        # Options are built once per section: base list, pid -> position map,
+        # and a sorted list of used positions grown row by row.
+        def _options_for_round(sec, pairings):
+            base = [(None, "—")] + opts_by_section.get(sec, [])
             base_ids = {pid for pid, _ in base[1:]}
             extras, seen_extra = [], set()
             for pr in pairings:
@@ -1085,68 +1151,81 @@ with tab_schedule:
             extras.sort(key=lambda x: x[0])
             return base + extras
 
-        base_opts = _options_for_round(store, sec, pairings)
+        base_opts = _options_for_round(sec, pairings)
+        pos_of = {pid: i for i, (pid, _) in enumerate(base_opts) if pid is not None}
+        rows_by_slot = {}
+        for p in pairings:
+            rows_by_slot.setdefault((p.get("rink"), int(p.get("sitting") or 1)), p)
 
         ksec = re.sub(r"[^A-Za-z0-9_]+", "_", str(sec)).lower()
-        k_prefix = f"sc_{ksec}_{int(rnd)}"
+        keys = view_keys(st.session_state, "sc", ksec, int(rnd))
 
-        def _index_in(options, pid):
-            for i, (p, _) in enumerate(options):
-                if p == pid:
-                    return i
-            return 0  # "—"
+        def _row_options(keep_id):
+            keep_pos = pos_of.get(keep_id)
+            opts = _options_without(base_opts, used_pos, keep_pos) if used_pos else base_opts
+            if keep_pos is None:
+                return opts, 0  # "—"
+            return opts, keep_pos - bisect_left(used_pos, keep_pos)
 
-        def _filter_opts(base, keep_id, exclude_ids):
-            out = [base[0]]
-            for pid, label in base[1:]:
-                if pid == keep_id or (pid not in exclude_ids):
-                    out.append((pid, label))
-            return out
+        # More games than rinks -> several sittings (engine.assign_rink_slots)
+        saved_sittings = max([int(p.get("sitting") or 1) for p in pairings] or [1])
+        sittingsN = int(st.number_input("Sittings", 1, 99, saved_sittings, 1, key=keys("sittings")))
 
         hdr = st.columns([0.7, 5, 5])
         hdr[0].markdown("**Rink**")
         hdr[1].markdown("**A (top)**")
         hdr[2].markdown("**B (bottom)**")
 
-        used_ids = set()
+        used_ids, used_pos = set(), []
         new_pairs = []
-        for idx in range(1, rinksN + 1):
-            row = next((p for p in pairings if p["rink"] == idx), {"rink": idx, "a_id": None, "b_id": None})
-            prev_a = st.session_state.get(f"{k_prefix}_a_{idx}")
-            prev_b = st.session_state.get(f"{k_prefix}_b_{idx}")
-            cur_a_id = (prev_a[0] if isinstance(prev_a, tuple) else row.get("a_id"))
-            cur_b_id = (prev_b[0] if isinstance(prev_b, tuple) else row.get("b_id"))
-
-            c1, c2, c3 = st.columns([0.7, 5, 5])
-            with c1:
-                st.markdown(
-                    f'<div class="rink-row"><span class="rink-pill" style="border-color:{sec_color}; color:{sec_color}">{idx}</span></div>',
-                    unsafe_allow_html=True
-                )
-
-            opts_a = _filter_opts(base_opts, cur_a_id, used_ids)
-            a_idx = _index_in(opts_a, cur_a_id)
-            with c2:
-                a_choice = st.selectbox(
-                    f"A_{sec}_{idx}", options=opts_a, index=a_idx,
-                    key=f"{k_prefix}_a_{idx}", format_func=lambda x: x[1],
-                    label_visibility="collapsed"
-                )
-            sel_a = a_choice[0]
-            if sel_a is not None:
-                used_ids.add(sel_a)
-
-            opts_b = _filter_opts(base_opts, cur_b_id, used_ids)
-            b_idx = _index_in(opts_b, cur_b_id)
-            with c3:
-                b_choice = st.selectbox(
-                    f"B_{sec}_{idx}", options=opts_b, index=b_idx,
-                    key=f"{k_prefix}_b_{idx}", format_func=lambda x: x[1],
-                    label_visibility="collapsed"
-                )
-            sel_b = b_choice[0]
-
-            new_pairs.append({"rink": idx, "a_id": sel_a, "b_id": sel_b})
+        for sitting in range(1, sittingsN + 1):
+            if sittingsN > 1:
+                st.markdown(f"**Sitting {sitting}**")
+            for idx in range(1, rinksN + 1):
+                tag = _slot_tag(idx, sitting)
+                row = rows_by_slot.get((idx, sitting)) or {"rink": idx, "a_id": None, "b_id": None}
+                prev_a = st.session_state.get(keys(f"a_{tag}"))
+                prev_b = st.session_state.get(keys(f"b_{tag}"))
+                cur_a_id = (prev_a[0] if isinstance(prev_a, tuple) else row.get("a_id"))
+                cur_b_id = (prev_b[0] if isinstance(prev_b, tuple) else row.get("b_id"))
+
+                c1, c2, c3 = st.columns([0.7, 5, 5])
+                with c1:
+                    st.markdown(
+                        f'<div class="rink-row"><span class="rink-pill" style="border-color:{sec_color}; color:{sec_color}">{idx}</span></div>',
+                        unsafe_allow_html=True
+                    )
+
+                opts_a, a_idx = _row_options(cur_a_id)
+                with c2:
+                    a_choice = st.selectbox(
+                        f"A_{sec}_{tag}", options=opts_a, index=a_idx,
+                        key=keys(f"a_{tag}"), format_func=lambda x: x[1],
+                        label_visibility="collapsed"
+                    )
+                sel_a = a_choice[0]
+                if sel_a is not None and sel_a in pos_of and sel_a not in used_ids:
+                    used_ids.add(sel_a)
+                    insort(used_pos, pos_of[sel_a])
+
+                opts_b, b_idx = _row_options(cur_b_id)
+                with c3:
+                    b_choice = st.selectbox(
+                        f"B_{sec}_{tag}", options=opts_b, index=b_idx,
+                        key=keys(f"b_{tag}"), format_func=lambda x: x[1],
+                        label_visibility="collapsed"
+                    )
+                sel_b = b_choice[0]
+
+                new_row = {"rink": idx, "a_id": sel_a, "b_id": sel_b}
+                if sittingsN > 1:
+                    new_row["sitting"] = sitting
+                new_pairs.append(new_row)
+        # byes of an overflowing round have no rink; keep them unless the player was placed
+        placed = {pid for pr in new_pairs for pid in (pr["a_id"], pr["b_id"]) if pid}
+        new_pairs.extend(dict(p) for p in pairings
+                         if not p.get("rink") and (p.get("a_id") or p.get("b_id")) and
+                         not {p.get("a_id"), p.get("b_id")} & placed)
 
         # Duplicate validation
         seen = {}
@@ -1154,7 +1233,7 @@ with tab_schedule:
             for side in ("a_id", "b_id"):
                 pid = pr.get(side)
                 if pid:
-                    seen.setdefault(pid, []).append(pr["rink"])
+                    seen.setdefault(pid, []).append(_slot_label(pr["rink"], pr.get("sitting", 1)))
         dup_ids = [pid for pid, rlist in seen.items() if len(rlist) > 1]
         if dup_ids:
             names = [f'#{pid} — {store.state["players"].get(str(pid), {}).get("name", "")}' for pid in dup_ids]
@@ -1163,7 +1242,9 @@ with tab_schedule:
         # Track unsaved changes (compare UI selections to saved pairings)
         existing_pairs_saved = store.state["pairings"].get(key_pair, [])
         def _canon(rows):
-            return [{"rink": int(p.get("rink", 0)), "a_id": p.get("a_id"), "b_id": p.get("b_id")} for p in (rows or [])]
+            # slot order, empty rows ignored (the editor shows every rink of every sitting)
+            return sorted((int(p.get("sitting") or 1), int(p.get("rink", 0)), p.get("a_id") or 0, p.get("b_id") or 0)
+                          for p in (rows or []) if p.get("a_id") or p.get("b_id"))
         st.session_state.setdefault("pairings_dirty", {})[key_pair] = (_canon(new_pairs) != _canon(existing_pairs_saved))
 
         # Wipe guard: if all empty and there are existing pairings, require explicit clear
@@ -1172,32 +1253,47 @@ with tab_schedule:
 
         btn_cols = st.columns([1, 1, 6])
         with btn_cols[0]:
-            if st.button("Save pairings", key=f"{k_prefix}_save", disabled=bool(dup_ids)):
+            if st.button("Save pairings", key=keys("save"), disabled=bool(dup_ids)):
                 if dup_ids:
                     st.error("Fix duplicates before saving.")
                 elif all_empty and existing_pairs:
                     st.warning("No players selected. Not saving to avoid wiping existing pairings. Use 'Clear all pairings' to empty this round.")
                 else:
-                    store.state["pairings"][key_pair] = new_pairs if not all_empty else []
+                    store.set_pairings(key_pair, new_pairs if not all_empty else [])
                     store.log("save_pairings", {"section": sec, "round": int(rnd), "pairs": store.state["pairings"][key_pair]})
                     store.save()
                     st.session_state.setdefault("pairings_dirty", {})[key_pair] = False
                     st.success(f"{sec}: Pairings saved.")
 
         with btn_cols[1]:
-            if st.button("Clear all pairings", key=f"{k_prefix}_clear"):
-                store.state["pairings"][key_pair] = []
+            if st.button("Clear all pairings", key=keys("clear")):
+                store.set_pairings(key_pair, [])
                 store.log("clear_pairings", {"section": sec, "round": int(rnd)})
                 store.save()
-                for i in range(1, rinksN + 1):
-                    st.session_state.pop(f"{k_prefix}_a_{i}", None)
-                    st.session_state.pop(f"{k_prefix}_b_{i}", None)
+                _clear_pairing_editor(sec)
                 st.session_state.setdefault("pairings_dirty", {})[key_pair] = False
                 st.success(f"{sec}: All pairings cleared for this round.")
 
         st.markdown("</div>", unsafe_allow_html=True)  # close section box
 
-    # Render BOTH sections for this round
+    # ---- Generate every section at once: one standings pass, one save, one audit entry ----
+    ga1, ga2 = st.columns([3, 1])
+    all_labels = [lbl for lbl, m in GEN_MODE_BY_LABEL.items() if m != "finals"]
+    all_algo = ga1.selectbox("Mode for all sections", all_labels, key="gen_all_mode")
+    if ga2.button("Generate all sections", key="gen_all_go"):
+        mode = GEN_MODE_BY_LABEL[all_algo]
+        # Tools → Generation sets the worker processes; 0 leaves it to engine.PARALLEL_MIN_PLAYERS
+        generated = generate_all_sections(store.state, int(rnd), mode,
+                                          workers=int(st.session_state.get("tl_gen_workers", 0)) or None)
+        for k_gen, prs_gen in generated.items():
+            store.set_pairings(k_gen, prs_gen)
+        store.log("generate_all_sections", {"mode": mode, "round": int(rnd), "pairs": generated})
+        for s in all_sections:
+            _clear_pairing_editor(s)
+        st.success(f"{GEN_AUDIT[mode][1]} ({len(generated)} sections)")
+
+    # Render BOTH sections for this round (player options grouped in one pass)
+    opts_by_section = _player_options_by_section(store.state.get("players", {}))
     for sec in all_sections:
         render_section_pairings(sec)
 
@@ -1208,7 +1304,7 @@ with tab_schedule:
 
 # -------- Scores --------
 # -------- Scores --------
-with tab_scores:
+with tab_scores, prof.span("tab: Enter Scores"):
     st.subheader("Enter Scores")
     if st.session_state.get("pairings_dirty_any"):
         st.warning("Unsaved pairings detected in Schedule. Save or clear them to avoid losing changes.")
@@ -1243,8 +1339,13 @@ with tab_scores:
         h_bt.markdown("<span class='col teen'>Teen</span>", unsafe_allow_html=True)
         h_btn.markdown("**Save**")
 
-        # Rows
-        for pr in pairings:
+        # Rows (grouped by sitting when the round has more games than rinks)
+        multi_sitting = any(int(pr.get("sitting") or 1) > 1 for pr in pairings)
+        shown_sitting = None
+        for pr in sorted(pairings, key=lambda p: int(p.get("sitting") or 1)) if multi_sitting else pairings:
+            if multi_sitting and int(pr.get("sitting") or 1) != shown_sitting:
+                shown_sitting = int(pr.get("sitting") or 1)
+                st.markdown(f"**Sitting {shown_sitting}**")
             render_rink_score_compact(
                 section=sec, round_no=int(rnd), rink=int(pr.get("rink", 0)),
                 pr=pr, store=store, mirror_on=mirror_on
@@ -1254,23 +1355,25 @@ with tab_scores:
         c1, _ = st.columns([1,6])
         with c1:
             if st.button("Save all rinks", key=f"save_all_{sec}_{rnd}"):
+                keys = view_keys(st.session_state, "score", sec, int(rnd))
                 for pr in pairings:
-                    rk = int(pr.get("rink", 0))
-                    sk = store.key_score(sec, int(rnd), rk)
-                    va = int(st.session_state.get(f"score_va_{sec}_{int(rnd)}_{rk}", 0))
-                    ta = int(st.session_state.get(f"score_ta_{sec}_{int(rnd)}_{rk}", 0))
+                    rk, sitting = int(pr.get("rink", 0)), int(pr.get("sitting") or 1)
+                    sk = store.key_score(sec, int(rnd), rk, sitting)
+                    tag = _slot_tag(rk, sitting)
+                    va = int(st.session_state.get(keys(f"va_{tag}"), 0))
+                    ta = int(st.session_state.get(keys(f"ta_{tag}"), 0))
                     if mirror_on:
                         vb, tb = ta, va
                     else:
-                        vb = int(st.session_state.get(f"score_vb_{sec}_{int(rnd)}_{rk}", 0))
-                        tb = int(st.session_state.get(f"score_tb_{sec}_{int(rnd)}_{rk}", 0))
+                        vb = int(st.session_state.get(keys(f"vb_{tag}"), 0))
+                        tb = int(st.session_state.get(keys(f"tb_{tag}"), 0))
                     store.state["scores"][sk] = {"a": {"vir": va, "teen": ta}, "b": {"vir": vb, "teen": tb}}
                 store.save()
                 st.success("Saved scores for all rinks.")
 
 
 # -------- Per-end --------
-with tab_perend:
+with tab_perend, prof.span("tab: Per-end"):
     st.subheader("Per-end (optional)")
     if st.session_state.get("pairings_dirty_any"):
         st.warning("Unsaved pairings detected in Schedule. Save or clear them before leaving.")
@@ -1282,15 +1385,17 @@ with tab_perend:
     # Rinks that exist for this section/round (from pairings)
     key_pair = store.key_pair(sec, int(rnd))
     pairings = store.state.get("pairings", {}).get(key_pair, [])
-    rink_ids = [int(pr.get("rink", 0)) for pr in pairings] or list(range(1, int(store.state.get("rinks", DEFAULT_RINKS)) + 1))
-    rink = st.selectbox("Rink", options=rink_ids, key="pe_rink")
+    slot_ids = ([(int(pr.get("rink", 0)), int(pr.get("sitting") or 1)) for pr in pairings if pr.get("rink")]
+                or [(r, 1) for r in range(1, int(store.state.get("rinks", DEFAULT_RINKS)) + 1)])
+    rink, sitting = st.selectbox("Rink", options=slot_ids, key="pe_rink", format_func=lambda x: _slot_label(*x))
 
     # If there are no pairings at all, caution but allow data entry
     if not pairings:
         st.warning("No saved pairings for this round/section yet. You can still capture per-end data, but names will be blank.", icon="⚠️")
 
     # Show who is A/B (if known)
-    pr = next((p for p in pairings if int(p.get("rink", 0)) == int(rink)), {"a_id": None, "b_id": None})
+    pr = next((p for p in pairings if int(p.get("rink", 0)) == int(rink) and int(p.get("sitting") or 1) == sitting),
+              {"a_id": None, "b_id": None})
     a = store.state["players"].get(str(pr.get("a_id") or ""), {})
     b = store.state["players"].get(str(pr.get("b_id") or ""), {})
     a_name = a.get("name", "")
@@ -1299,8 +1404,8 @@ with tab_perend:
     st.caption(f"A = #{pr.get('a_id') or '—'} {a_name or ''} • B = #{pr.get('b_id') or '—'} {b_name or ''}")
 
     # Load or initialize per-end rows
-    sk = store.key_score(sec, int(rnd), int(rink))
-    pe_key = sk  # reuse the same triple key
+    sk = store.key_score(sec, int(rnd), int(rink), sitting)
+    pe_key = sk  # reuse the same score key
     ends_n = int(store.state.get("rules", {}).get("ENDS_PER_GAME", 18))
     pe = store.state.get("scores_per_end", {}).get(pe_key, {"n": ends_n, "ends": [{"a": 0, "b": 0} for _ in range(ends_n)]})
 
@@ -1318,14 +1423,15 @@ with tab_perend:
     head[2].markdown(f"**B points** {'('+b_name+')' if b_name else ''}")
 
     # Use namespaced keys so switching tabs/rounds doesn't collide
-    k_prefix = f"pe_{sec}_{int(rnd)}_{int(rink)}"
+    keys = view_keys(st.session_state, "pe", sec, int(rnd))
+    tag = _slot_tag(int(rink), sitting)
     totals_a = totals_b = 0
     new_rows = []
     for i in range(1, ends_n + 1):
         c1, c2, c3 = st.columns([1,2,2])
         c1.write(f"{i}")
-        a_val = c2.number_input(f"a_{i}", min_value=0, step=1, value=int(pe["ends"][i-1]["a"]), key=f"{k_prefix}_a_{i}", label_visibility="collapsed")
-        b_val = c3.number_input(f"b_{i}", min_value=0, step=1, value=int(pe["ends"][i-1]["b"]), key=f"{k_prefix}_b_{i}", label_visibility="collapsed")
+        a_val = c2.number_input(f"a_{i}", min_value=0, step=1, value=int(pe["ends"][i-1]["a"]), key=keys(f"{tag}_a_{i}"), label_visibility="collapsed")
+        b_val = c3.number_input(f"b_{i}", min_value=0, step=1, value=int(pe["ends"][i-1]["b"]), key=keys(f"{tag}_b_{i}"), label_visibility="collapsed")
         new_rows.append({"a": int(a_val), "b": int(b_val)})
         totals_a += int(a_val)
         totals_b += int(b_val)
@@ -1336,7 +1442,7 @@ with tab_perend:
     c1, c2, c3 = st.columns([1,1,4])
 
     # Save per-end AND write round totals into the existing 'scores' bucket
-    if c1.button("Save per-end (update totals)", key=f"{k_prefix}_save"):
+    if c1.button("Save per-end (update totals)", key=keys(f"{tag}_save")):
         store.state.setdefault("scores_per_end", {})[pe_key] = {"n": ends_n, "ends": new_rows}
         store.state.setdefault("scores", {})[sk] = {
             "a": {"vir": totals_a, "teen": totals_b},
@@ -1347,39 +1453,101 @@ with tab_perend:
         st.success("Per-end saved and totals updated.")
 
     # Clear just the per-end rows (keeps any previously entered totals untouched)
-    if c2.button("Clear per-end rows", key=f"{k_prefix}_clear"):
+    if c2.button("Clear per-end rows", key=keys(f"{tag}_clear")):
         store.state.setdefault("scores_per_end", {}).pop(pe_key, None)
         store.log("clear_per_end_rows", {"key": pe_key})
         store.save()
-        for i in range(1, ends_n + 1):
-            st.session_state.pop(f"{k_prefix}_a_{i}", None)
-            st.session_state.pop(f"{k_prefix}_b_{i}", None)
+        drop_view(st.session_state, "pe", sec, int(rnd), fields=(f"{tag}_a_", f"{tag}_b_"))
         st.success("Per-end rows cleared.")
 
 # -------- Standings --------
-with tab_standings:
+with tab_standings, prof.span("tab: Standings"):
     st.subheader("Standings")
     if st.session_state.get("pairings_dirty_any"):
         st.warning("Unsaved pairings detected in Schedule. Save or clear them before leaving.")
     rules = store.state.get("rules", {})
     tiebreakers = rules.get("TIEBREAKERS", ["Total","Verskil","Player#"])
+    # every section from one pass over the games; Combined reuses the same rows
+    tables = compute_all_standings(_event(), rules, tiebreakers)
     cols = st.columns(3)
+    all_rows = []
     for idx, sec in enumerate(sections or DEFAULT_SECTIONS):
         with cols[idx % 3]:
             st.markdown(f"### {sec}")
-            tbl = compute_standings(store.state, sec, rules, tiebreakers)
+            tbl = tables.get(sec, [])
+            all_rows.extend(tbl)
             st.table([{"#": r.player_id, "Speler": r.name, "Verskil": r.verskil, "Punte": r.punte, "Bonus": r.bonus, "Total": r.punte + r.bonus, "Posisie": i+1} for i,r in enumerate(tbl)])
     st.markdown("### Combined")
-    all_rows = []
-    for sec in sections or DEFAULT_SECTIONS:
-        all_rows.extend(compute_standings(store.state, sec, rules, tiebreakers))
-    # re-sort combined
-    from engine import sort_standings
     combined = sort_standings(all_rows, tiebreakers)
     st.table([{"#": r.player_id, "Speler": r.name, "Sek": r.section, "Verskil": r.verskil, "Punte": r.punte, "Bonus": r.bonus, "Total": r.punte + r.bonus, "Posisie": i+1} for i,r in enumerate(combined)])
 
+# -------- Knockout --------
+with tab_ko, prof.span("tab: Knockout"):
+    st.subheader("Knockout (finals day)")
+    brackets = store.state.get("brackets") or {}
+    n_players = len(store.state.get("players", {}))
+    with st.expander("New knockout draw", expanded=not brackets):
+        k1, k2, k3, k4 = st.columns(4)
+        ko_name = k1.text_input("Name", value="" if "Main" in brackets else "Main", key="ko_name")
+        ko_count = k2.number_input("Qualifiers (combined standings)", 2, max(2, n_players), min(16, max(2, n_players)), key="ko_count")
+        ko_per = k3.number_input("Or top N per section (0 = off)", 0, max(1, n_players), 0, key="ko_per")
+        ko_rounds = int(store.state.get("rounds", rounds))
+        ko_first = k4.number_input("First event round", ko_rounds + 1, 99, ko_rounds + 1, key="ko_first")
+        ko_plate = st.checkbox("Plate draw for first-round losers", value=True, key="ko_plate")
+        st.caption("Seeds follow the combined standings; byes go to the top seeds. Games are scheduled "
+                   "on the first free rink as soon as both players are known.")
+        if st.button("Create draw", key="ko_create"):
+            name = ko_name.strip()
+            try:
+                seeds = qualifiers(_event(), count=int(ko_count), per_section=int(ko_per) or None)
+                touched = create_knockout(store.state, name, seeds, plate=f"{name} Plate" if ko_plate else None,
+                                          first_round=int(ko_first))
+                for key in touched:
+                    store.reindex(key)
+                store.log("create_knockout", {"name": name, "players": len(seeds),
+                                              "plate": bool(store.state["brackets"][name]["plate"])})
+                prof.rerun()
+            except ValueError as e:
+                st.error(str(e))
+
+    mirror_on = store.state.get("ui", {}).get("mirror_mode", True)
+    for name in list(brackets):
+        br = brackets.get(name)
+        if br is None:
+            continue
+        won_before = list(br["won"])
+        champ = br["won"][1]
+        st.markdown(f"### {name}" + (" · plate" if br.get("kind") == "plate" else "")
+                    + (f" — winner #{champ} {store.state['players'].get(str(champ), {}).get('name', '')}" if champ else ""))
+        view = bracket_rounds(store.state, name)
+        for col, (label, rows) in zip(st.columns(len(view)), view):
+            with col:
+                st.markdown(f"**{label}**")
+                st.dataframe([{"Rink": _slot_label(r["rink"], r["sitting"]) if r["rink"] else "",
+                               "A": r["A"], "B": r["B"], "Score": r["score"]} for r in rows],
+                             hide_index=True, use_container_width=True)
+        in_play = [r for r in (row for _, rows in view for row in rows) if r["rink"] and r["winner"] is None]
+        if in_play:
+            st.caption("Games in play · a drawn game advances nobody: play an extra end and save the final score.")
+            for r in in_play:
+                pr = next((p for p in store.state["pairings"].get(f"{name}:{r['round']}", [])
+                           if int(p.get("rink") or 0) == r["rink"] and int(p.get("sitting") or 1) == r["sitting"]), None)
+                if pr is not None:
+                    render_rink_score_compact(section=name, round_no=r["round"], rink=r["rink"],
+                                              pr=pr, store=store, mirror_on=mirror_on)
+        if br.get("kind") == "main":
+            d1, d2 = st.columns([1, 4])
+            sure = d2.checkbox("Yes, remove this draw with its games and scores", key=f"ko_del_ok_{name}")
+            if d1.button("Remove draw", key=f"ko_del_{name}", disabled=not sure):
+                for key in delete_bracket(store.state, name):
+                    store.reindex(key)
+                store.log("delete_knockout", {"name": name})
+                prof.rerun()
+        if store.state.get("brackets", {}).get(name, {}).get("won") != won_before:
+            prof.rerun()  # a saved score advanced the draw
+
 # -------- Leaderboard --------
-with tab_lb:
+with tab_lb, prof.span("tab: Leaderboard"):
     st.subheader("Live Leaderboard")
     if st.session_state.get("pairings_dirty_any"):
         st.warning("Unsaved pairings detected in Schedule. Save or clear them before leaving.")
@@ -1395,27 +1563,125 @@ with tab_lb:
     )
     st.markdown("<div id='lb-wrap'>", unsafe_allow_html=True)
 
-    sec_view = st.selectbox("View", options=["Combined"] + (sections or DEFAULT_SECTIONS), key="lb_view")
-    interval = st.number_input("Auto-refresh (seconds)", 5, 120, 15, key="lb_int")
-    st.caption("This will refresh when you reload; Streamlit Cloud/Local can auto-refresh on timer with external tools.")
+    lc1, lc2, lc3, lc4 = st.columns([3, 1, 1, 1])
+    sec_view = lc1.selectbox("View", options=["Combined"] + (sections or DEFAULT_SECTIONS), key="lb_view")
+    lb_asof = lc2.number_input("As of round (0 = latest)", 0, int(store.state.get("rounds", rounds)), 0, key="lb_asof")
+    lb_live = lc3.checkbox("Live", value=True, key="lb_live", help="Re-read the event only when it changed")
+    interval = lc4.number_input("Auto-refresh (seconds)", 2, 120, 15, key="lb_int", disabled=not lb_live)
+
+    def _history():
+        """Per-round standings for this event, rebuilt only after a save, reload or rules edit."""
+        key = (store.updated_at, st.session_state.get("last_saved_hash"),
+               json.dumps(store.state.get("rules", {}), sort_keys=True))
+        cached = st.session_state.get("lb_history")
+        if not cached or cached[0] != key:
+            cached = (key, standings_history(_event()))
+            st.session_state["lb_history"] = cached
+        return cached[1]
+
+    def _render_leaderboard_table():
+        hist = _history()
+        as_of = int(lb_asof) or None
+        if as_of is not None and as_of > hist.last_round:
+            st.caption(f"No scores after round {hist.last_round} yet.")
+        else:
+            shown = hist.last_round if as_of is None else as_of
+            st.caption(f"Standings after round {shown} · ± = places gained or lost in that round"
+                       if shown else "No rounds scored yet.")
+        st.dataframe(standings_rows(hist, sec_view, as_of), use_container_width=True, hide_index=True)
+
+    if lb_live:
+        # Only this block reruns on the timer; it reloads the event when the
+        # stored version moved and otherwise redraws from memory.
+        @_fragment(run_every=int(interval))
+        def _live_leaderboard():
+            if store.has_changed() and not st.session_state.get("pairings_dirty_any"):
+                store.load()
+            _render_leaderboard_table()
+            st.caption(f"Live · checks for changes every {int(interval)}s")
 
-    rules = store.state.get("rules", {})
-    tiebreakers = rules.get("TIEBREAKERS", ["Total","Verskil","Player#"])
-    if sec_view == "Combined":
-        rows = []
-        for s in sections or DEFAULT_SECTIONS:
-            rows.extend(compute_standings(store.state, s, rules, tiebreakers))
-        from engine import sort_standings
-        rows = sort_standings(rows, tiebreakers)
-        st.dataframe([{"Posisie": i+1, "#": r.player_id, "Speler": r.name, "Sek": r.section, "Total": r.punte + r.bonus, "Punte": r.punte, "Bonus": r.bonus, "Verskil": r.verskil} for i,r in enumerate(rows)], use_container_width=True, hide_index=True)
+        _live_leaderboard()
     else:
-        rows = compute_standings(store.state, sec_view, rules, tiebreakers)
-        st.dataframe([{"Posisie": i+1, "#": r.player_id, "Speler": r.name, "Total": r.punte + r.bonus, "Punte": r.punte, "Bonus": r.bonus, "Verskil": r.verskil} for i,r in enumerate(rows)], use_container_width=True, hide_index=True)
+        _render_leaderboard_table()
+
+    with st.expander("Position history"):
+        hist = _history()
+        group_rows = hist.table(sec_view)
+        labels = {f"#{r.player_id} {r.name}": r.player_id for r in group_rows}
+        picked = st.multiselect("Players", list(labels), default=list(labels)[:3], key="lb_hist_players")
+        if not hist.last_round:
+            st.info("No rounds scored yet.")
+        elif picked:
+            points = [{"Round": r, "Posisie": pos, "Speler": label}
+                      for label in picked
+                      for r, pos in enumerate(hist.position_history(sec_view, labels[label]), start=1)]
+            st.vega_lite_chart({
+                "data": {"values": points},
+                "mark": {"type": "line", "point": True},
+                "encoding": {
+                    "x": {"field": "Round", "type": "ordinal"},
+                    "y": {"field": "Posisie", "type": "quantitative", "scale": {"reverse": True, "zero": False}},
+                    "color": {"field": "Speler", "type": "nominal"},
+                },
+            }, use_container_width=True)
 
     st.markdown("</div>", unsafe_allow_html=True)
 
+# -------- Projections --------
+@st.cache_data(max_entries=8, show_spinner="Simulating remaining rounds…")
+def _projection(state_hash: str, _state: dict, section: str, sims: int, top: int):
+    """Monte Carlo finish probabilities, once per (event content, section, settings)."""
+    from projections import project_section
+    proj = project_section(_state, section, sims=sims, seed=0)
+    return proj.summary_rows(top=(1, top)), proj.remaining_rounds, proj.position_probs
+
+
+with tab_proj, prof.span("tab: Projections"):
+    st.subheader("Projected finish")
+    st.caption("Simulates the remaining rounds many times (paired like the section's last generated round, "
+               "margins drawn from each player's form so far) and counts where everyone finishes.")
+    pc0, pc1, pc2, pc3 = st.columns([1, 2, 1, 1])
+    # Opt-in: every tab body runs on each rerun, and this one imports NumPy and simulates
+    proj_on = pc0.toggle("Simulate", value=False, key="proj_on")
+    proj_sec = pc1.selectbox("Section", options=sections or DEFAULT_SECTIONS, key="proj_sec")
+    proj_sims = pc2.select_slider("Simulations", options=[500, 1000, 2000, 5000, 10000], value=2000, key="proj_sims")
+    proj_top = pc3.number_input("Top places", 2, 16, 3, key="proj_top")
+    if proj_on:
+        snap = json.dumps(store.state, sort_keys=True, ensure_ascii=False)
+        proj_rows, proj_left, proj_probs = _projection(
+            hashlib.sha1(snap.encode("utf-8")).hexdigest(), store.state, proj_sec, int(proj_sims), int(proj_top))
+        if not proj_rows:
+            st.info("No players in this section yet.")
+        elif not proj_left:
+            st.info("All rounds are scored; the standings are final.")
+            st.dataframe(proj_rows, use_container_width=True, hide_index=True)
+        else:
+            st.write(f"Rounds still to play: {', '.join(str(r) for r in proj_left)} · {int(proj_sims)} simulations")
+            st.dataframe(proj_rows, use_container_width=True, hide_index=True)
+            with st.expander("Position probabilities (top places)"):
+                k = min(int(proj_top), proj_probs.shape[1])
+                st.dataframe(
+                    [{"Speler": r["Speler"], **{f"{p + 1}": round(float(proj_probs[i, p]), 3) for p in range(k)}}
+                     for i, r in enumerate(proj_rows)],
+                    use_container_width=True, hide_index=True,
+                )
+
 # -------- Import / Export --------
-with tab_io:
+@st.cache_data(max_entries=4, show_spinner="Reading workbook…")
+def _parse_player_upload(digest: str, _data: bytes):
+    """Parse + clean an uploaded workbook once per distinct upload (keyed on its hash)."""
+    from excel_io import parse_players_workbook, normalise_players
+    sheet_names, df = parse_players_workbook(_data)
+    return sheet_names, (normalise_players(df) if df is not None else None)
+
+
+@st.cache_data(max_entries=4, show_spinner="Building workbook…")
+def _export_workbook(state_hash: str, _state: dict) -> bytes:
+    from excel_io import build_export_workbook
+    return build_export_workbook(_state)
+
+
+with tab_io, prof.span("tab: Import/Export"):
     st.subheader("Import / Export")
     if st.session_state.get("pairings_dirty_any"):
         st.warning("Unsaved pairings detected in Schedule. Save or clear them before leaving.")
@@ -1429,75 +1695,26 @@ with tab_io:
 
     if up is not None:
         try:
-            xls = pd.ExcelFile(up, engine="openpyxl")
-            st.caption(f"Sheets found: {', '.join(xls.sheet_names)}")
-
-            # Helpers
-            def norm_cols(df):
-                return {c.strip().lower(): c for c in map(str, df.columns)}
-
-            def try_players_sheet():
-                # Expect a sheet named "Players" with: Speler nr | Speler | Sek
-                if "Players" in xls.sheet_names:
-                    df = pd.read_excel(xls, sheet_name="Players", engine="openpyxl")
-                    cols = norm_cols(df)
-                    idc  = cols.get("speler nr") or cols.get("player #") or cols.get("player id") or cols.get("#")
-                    namec = cols.get("speler") or cols.get("name")
-                    sekc = cols.get("sek") or cols.get("section") or cols.get("seksie") or cols.get("seksie 1/2")
-                    if idc and namec and sekc:
-                        out = df[[idc, namec, sekc]].rename(columns={idc:"Speler nr", namec:"Speler", sekc:"Sek"})
-                        return out
-                return None
-
-            def try_punte_sheets():
-                # Look for "Punte Sek 1" / "Punte Sek 2" style sheets
-                frames = []
-                for sh in xls.sheet_names:
-                    low = sh.lower().replace(" ", "")
-                    if any(k in low for k in ["puntesek1", "seksie1", "sek1"]) or any(k in low for k in ["puntesek2", "seksie2", "sek2"]):
-                        df = pd.read_excel(xls, sheet_name=sh, engine="openpyxl")
-                        cols = norm_cols(df)
-                        idc  = cols.get("speler nr") or cols.get("player #") or cols.get("player id") or cols.get("#")
-                        namec = cols.get("speler") or cols.get("name")
-                        if idc and namec:
-                            sek = "SEKSIE 2" if any(k in low for k in ["2","sek2","seksie2","puntesek2"]) else "SEKSIE 1"
-                            out = df[[idc, namec]].rename(columns={idc:"Speler nr", namec:"Speler"})
-                            out["Sek"] = sek
-                            frames.append(out)
-                if frames:
-                    return pd.concat(frames, ignore_index=True)
-                return None
-
-            players_df = try_players_sheet()
-            if players_df is None:
-                players_df = try_punte_sheets()
+            data = up.getvalue()
+            sheet_names, players_df = _parse_player_upload(hashlib.sha1(data).hexdigest(), data)
+            st.caption(f"Sheets found: {', '.join(sheet_names)}")
 
             if players_df is None:
                 st.info("No compatible sheet found. Expected either a 'Players' sheet "
                         "with columns **Speler nr, Speler, Sek**, or Punte sheets for Sek 1/2.")
             else:
-                # Clean up rows
-                players_df = players_df.dropna(subset=["Speler","Speler nr"])
-                players_df["Speler nr"] = players_df["Speler nr"].astype(int)
-                players_df["Speler"] = players_df["Speler"].astype(str).str.strip()
-                players_df["Sek"] = players_df["Sek"].astype(str).str.upper().str.replace(" ", "")
-                players_df["Sek"] = players_df["Sek"].replace({"SEKSIE1":"SEKSIE 1","SEKSIE2":"SEKSIE 2","SEK1":"SEKSIE 1","SEK2":"SEKSIE 2"})
-
                 st.success(f"Detected {len(players_df)} players:")
                 st.dataframe(players_df, use_container_width=True, hide_index=True)
 
                 if st.button("Import players", key="io_import_players"):
-                    count = 0
-                    for _, row in players_df.iterrows():
-                        pid = int(row["Speler nr"])
-                        name = row["Speler"]
-                        sek  = row["Sek"] if row["Sek"] in ("SEKSIE 1","SEKSIE 2") else "SEKSIE 1"
-                        if name and pid > 0:
-                            store.state["players"][str(pid)] = {"name": name, "section": sek}
-                            count += 1
+                    from excel_io import players_records
+                    records = players_records(players_df)
+                    store.state["players"].update(records)
                     store.save()
-                    st.toast(f"Imported {count} players", icon="✅")
+                    st.toast(f"Imported {len(records)} players", icon="✅")
 
+        except ImportError as e:
+            st.error(f"Missing dependency for Excel import ({e.name}). Install with:  pip install pandas openpyxl")
         except Exception as e:
             st.exception(e)
 
@@ -1505,66 +1722,19 @@ with tab_io:
 
     # ---- Export workbook ----
     if st.button("Download Export Workbook", key="io_exp_btn"):
-        # Gather data in-memory and write with openpyxl (no extra deps)
-        out = io.BytesIO()
-
-        with pd.ExcelWriter(out, engine="openpyxl") as writer:
-            # Players
-            players = [{"Speler nr": int(k), "Speler": v["name"], "Sek": v["section"]}
-                       for k, v in store.state.get("players", {}).items()]
-            if players:
-                pd.DataFrame(players).sort_values("Speler nr").to_excel(writer, sheet_name="Players", index=False)
-            else:
-                pd.DataFrame(columns=["Speler nr","Speler","Sek"]).to_excel(writer, sheet_name="Players", index=False)
-
-            # Pairings
-            rows = []
-            for key, prs in store.state.get("pairings", {}).items():
-                sek, rnd = key.split(":"); rnd = int(rnd)
-                for pr in prs:
-                    rows.append({"Sek": sek, "Round": rnd, "Rink": pr["rink"], "A_id": pr["a_id"], "B_id": pr["b_id"]})
-            pd.DataFrame(rows).to_excel(writer, sheet_name="Pairings", index=False)
-
-            # Standings per section + Combined
-            sections = store.state.get("sections", ["SEKSIE 1","SEKSIE 2"])
-            rules = store.state.get("rules", {})
-            tiebreakers = rules.get("TIEBREAKERS", ["Total","Verskil","Player#"])
-
-            def to_df(table):
-                return pd.DataFrame([{
-                    "#": r.player_id,
-                    "Speler": r.name,
-                    "Sek": getattr(r, "section", None),
-                    "Verskil": r.verskil,
-                    "Punte": r.punte,
-                    "Bonus": getattr(r, "bonus", 0),
-                    "Total": r.punte + getattr(r, "bonus", 0),
-                    "Posisie": i + 1
-                } for i, r in enumerate(table)])
-
-            # Per-section
-            for sek in sections:
-                tbl = compute_standings(store.state, sek, rules, tiebreakers)
-                to_df(tbl).drop(columns=["Sek"]).to_excel(writer, sheet_name=f"Standings {sek}", index=False)
-
-            # Combined
-            all_rows = []
-            for sek in sections:
-                all_rows.extend(compute_standings(store.state, sek, rules, tiebreakers))
-            from engine import sort_standings
-            combined = sort_standings(all_rows, tiebreakers)
-            to_df(combined).to_excel(writer, sheet_name="Combined", index=False)
-
+        # Built once per state version; repeat downloads are served from cache
+        snap = json.dumps(store.state, sort_keys=True, ensure_ascii=False)
+        xlsx = _export_workbook(hashlib.sha1(snap.encode("utf-8")).hexdigest(), store.state)
         st.download_button(
             "Download .xlsx",
-            data=out.getvalue(),
+            data=xlsx,
             file_name=f"rolbal_export_{dt.datetime.now().date()}.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             key="io_exp_dl",
         )
 
 # -------- Tools --------
-with tab_tools:
+with tab_tools, prof.span("tab: Tools"):
     st.subheader("Tools")
     # Cloud/DB section
     if SUPABASE_CONFIGURED and _user and _user.get("id"):
@@ -1603,6 +1773,59 @@ with tab_tools:
         store.log("unlock_round", {"section": sec, "round": int(rnd)})
         store.save()
         st.success("Round unlocked")
+    st.markdown("### Consistency")
+    st.caption("Double bookings across sections, repeat opponents, games without a rink, missing or orphaned "
+               "scores, scores that don't mirror and per-end totals that disagree. Also runs after every save.")
+    _issues = validate_event(_event())
+    st.session_state["event_issues"] = _issues
+    if not _issues:
+        st.success("No issues found.")
+    else:
+        _by_kind = {k: sum(1 for i in _issues if i.kind == k) for k in ISSUE_KINDS}
+        st.warning(" · ".join(f"{k.replace('_', ' ')}: {n}" for k, n in _by_kind.items() if n))
+        with st.expander(f"Issues ({len(_issues)})"):
+            st.dataframe([{"Kind": i.kind.replace("_", " "), "Key": i.key, "Issue": i.message} for i in _issues],
+                         use_container_width=True, hide_index=True)
+    st.markdown("### Generation")
+    st.caption("Worker processes for \"Generate all sections\" on the Schedule tab, one section each. 0 uses them "
+               f"only above {PARALLEL_MIN_PLAYERS:,} players; `python -m bench.engine_bench` shows where they pay off.")
+    st.number_input("Worker processes (0 = automatic)", 0, max(1, os.cpu_count() or 1), 0, key="tl_gen_workers")
+    st.markdown("### Player ratings")
+    st.caption("Elo ratings update on every save from the entered scores. Rebuild replays the event round by round; "
+               "an archive file from `python -m ratings` sets everyone's starting rating by name.")
+    from ratings import player_ratings, rebuild_ratings, seed_from_archive
+    rc1, rc2 = st.columns([1, 2])
+    if rc1.button("Rebuild ratings", key="tl_rt_rebuild"):
+        n_games = rebuild_ratings(store.state)
+        store.log("rebuild_ratings", {"games": n_games})
+        st.success(f"Ratings rebuilt from {n_games} game(s).")
+    rt_file = rc2.file_uploader("Seed from archive ratings (.json)", type=["json"], key="tl_rt_archive")
+    if rt_file is not None and rc2.button("Apply archive ratings", key="tl_rt_seed"):
+        try:
+            matched = seed_from_archive(store.state, json.loads(rt_file.getvalue()))
+            store.log("seed_ratings", {"matched": matched})
+            st.success(f"Starting ratings set for {matched} player(s).")
+        except Exception as e:
+            st.error(f"Could not read archive ratings: {e}")
+    _rt = store.state.get("ratings", {}).get("players", {})
+    _rt_rows = []
+    for pid, r in player_ratings(store.state).items():
+        p = store.state["players"][str(pid)]
+        _rt_rows.append({"#": pid, "Speler": p["name"], "Sek": p["section"], "Rating": round(r, 1),
+                         "Games": int(_rt.get(str(pid), {}).get("n", 0))})
+    _rt_rows.sort(key=lambda row: -row["Rating"])
+    if _rt_rows:
+        with st.expander(f"Ratings ({len(_rt_rows)} players)"):
+            st.dataframe(_rt_rows, use_container_width=True, hide_index=True)
+
+    st.markdown("### Storage metrics")
+    st.caption("Process-wide I/O counters and latency histograms (all sessions since the server started).")
+    _snap = METRICS.snapshot()
+    mc1, mc2 = st.columns([1, 3])
+    mc1.download_button("Download metrics JSON", data=json.dumps(_snap, indent=2), file_name="storage_metrics.json",
+                        mime="application/json", key="tl_metrics_dl")
+    with mc2.expander("Show metrics"):
+        st.json(_snap, expanded=False)
     st.markdown("### Audit log")
     log = store.state.get("audit", [])[-100:]
     if log:
@@ -1610,3 +1833,6 @@ with tab_tools:
         st.table([{"When": dt.datetime.fromtimestamp(x["ts"]).strftime("%Y-%m-%d %H:%M:%S"), "Action": x["action"], "Details": str(x["payload"])[:80]} for x in reversed(log)])
     else:
         st.info("No actions logged yet.")
+
+prune(st.session_state)  # drop widget keys of the least recently used views (session_keys.MAX_VIEWS)
+prof.finish()
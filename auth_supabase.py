@@ -1,16 +1,30 @@
 from __future__ import annotations
 
+import importlib.util
 import os
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from typing import Optional, Dict, Any, TYPE_CHECKING
 
 import streamlit as st
 
-try:
-    from supabase import create_client, Client  # type: ignore
-except Exception:
-    create_client = None  # type: ignore
-    Client = None  # type: ignore
+if TYPE_CHECKING:  # pragma: no cover
+    from supabase import Client  # type: ignore
+
+
+@lru_cache(maxsize=1)
+def _create_client_fn():
+    """Import supabase on first use only; None if the package is missing."""
+    try:
+        from supabase import create_client  # type: ignore
+    except Exception:
+        return None
+    return create_client
+
+
+def _supabase_installed() -> bool:
+    # find_spec checks availability without paying for the import
+    return importlib.util.find_spec("supabase") is not None
 
 
 @dataclass
@@ -20,11 +34,19 @@ class AuthSession:
     refresh_token: Optional[str]
 
 
+def has_secrets() -> bool:
+    """True if a secrets.toml exists (checking `in st.secrets` without one shows an error)."""
+    try:
+        return bool(st.secrets.load_if_toml_exists())
+    except Exception:
+        return False
+
+
 def _get_supabase_keys() -> Optional[tuple[str, str]]:
     """Read Supabase URL and Anon key from Streamlit secrets or env vars."""
     url = None
     key = None
-    if "supabase" in st.secrets:
+    if has_secrets() and "supabase" in st.secrets:
         url = st.secrets["supabase"].get("url")
         key = st.secrets["supabase"].get("anon_key")
     url = url or os.getenv("SUPABASE_URL")
@@ -39,11 +61,11 @@ def diagnose_config() -> Dict[str, Any]:
 
     Does not include secret values.
     """
-    import_ok = create_client is not None
+    import_ok = _supabase_installed()
     secrets_present = False
     via = None
     try:
-        if "supabase" in st.secrets:
+        if has_secrets() and "supabase" in st.secrets:
             sb = st.secrets["supabase"]
             if isinstance(sb, dict) and sb.get("url") and sb.get("anon_key"):
                 secrets_present = True
@@ -70,11 +92,12 @@ def diagnose_config() -> Dict[str, Any]:
 
 def get_client() -> Optional["Client"]:
     """Return a Supabase client if configured, else None."""
-    if create_client is None:
-        return None
     keys = _get_supabase_keys()
     if not keys:
         return None
+    create_client = _create_client_fn()
+    if create_client is None:
+        return None
     url, key = keys
     try:
         return create_client(url, key)
@@ -82,10 +105,19 @@ def get_client() -> Optional["Client"]:
         return None
 
 
+@st.cache_resource(show_spinner=False)
+def is_configured() -> bool:
+    """Whether Supabase auth is usable; detected once per server process.
+
+    Without keys this never imports supabase at all.
+    """
+    return get_client() is not None
+
+
 def _redirect_url_default() -> Optional[str]:
     # Prefer Streamlit Cloud-provided base URL in secrets if set
     try:
-        if "supabase" in st.secrets:
+        if has_secrets() and "supabase" in st.secrets:
             v = st.secrets["supabase"].get("redirect_url")
             if v:
                 return str(v)
@@ -0,0 +1,9 @@
+"""
+Benchmarks for the Rolbal app. Run from the repository root, e.g.:
+
+    python -m bench.engine_bench --sizes 20,200,2000,20000 --out bench_results/engine.json
+    python -m bench.compare bench_results/base.json bench_results/engine.json
+
+Every runner writes the same JSON layout (see `bench.common.write_results`)
+so results from different commits can be compared with `bench.compare`.
+"""
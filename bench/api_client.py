@@ -0,0 +1,212 @@
+"""
+Concurrent client for the score API (`api_server.py`).
+
+    python -m bench.api_client --clients 16 --posts 50
+    python -m bench.api_client --batch-ms 0,5,25 --players 240 --out bench_results/api.json
+    python -m bench.api_client --url http://127.0.0.1:8765 --event event --posts 20
+
+Without --url a server is started in-process for each --batch-ms value on a
+scratch copy of a synthetic event, so the real data is never touched. Each
+client posts `--per-post` results per request to random paired rinks, then
+polls standings once per `--standings-every` posts.
+
+Reported per run: POST/GET latency percentiles, results per second, store
+saves (from the server's /metrics) and lost updates (a result whose latest
+value is missing from the final file; should always be 0).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from bench.common import parse_sizes, write_results
+from engine import slot_key
+
+
+def _pct(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    vs = sorted(values)
+    return vs[min(len(vs) - 1, int(round(q * (len(vs) - 1))))]
+
+
+def _request(url: str, body: Optional[Dict[str, Any]] = None) -> Tuple[int, Dict[str, Any]]:
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            return resp.status, json.loads(resp.read() or b"{}")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+
+def _rinks(state: Dict[str, Any]) -> List[Tuple[str, int, int, int]]:
+    out = []
+    for key, prs in state.get("pairings", {}).items():
+        sec, rnd = key.rsplit(":", 1)
+        if state.get("locks", {}).get(key):
+            continue
+        out.extend((sec, int(rnd), int(p["rink"]), int(p.get("sitting") or 1)) for p in prs if p.get("rink"))
+    return out
+
+
+def _client(idx: int, base: str, event: str, rinks, posts: int, per_post: int,
+            standings_every: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed * 1000 + idx)
+    post_lat, get_lat, writes, errors = [], [], [], 0
+    for seq in range(posts):
+        batch = []
+        for j in range(per_post):
+            sec, rnd, rink, sitting = rng.choice(rinks)
+            value = idx * 100000 + seq * 100 + j + 1  # unique per result
+            batch.append({"section": sec, "round": rnd, "rink": rink, "sitting": sitting,
+                          "a": {"vir": value, "teen": 0}})
+        t = time.perf_counter()
+        status, out = _request(f"{base}/events/{event}/scores", {"scores": batch})
+        post_lat.append(time.perf_counter() - t)
+        if status != 200:
+            errors += 1
+        else:
+            writes.extend({"key": slot_key(f"{b['section']}:{b['round']}", b["rink"], b["sitting"]),
+                           "value": b["a"]["vir"]} for b in batch)
+        if standings_every and (seq + 1) % standings_every == 0:
+            t = time.perf_counter()
+            _request(f"{base}/events/{event}/standings")
+            get_lat.append(time.perf_counter() - t)
+    return {"post": post_lat, "get": get_lat, "writes": writes, "errors": errors}
+
+
+def _lost_updates(state: Dict[str, Any], writes: List[Dict[str, Any]]) -> int:
+    # The server's apply order across clients is unknown here, so a key counts as
+    # lost only when its final value is none of the values posted for it.
+    by_key: Dict[str, List[Dict[str, Any]]] = {}
+    for w in writes:
+        by_key.setdefault(w["key"], []).append(w)
+    scores = state.get("scores", {})
+    lost = 0
+    for key, ws in by_key.items():
+        final = scores.get(key, {}).get("a", {}).get("vir")
+        if final not in {w["value"] for w in ws}:
+            lost += 1
+    return lost
+
+
+def run_once(base: str, event: str, state: Dict[str, Any], clients: int, posts: int, per_post: int,
+             standings_every: int, seed: int) -> Dict[str, Any]:
+    rinks = _rinks(state)
+    if not rinks:
+        raise SystemExit("event has no unlocked pairings to score")
+    _, before = _request(f"{base}/metrics")
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        outs = list(pool.map(
+            lambda i: _client(i, base, event, rinks, posts, per_post, standings_every, seed), range(clients)))
+    wall = time.perf_counter() - t0
+    _, after = _request(f"{base}/metrics")
+
+    def counter(snap, name):
+        return snap.get("counters", {}).get(name, 0)
+
+    post = [x for o in outs for x in o["post"]]
+    get = [x for o in outs for x in o["get"]]
+    results = sum(len(o["writes"]) for o in outs)
+    saves = counter(after, "local.save.calls") - counter(before, "local.save.calls")
+    return {
+        "post": post, "get": get, "writes": [w for o in outs for w in o["writes"]],
+        "summary": {
+            "clients": clients, "requests": len(post), "results": results,
+            "wall_s": round(wall, 3),
+            "results_per_s": round(results / wall, 1) if wall else 0.0,
+            "store_saves": saves,
+            "results_per_save": round(results / saves, 2) if saves else None,
+            "errors": sum(o["errors"] for o in outs),
+        },
+    }
+
+
+def _row(name: str, values: List[float], **extra) -> Dict[str, Any]:
+    return dict({
+        "bench": name, "n": len(values),
+        "min_s": min(values), "median_s": statistics.median(values),
+        "p90_s": _pct(values, 0.90), "p99_s": _pct(values, 0.99), "max_s": max(values),
+    }, **extra)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", help="target a running server instead of starting one")
+    ap.add_argument("--event", default="event", help="event id (with --url)")
+    ap.add_argument("--data-dir", default="data", help="server's data dir, to read pairings (with --url)")
+    ap.add_argument("--batch-ms", default="25", help="comma list; one in-process run per value")
+    ap.add_argument("--players", type=int, default=120, help="synthetic event size (in-process runs)")
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--posts", type=int, default=30, help="requests per client")
+    ap.add_argument("--per-post", type=int, default=1, help="results per request")
+    ap.add_argument("--standings-every", type=int, default=5, help="GET standings every N posts (0 = never)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+
+    runs: List[Tuple[str, Dict[str, Any]]] = []
+    if args.url:
+        base = args.url.rstrip("/")
+        with urllib.request.urlopen(f"{base}/events/{args.event}") as resp:
+            json.loads(resp.read())
+        # the API does not expose pairings; read them the same way the server does
+        from rolbal import load_event
+        state = load_event(os.path.join(args.data_dir, f"{args.event}.json"))
+        out = run_once(base, args.event, state, args.clients, args.posts, args.per_post,
+                       args.standings_every, args.seed)
+        runs.append(("remote", out))
+    else:
+        from api_server import make_server
+        from bench.synth import make_event
+        for batch_ms in parse_sizes(args.batch_ms):
+            tmp = tempfile.mkdtemp(prefix="rolbal_api_")
+            state = make_event(args.players, played_rounds=2, per_end=False, seed=args.seed)
+            with open(os.path.join(tmp, "bench.json"), "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            srv = make_server("127.0.0.1", 0, tmp, batch_ms)
+            threading.Thread(target=srv.serve_forever, daemon=True).start()
+            base = f"http://127.0.0.1:{srv.server_address[1]}"
+            try:
+                out = run_once(base, "bench", state, args.clients, args.posts, args.per_post,
+                               args.standings_every, args.seed)
+                from rolbal import load_event
+                out["summary"]["lost_updates"] = _lost_updates(load_event(os.path.join(tmp, "bench.json")), out["writes"])
+            finally:
+                srv.shutdown()
+                srv.server_close()
+                shutil.rmtree(tmp, ignore_errors=True)
+            runs.append((f"batch_{batch_ms}ms", out))
+
+    results = []
+    print(f"{'run':<16}{'req':>6}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'res/s':>9}{'saves':>7}{'res/save':>10}")
+    for name, out in runs:
+        s = out["summary"]
+        results.append(_row(f"api.{name}.post", out["post"], players=args.players, **s))
+        if out["get"]:
+            results.append(_row(f"api.{name}.standings", out["get"], players=args.players))
+        print(f"{name:<16}{s['requests']:>6}{statistics.median(out['post']) * 1e3:>9.1f}"
+              f"{_pct(out['post'], 0.9) * 1e3:>9.1f}{_pct(out['post'], 0.99) * 1e3:>9.1f}"
+              f"{s['results_per_s']:>9.1f}{s['store_saves']:>7}{str(s['results_per_save']):>10}")
+        if "lost_updates" in s or s["errors"]:
+            print(f"    errors={s['errors']} lost_updates={s.get('lost_updates', 'n/a')}")
+    write_results(args.out, "api_client", results, vars(args))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+"""
+Cold-start benchmark: time-to-first-paint of a brand-new session in a fresh
+interpreter, plus the import cost of the app's own modules.
+
+    python -m bench.cold_start --runs 5 --out bench_results/cold_start.json
+
+Each run starts a new Python process (nothing cached, nothing imported) and
+measures:
+
+  cold.import_app_modules  importing storage/engine/auth/... as app.py does
+  cold.first_render        AppTest.from_file("app.py").run() in guest mode,
+                           i.e. the full first script run of a new session
+
+It also records which heavy optional modules (pandas, openpyxl, xlsxwriter,
+supabase) ended up imported after the first render, so lazy imports can't
+silently regress.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+from bench.common import write_results
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("pandas", "openpyxl", "xlsxwriter", "supabase")
+
+_CHILD = r"""
+import json, os, shutil, sys, tempfile, time
+os.environ["REQUIRE_AUTH"] = "0"
+tmp = tempfile.mkdtemp()
+shutil.copyfile("data/event.json", os.path.join(tmp, "event.json"))
+os.environ["ROLBAL_DATA_PATH"] = os.path.join(tmp, "event.json")
+t = time.perf_counter()
+import streamlit, engine, storage, storage_supabase, auth_supabase, profiler, storage_metrics
+t_imp = time.perf_counter() - t
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=120)
+t = time.perf_counter()
+at.run()
+t_run = time.perf_counter() - t
+shutil.rmtree(tmp, ignore_errors=True)
+print(json.dumps({"import": t_imp, "first_render": t_run, "errors": len(at.exception),
+                  "heavy": [m for m in HEAVY if m in sys.modules]}))
+"""
+
+
+def _one_run() -> Dict[str, Any]:
+    code = f"HEAVY = {HEAVY!r}\n" + _CHILD
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _row(name: str, values: List[float]) -> Dict[str, Any]:
+    return {"bench": name, "players": 0, "repeat": len(values), "min_s": min(values),
+            "median_s": statistics.median(values), "max_s": max(values)}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+
+    runs = [_one_run() for _ in range(max(1, args.runs))]
+    results = [
+        _row("cold.import_app_modules", [r["import"] for r in runs]),
+        _row("cold.first_render", [r["first_render"] for r in runs]),
+    ]
+    heavy = sorted({m for r in runs for m in r["heavy"]})
+    for r in results:
+        print(f"{r['bench']:<28} median {r['median_s'] * 1e3:8.1f} ms   min {r['min_s'] * 1e3:8.1f} ms")
+    print("heavy modules loaded on first render:", ", ".join(heavy) or "none")
+    errors = sum(r["errors"] for r in runs)
+    if errors:
+        print(f"warning: {errors} script exception(s) during first render")
+    write_results(args.out, "cold_start", results, {"runs": len(runs), "heavy_modules_loaded": heavy, "errors": errors})
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+"""Shared timing, memory and result-file helpers for the benchmark runners."""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+
+def parse_sizes(text: str) -> List[int]:
+    return [int(x) for x in text.replace(" ", "").split(",") if x]
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5, trace_memory: bool = True) -> Dict[str, Any]:
+    """Time `fn` `repeat` times, then do one extra traced run for peak memory.
+
+    Memory is measured separately because tracemalloc slows allocation-heavy code.
+    """
+    times = []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    out = {
+        "repeat": len(times),
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "max_s": max(times),
+    }
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        out["peak_kib"] = round(peak / 1024, 1)
+    return out
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def write_results(path: Optional[str], suite: str, results: List[Dict[str, Any]], params: Optional[Dict] = None) -> Dict:
+    """Write `{"meta": ..., "results": [...]}` to `path` (or just return it when path is None).
+
+    Each result row needs at least "bench" and "players"; timings are in seconds.
+    """
+    doc = {
+        "meta": {
+            "suite": suite,
+            "commit": _git_rev(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "params": params or {},
+        },
+        "results": results,
+    }
+    if path:
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+    return doc
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    print(f"{'bench':<34}{'players':>9}{'median ms':>12}{'min ms':>10}{'peak KiB':>11}")
+    for r in results:
+        print(f"{r['bench']:<34}{r['players']:>9}{r['median_s'] * 1e3:>12.2f}"
+              f"{r['min_s'] * 1e3:>10.2f}{r.get('peak_kib', float('nan')):>11.1f}")
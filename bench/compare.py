@@ -0,0 +1,47 @@
+"""
+Compare two benchmark result files (same layout as `bench.common.write_results`).
+
+    python -m bench.compare base.json new.json [--threshold 1.2]
+
+Prints the median-time ratio per (bench, players) and exits with status 1 if
+any benchmark got slower than the threshold, so it can gate a CI job.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Dict, Tuple
+
+
+def _index(path: str) -> Dict[Tuple[str, int], dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    return {(r["bench"], int(r["players"])): r for r in doc.get("results", [])}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("base")
+    ap.add_argument("new")
+    ap.add_argument("--threshold", type=float, default=1.2, help="flag new/base median ratios above this")
+    args = ap.parse_args(argv)
+
+    base, new = _index(args.base), _index(args.new)
+    regressions = 0
+    print(f"{'bench':<34}{'players':>9}{'base ms':>11}{'new ms':>11}{'ratio':>8}")
+    for key in sorted(set(base) & set(new)):
+        b, n = base[key]["median_s"], new[key]["median_s"]
+        ratio = n / b if b > 0 else float("inf")
+        flag = ""
+        if ratio > args.threshold:
+            regressions += 1
+            flag = "  <-- slower"
+        print(f"{key[0]:<34}{key[1]:>9}{b * 1e3:>11.2f}{n * 1e3:>11.2f}{ratio:>8.2f}{flag}")
+    for key in sorted(set(new) - set(base)):
+        print(f"{key[0]:<34}{key[1]:>9}{'—':>11}{new[key]['median_s'] * 1e3:>11.2f}{'new':>8}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,153 @@
+"""
+Time the engine functions on synthetic events of increasing size.
+
+    python -m bench.engine_bench                       # default ladder 20..20,000
+    python -m bench.engine_bench --sizes 200,2000 --repeat 3 --out bench_results/engine.json
+
+Whole-field benchmarks (build_history, sort_standings, swiss_pairs,
+strong_vs_strong_pairs, dutch_swiss_pairs) use every player, as the Finals mode does.
+Per-section ones (compute_standings, round_robin_pairs, rink assignment)
+use the first section, as the Schedule tab does; `compute_standings_all`
+covers every section as the Standings tab does. The `*_event` variants run
+on an already parsed event_model.Event (the app keeps one per saved version);
+`event_from_state` is that parse. `project_section` runs
+2000 Monte Carlo completions of the first section after two played rounds.
+`knockout_create` seeds the whole field into one knockout draw with a plate;
+`knockout_sync` is what every save then pays for that draw (bracket.py).
+`generate_all_sections` builds the next round of every section in this
+process, `generate_all_sections_pool` in spawned workers (one per section, at
+most one per CPU); where the pool gets faster is where PARALLEL_MIN_PLAYERS
+belongs on that machine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+from typing import Any, Callable, Dict, List, Tuple
+
+import bracket
+import engine
+from event_model import Event
+from bench.common import measure, parse_sizes, print_table, write_results
+from bench.synth import make_event, section_players
+from player_index import PlayerIndex
+
+DEFAULT_SIZES = "20,200,2000,20000"
+
+
+def _cases(state: Dict[str, Any]) -> List[Tuple[str, Callable[[], Any]]]:
+    rules = state["rules"]
+    tbs = rules["TIEBREAKERS"]
+    sec = state["sections"][0]
+    rounds = int(state["rounds"])
+    sec_ids = section_players(state, sec)
+
+    all_prs: Dict[int, List[Dict]] = {}
+    for s in state["sections"]:
+        for r in range(1, rounds + 1):
+            all_prs.setdefault(r, []).extend(state["pairings"].get(f"{s}:{r}", []))
+    history = engine.build_history(all_prs)
+
+    combined: List[engine.PlayerStanding] = []
+    for tbl in engine.compute_all_standings(state, rules, tbs).values():
+        combined.extend(tbl)
+    field = [r.player_id for r in engine.sort_standings(combined, tbs)]
+    rng = random.Random(1)
+    shuffled = combined[:]
+    rng.shuffle(shuffled)
+
+    sec_pairs = engine.strong_vs_strong_pairs(engine.compute_standings(state, sec, rules, tbs), history)
+    lmap = engine.last_rink_map(state, sec, rounds + 1)
+    usage = engine.rink_usage(state, sec, rounds + 1)
+
+    index = PlayerIndex(state)
+    event = Event.from_state(state)
+
+    def standings_all():
+        # parse the state once, then one pass for every section
+        engine.compute_all_standings(Event.from_state(state), rules, tbs)
+
+    # projections need rounds left to play: keep the first two rounds only
+    partial = dict(state,
+                   pairings={k: v for k, v in state["pairings"].items() if int(k.rsplit(":", 1)[1]) <= 2},
+                   scores={k: v for k, v in state["scores"].items() if engine.parse_slot_key(k)[1] <= 2})
+
+    def project():
+        from projections import project_section
+        project_section(partial, sec, sims=2000, seed=1)
+
+    def ko_state() -> Dict[str, Any]:
+        return dict(state, pairings=dict(state["pairings"]), brackets={})
+
+    ko = ko_state()
+    pool = max(2, min(len(state["sections"]), os.cpu_count() or 1))
+    bracket.create_knockout(ko, "KO", field, plate="KO Plate")
+
+    return [
+        ("compute_standings", lambda: engine.compute_standings(state, sec, rules, tbs)),
+        ("compute_standings_all", standings_all),
+        ("standings_history", lambda: engine.standings_history(state)),
+        ("event_from_state", lambda: Event.from_state(state)),
+        ("compute_standings_event", lambda: engine.compute_standings(event, sec, rules, tbs)),
+        ("compute_all_standings_event", lambda: engine.compute_all_standings(event, rules, tbs)),
+        ("standings_history_event", lambda: engine.standings_history(event)),
+        ("validate_event", lambda: engine.validate_event(event)),
+        ("sort_standings", lambda: engine.sort_standings(shuffled, tbs)),
+        ("build_history", lambda: engine.build_history(all_prs)),
+        ("swiss_pairs", lambda: engine.swiss_pairs(field, history)),
+        ("strong_vs_strong_pairs", lambda: engine.strong_vs_strong_pairs(combined, history)),
+        ("dutch_swiss_pairs", lambda: engine.dutch_swiss_pairs(combined, history)),
+        ("round_robin_pairs", lambda: engine.round_robin_pairs(sec_ids)),
+        ("round_robin_round", lambda: engine.round_robin_round(sec_ids, rounds)),
+        ("assign_rinks_with_preferences",
+         lambda: engine.assign_rinks_with_preferences(int(state["rinks"]), sec_pairs, lmap)),
+        # the same section squeezed onto 7 rinks: several sittings per round
+        ("assign_rink_slots", lambda: engine.assign_rink_slots(7, sec_pairs, lmap, usage)),
+        ("project_section", project),
+        ("generate_all_sections",
+         lambda: engine.generate_all_sections(state, rounds + 1, "strong", random.Random(1), workers=1)),
+        ("generate_all_sections_pool",
+         lambda: engine.generate_all_sections(state, rounds + 1, "strong", random.Random(1), workers=pool)),
+        ("knockout_create", lambda: bracket.create_knockout(ko_state(), "KO", field, plate="KO Plate")),
+        ("knockout_sync", lambda: bracket.sync_brackets(ko)),
+        ("player_index_build", lambda: PlayerIndex(state)),
+        ("player_usage_scan", lambda: [pr for prs in state["pairings"].values() for pr in prs
+                                       if field[-1] in (pr.get("a_id"), pr.get("b_id"))]),
+        ("player_usage_index", lambda: index.games(field[-1])),
+    ]
+
+
+def run(sizes: List[int], repeat: int, only: List[str], seed: int) -> List[Dict[str, Any]]:
+    results = []
+    for n in sizes:
+        state = make_event(n, seed=seed)
+        for name, fn in _cases(state):
+            if only and name not in only:
+                continue
+            row = {"bench": name, "players": n, "sections": len(state["sections"])}
+            row.update(measure(fn, repeat=repeat))
+            results.append(row)
+    return results
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated player counts")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", default="", help="comma-separated benchmark names")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default=None, help="write JSON results here")
+    args = ap.parse_args(argv)
+
+    sizes = parse_sizes(args.sizes)
+    only = [x for x in args.only.split(",") if x]
+    results = run(sizes, args.repeat, only, args.seed)
+    print_table(results)
+    write_results(args.out, "engine", results, {"sizes": sizes, "repeat": args.repeat, "seed": args.seed})
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
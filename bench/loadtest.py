@@ -0,0 +1,213 @@
+"""
+Concurrent-scorer load test built on Streamlit's AppTest and the local store.
+
+    python -m bench.loadtest --sessions 8 --interactions 25
+    python -m bench.loadtest --sessions 16 --players 120 --out bench_results/load.json
+
+Each session is a separate process running `app.py` headless (guest mode,
+`REQUIRE_AUTH=0`) against a scratch copy of `data/event.json` (or a
+synthetic event with --players), so the real file is never touched. It
+loops over a weighted mix of interactions:
+
+  score        pick a section/round, type a unique score into a random rink, Save
+  generate     Generate the last round of a section (strong vs strong)
+  leaderboard  switch the Leaderboard view
+
+Reported: latency percentiles per interaction, overall throughput, and lost
+updates. A lost update is a confirmed rink save whose value is missing
+from the final file although no later save touched that rink. Every save
+rewrites the whole file from the session's own copy, so concurrent saves
+to different rinks can clobber each other.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from bench.common import write_results
+from session_keys import view_prefix
+from storage import Store
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+MIX = (("score", 0.7), ("leaderboard", 0.2), ("generate", 0.1))
+
+
+def _pct(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    vs = sorted(values)
+    return vs[min(len(vs) - 1, int(round(q * (len(vs) - 1))))]
+
+
+def _read_state(path: str, tries: int = 20) -> Dict[str, Any]:
+    """Read the event file, retrying while another session is mid-write."""
+    for _ in range(tries - 1):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except ValueError:
+            time.sleep(0.05)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _session(idx: int, data_path: str, interactions: int, seed: int, timeout: float) -> Dict[str, Any]:
+    os.environ["ROLBAL_DATA_PATH"] = data_path
+    os.environ["REQUIRE_AUTH"] = "0"
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed * 1000 + idx)
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    t0 = time.perf_counter()
+    at.run()
+    lat: Dict[str, List[float]] = {"first_render": [time.perf_counter() - t0]}
+    writes: List[Dict[str, Any]] = []
+    errors = 0
+    messages: List[str] = []
+
+    state = _read_state(data_path)
+    sections = state["sections"]
+    rounds = int(state["rounds"])
+    names, weights = zip(*MIX)
+
+    for seq in range(interactions):
+        kind = rng.choices(names, weights)[0]
+        sec = rng.choice(sections)
+        try:
+            t = time.perf_counter()
+            if kind == "score":
+                # score a round that has pairings; "generate" owns the last round
+                keys = _read_state(data_path).get("pairings", {})
+                played = [r for r in range(1, max(2, rounds)) if keys.get(f"{sec}:{r}")]
+                rnd = rng.choice(played) if played else 1
+                at.selectbox(key="scor_sec").set_value(sec)
+                at.number_input(key="scor_round").set_value(rnd)
+                at.run()
+                saves = [b for b in at.button if str(b.key).startswith(f"save_rink_{sec}_{rnd}_")]
+                if not saves:
+                    kind = "score_no_pairings"
+                else:
+                    btn = rng.choice(saves)
+                    tag = str(btn.key)[len(f"save_rink_{sec}_{rnd}_"):]  # "4", or "4_2" in sitting 2
+                    rink, _, sitting = tag.partition("_")
+                    value = idx * 100000 + seq + 1  # unique per write
+                    view = view_prefix("score", sec, rnd)  # the Scores tab's widget keys (session_keys)
+                    at.number_input(key=f"{view}_va_{tag}").set_value(value)
+                    at.number_input(key=f"{view}_ta_{tag}").set_value(0)
+                    at.button(key=btn.key).click()
+                    at.run()
+                    key = Store.key_score(sec, rnd, int(rink), int(sitting or 1))
+                    writes.append({"key": key, "value": value, "t": time.time()})
+            elif kind == "generate":
+                at.number_input(key="sc_round_combined").set_value(rounds)
+                at.selectbox(key=f"gen_mode_{sec}").set_value("Strong vs Strong (standings, no repeats)")
+                at.run()
+                at.button(key=f"gen_go_{sec}").click()
+                at.run()
+            else:
+                at.selectbox(key="lb_view").set_value(rng.choice(["Combined"] + sections))
+                at.run()
+            lat.setdefault(kind, []).append(time.perf_counter() - t)
+            if at.exception:
+                errors += 1
+                messages.append(f"{kind}: {at.exception[0].value}"[:200])
+                at.run()  # a failed run leaves no widgets behind; recover for the next step
+        except Exception as e:
+            errors += 1
+            messages.append(f"{kind}: {type(e).__name__}: {e}"[:200])
+            at.run()
+    return {"latency": lat, "writes": writes, "errors": errors, "messages": messages}
+
+
+def _lost_updates(data_path: str, writes: List[Dict[str, Any]]) -> int:
+    scores = _read_state(data_path).get("scores", {})
+    last_by_key: Dict[str, Dict[str, Any]] = {}
+    for w in writes:
+        cur = last_by_key.get(w["key"])
+        if cur is None or w["t"] >= cur["t"]:
+            last_by_key[w["key"]] = w
+    lost = 0
+    for key, w in last_by_key.items():
+        if scores.get(key, {}).get("a", {}).get("vir") != w["value"]:
+            lost += 1
+    return lost
+
+
+def run(sessions: int, interactions: int, players: int, seed: int, timeout: float) -> Dict[str, Any]:
+    tmp = tempfile.mkdtemp(prefix="rolbal_load_")
+    data_path = os.path.join(tmp, "event.json")
+    if players:
+        from bench.synth import make_event
+        with open(data_path, "w", encoding="utf-8") as f:
+            json.dump(make_event(players, played_rounds=1, per_end=False, seed=seed), f)
+    else:
+        shutil.copyfile("data/event.json", data_path)
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=sessions) as pool:
+        futs = [pool.submit(_session, i, data_path, interactions, seed, timeout) for i in range(sessions)]
+        outs = [f.result() for f in futs]
+    wall = time.perf_counter() - t0
+
+    lat: Dict[str, List[float]] = {}
+    writes: List[Dict[str, Any]] = []
+    for o in outs:
+        for k, v in o["latency"].items():
+            lat.setdefault(k, []).extend(v)
+        writes.extend(o["writes"])
+    lost = _lost_updates(data_path, writes)
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    results = []
+    for k, v in sorted(lat.items()):
+        results.append({
+            "bench": f"load.{k}", "players": players or 0, "n": len(v),
+            "min_s": min(v), "median_s": statistics.median(v),
+            "p90_s": _pct(v, 0.90), "p99_s": _pct(v, 0.99), "max_s": max(v),
+        })
+    n_interactions = sum(len(v) for k, v in lat.items() if k != "first_render")
+    summary = {
+        "sessions": sessions,
+        "interactions": n_interactions,
+        "wall_s": round(wall, 3),
+        "throughput_per_s": round(n_interactions / wall, 2) if wall else 0.0,
+        "rink_saves": len(writes),
+        "lost_updates": lost,
+        "errors": sum(o["errors"] for o in outs),
+        "error_samples": sorted({m for o in outs for m in o["messages"]})[:10],
+    }
+    return {"results": results, "summary": summary}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessions", type=int, default=8)
+    ap.add_argument("--interactions", type=int, default=20, help="per session")
+    ap.add_argument("--players", type=int, default=0, help="use a synthetic event of this size")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--timeout", type=float, default=60.0, help="AppTest per-run timeout (s)")
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+
+    out = run(args.sessions, args.interactions, args.players, args.seed, args.timeout)
+    print(f"{'interaction':<28}{'n':>6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for r in out["results"]:
+        print(f"{r['bench']:<28}{r['n']:>6}{r['median_s'] * 1e3:>10.1f}{r['p90_s'] * 1e3:>10.1f}{r['p99_s'] * 1e3:>10.1f}")
+    print(json.dumps(out["summary"], indent=2))
+    params = dict(vars(args))
+    params.update(out["summary"])
+    write_results(args.out, "loadtest", out["results"], params)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
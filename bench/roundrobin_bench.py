@@ -0,0 +1,75 @@
+"""
+Round-robin: fetching one round from the full schedule against computing it
+directly.
+
+    python -m bench.roundrobin_bench                       # 100, 1000, 4000 players
+    python -m bench.roundrobin_bench --sizes 1000 --round 7 --out bench_results/rr.json
+
+Per section size:
+
+  round_robin_pairs[k]   build every round with round_robin_pairs, index round k
+                         (what the Round-robin mode did before round_robin_round)
+  round_robin_round      the closed form: one O(n) round
+  iter_round_robin[:6]   the lazy generator, stopped after 6 rounds (an event day)
+  balanced / double      round_robin_round with A/B balancing, second-leg round
+
+Each direct result is checked against the full schedule before timing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+from typing import Any, Dict, List
+
+import engine
+from bench.common import measure, parse_sizes, write_results
+
+DEFAULT_SIZES = "100,1000,4000"
+
+
+def run(sizes: List[int], round_no: int, repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for n in sizes:
+        ids = list(range(1, n + 1))
+        k = min(round_no, n - 1 + n % 2) if n > 1 else 1
+        full = engine.round_robin_pairs(ids)
+        if engine.round_robin_round(ids, k) != full[k - 1]:
+            raise SystemExit(f"round_robin_round differs from round_robin_pairs at n={n}, round {k}")
+        if list(itertools.islice(engine.iter_round_robin(ids), 6)) != full[:6]:
+            raise SystemExit(f"iter_round_robin differs from round_robin_pairs at n={n}")
+        del full
+        cases = [
+            ("round_robin_pairs[k]", lambda: engine.round_robin_pairs(ids)[k - 1]),
+            ("round_robin_round", lambda: engine.round_robin_round(ids, k)),
+            ("iter_round_robin[:6]", lambda: list(itertools.islice(engine.iter_round_robin(ids), 6))),
+            ("round_robin_round balanced", lambda: engine.round_robin_round(ids, k, balanced=True)),
+            ("round_robin_round double", lambda: engine.round_robin_round(ids, len(ids) + k, double=True)),
+        ]
+        for name, fn in cases:
+            # the full schedule is O(n^2); a single timed run is plenty at large n
+            reps = 1 if name == "round_robin_pairs[k]" and n > 1000 else repeat
+            row = {"bench": f"roundrobin.{name}", "players": n, "round": k}
+            row.update(measure(fn, repeat=reps))
+            results.append(row)
+    return results
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default=DEFAULT_SIZES)
+    ap.add_argument("--round", type=int, default=5, help="round to fetch (clamped to the schedule)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+
+    results = run(parse_sizes(args.sizes), args.round, args.repeat)
+    print(f"{'bench':<40}{'players':>8}{'median ms':>12}{'peak KiB':>12}")
+    for r in results:
+        print(f"{r['bench']:<40}{r['players']:>8}{r['median_s'] * 1e3:>12.3f}{r['peak_kib']:>12.1f}")
+    write_results(args.out, "roundrobin_bench", results, vars(args))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+"""
+Swiss pairing shoot-out: the greedy adjacent pairers against the score-group
+(Dutch) engine over whole simulated events.
+
+    python -m bench.swiss_bench                          # 100, 1000, 5000 players, 7 rounds
+    python -m bench.swiss_bench --sizes 1000 --rounds 9 --out bench_results/swiss.json
+
+Each pairer plays its own event: pair from the current table, play every game
+(stronger hidden skill wins more often), update the table, repeat. Reported
+per pairer and field size:
+
+  pair ms      median time of one pairing call (the part that is benchmarked)
+  repeats      games between players who had already met
+  score gap    mean |Total_a - Total_b| at pairing time (0 = perfect score groups)
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+import engine
+from bench.common import parse_sizes, write_results
+
+DEFAULT_SIZES = "100,1000,5000"
+TIEBREAKERS = ["Total", "Verskil", "Player#"]
+
+
+def _swiss(rows, history):
+    return engine.swiss_pairs([r.player_id for r in rows], history)
+
+
+PAIRERS: Dict[str, Callable] = {
+    "swiss_pairs": _swiss,
+    "strong_vs_strong_pairs": engine.strong_vs_strong_pairs,
+    "dutch_swiss_pairs": engine.dutch_swiss_pairs,
+}
+
+
+def play_event(pairer: Callable, n: int, rounds: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    skill = {pid: rng.gauss(0.0, 1.0) for pid in range(1, n + 1)}
+    rows = {pid: engine.PlayerStanding(pid, f"P{pid}", "OPEN") for pid in skill}
+    history: Dict[int, set] = {pid: set() for pid in skill}
+    times: List[float] = []
+    repeats = 0
+    gaps: List[int] = []
+    for _ in range(rounds):
+        table = engine.sort_standings(list(rows.values()), TIEBREAKERS)
+        t = time.perf_counter()
+        pairs = pairer(table, history)
+        times.append(time.perf_counter() - t)
+        for a, b in pairs:
+            if a is None or b is None:
+                continue
+            ra, rb = rows[a], rows[b]
+            repeats += b in history[a]
+            gaps.append(abs((ra.punte + ra.bonus) - (rb.punte + rb.bonus)))
+            history[a].add(b); history[b].add(a)
+            diff = round(4 * (skill[a] - skill[b]) + rng.gauss(0.0, 6.0))
+            for me, d in ((ra, diff), (rb, -diff)):
+                dv, dp, db = engine.round_result(max(d, 0), max(-d, 0), {})
+                me.verskil += dv; me.punte += dp; me.bonus += db
+    return {
+        "pair_median_s": statistics.median(times), "pair_max_s": max(times),
+        "repeats": repeats, "score_gap": round(statistics.mean(gaps), 3) if gaps else 0.0,
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default=DEFAULT_SIZES)
+    ap.add_argument("--rounds", type=int, default=7)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+
+    results = []
+    print(f"{'pairer':<26}{'players':>8}{'pair ms':>10}{'max ms':>10}{'repeats':>9}{'score gap':>11}")
+    for n in parse_sizes(args.sizes):
+        for name, fn in PAIRERS.items():
+            r = play_event(fn, n, args.rounds, args.seed)
+            print(f"{name:<26}{n:>8}{r['pair_median_s'] * 1e3:>10.2f}{r['pair_max_s'] * 1e3:>10.2f}"
+                  f"{r['repeats']:>9}{r['score_gap']:>11.3f}")
+            # min/median keep the common result shape so bench.compare can diff runs
+            results.append(dict(r, bench=f"swiss.{name}", players=n, rounds=args.rounds,
+                                median_s=r["pair_median_s"], min_s=r["pair_median_s"]))
+    write_results(args.out, "swiss_bench", results, vars(args))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+"""
+Synthetic tournament generator for benchmarks.
+
+`make_event(n_players)` returns a state dict in the same JSON shape the app
+stores in `data/event.json`: players split into sections, pairings for every
+played round (rinks assigned per section), totals in `scores` and optional
+per-end data in `scores_per_end`.
+"""
+
+from __future__ import annotations
+
+import copy
+import random
+from typing import Any, Dict, List, Optional
+
+from storage import DEFAULT_STATE
+
+# A typical section on our greens; bigger fields get more sections
+SECTION_SIZE = 60
+
+
+def _play_ends(rng: random.Random, ends: int) -> List[Dict[str, int]]:
+    """One side scores 1-4 shots per end (bowls: only one side scores an end)."""
+    out = []
+    for _ in range(ends):
+        shots = rng.choice((1, 1, 1, 2, 2, 3, 4))
+        out.append({"a": shots, "b": 0} if rng.random() < 0.5 else {"a": 0, "b": shots})
+    return out
+
+
+def make_event(
+    n_players: int,
+    rounds: int = 6,
+    played_rounds: Optional[int] = None,
+    n_sections: Optional[int] = None,
+    ends: int = 18,
+    per_end: bool = True,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Build a realistic event with `n_players` spread over sections.
+
+    `played_rounds` (default: all) rounds get pairings and scores; rinks are
+    the minimum needed for the largest section.
+    """
+    rng = random.Random(seed)
+    n_sections = n_sections or max(2, -(-n_players // SECTION_SIZE))
+    sections = [f"SEKSIE {i}" for i in range(1, n_sections + 1)]
+    state = copy.deepcopy(DEFAULT_STATE)
+    state["event_name"] = f"SYNTH {n_players}"
+    state["sections"] = sections
+    state["rounds"] = rounds
+    state["rules"]["ENDS_PER_GAME"] = ends
+
+    by_sec: Dict[str, List[int]] = {s: [] for s in sections}
+    for pid in range(1, n_players + 1):
+        sec = sections[(pid - 1) % n_sections]
+        by_sec[sec].append(pid)
+        state["players"][str(pid)] = {"name": f"Player {pid}", "section": sec}
+    state["rinks"] = max(1, max((len(v) + 1) // 2 for v in by_sec.values()))
+
+    played = rounds if played_rounds is None else min(played_rounds, rounds)
+    for rnd in range(1, played + 1):
+        for sec, ids in by_sec.items():
+            ids = ids[:]
+            rng.shuffle(ids)
+            prs = []
+            for i in range(0, len(ids), 2):
+                a = ids[i]
+                b = ids[i + 1] if i + 1 < len(ids) else None
+                rink = i // 2 + 1
+                prs.append({"rink": rink, "a_id": a, "b_id": b})
+                if b is None:
+                    continue
+                ends_rows = _play_ends(rng, ends)
+                va = sum(e["a"] for e in ends_rows)
+                vb = sum(e["b"] for e in ends_rows)
+                key = f"{sec}:{rnd}:{rink}"
+                state["scores"][key] = {"a": {"vir": va, "teen": vb}, "b": {"vir": vb, "teen": va}}
+                if per_end:
+                    state["scores_per_end"][key] = {"n": ends, "ends": ends_rows}
+            state["pairings"][f"{sec}:{rnd}"] = prs
+    return state
+
+
+def section_players(state: Dict[str, Any], section: str) -> List[int]:
+    return sorted(int(k) for k, v in state["players"].items() if v["section"] == section)
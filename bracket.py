@@ -0,0 +1,347 @@
+"""
+Knockout brackets for finals day: single elimination seeded from the combined
+standings, with an optional plate (consolation) draw for the first-round losers.
+
+One compact record per bracket in state["brackets"]:
+
+    "Main": {
+        "kind": "main", "size": 16, "first_round": 7, "plate": "Plate",
+        "draw":  [12, 0, 31, ...],     # draw positions: player id, 0 = bye, null = not known yet
+        "won":   [null, 12, ...],      # won[m] = winner of match m (0 = nobody), index 0 unused
+        "slots": {"5": [3, 1]},        # scheduled matches -> [rink, sitting]
+        "open":  [5, 6]                # matches whose result can still change
+    }
+
+Matches are numbered as a heap: 1 is the final, matches 2m and 2m+1 feed
+match m, and match m's sides for m >= size/2 are draw positions 2m-size and
+2m+1-size. Bracket round r (1 = first) is played in event round
+first_round + r - 1 and its games are ordinary pairings under
+"<bracket>:<event round>", so rinks, score entry, the score API and the
+player index work on them unchanged. The standings skip bracket sections
+(event_model.Event.brackets).
+
+Byes go to the top seeds and advance without a game. A plate's draw position
+j is the loser of the main draw's first-round match size/2 + j (a bye's
+"loser" is a bye); the plate starts one event round after its main draw.
+
+`sync_brackets` runs before every save (storage.sync_derived). It only looks
+at the open matches, so advancing a finals day with many brackets costs the
+handful of games in play, not the whole draw. A match is scheduled on the
+first free rink (centre first) of its event round as soon as both sides are
+known. A drawn game does not advance anyone. A result can be corrected until
+the next match of the winner has a score; then it is locked.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from engine import _preferred_rink_order, slot_key, standings_tables
+
+MIN_PLATE_ENTRANTS = 2  # real first-round losers a plate needs: one alone would win it on byes
+
+
+def seed_order(size: int) -> List[int]:
+    """Seeds in draw order for a power-of-two draw: 8 -> [1, 8, 4, 5, 2, 7, 3, 6]."""
+    order = [1]
+    while len(order) < size:
+        n = 2 * len(order) + 1
+        order = [s for seed in order for s in (seed, n - seed)]
+    return order
+
+
+def qualifiers(state: Dict[str, Any], count: Optional[int] = None,
+               per_section: Optional[int] = None) -> List[int]:
+    """
+    Player ids in seeding order from the combined standings: the top `count`,
+    or the top `per_section` of every section (then ordered as combined).
+    """
+    tables = standings_tables(state)
+    combined = [r.player_id for r in tables.get("Combined", [])]
+    if per_section:
+        picked = {r.player_id for sec, tbl in tables.items() if sec != "Combined" for r in tbl[:per_section]}
+        combined = [pid for pid in combined if pid in picked]
+    return combined[:count] if count else combined
+
+
+def round_label(size: int, r: int) -> str:
+    left = size >> (r - 1)  # players left at the start of bracket round r
+    return {2: "Final", 4: "Semi-finals", 8: "Quarter-finals"}.get(left, f"Round of {left}")
+
+
+def _rounds(size: int) -> int:
+    return size.bit_length() - 1
+
+
+def match_round(br: Dict[str, Any], m: int) -> int:
+    """Bracket round of match m (1 = first round, _rounds(size) = final)."""
+    return _rounds(br["size"]) - (m.bit_length() - 1)
+
+
+def event_round(br: Dict[str, Any], m: int) -> int:
+    return int(br["first_round"]) + match_round(br, m) - 1
+
+
+def _side(br: Dict[str, Any], child: int) -> Optional[int]:
+    size = br["size"]
+    return br["draw"][child - size] if child >= size else br["won"][child]
+
+
+def sides(br: Dict[str, Any], m: int) -> Tuple[Optional[int], Optional[int]]:
+    return _side(br, 2 * m), _side(br, 2 * m + 1)
+
+
+# ---------------- creating ----------------
+
+def create_knockout(state: Dict[str, Any], name: str, seeds: List[int], plate: Optional[str] = None,
+                    first_round: Optional[int] = None) -> Set[str]:
+    """
+    Add a single-elimination draw for `seeds` (best first) and, if `plate` is
+    given, its plate draw (skipped when fewer than MIN_PLATE_ENTRANTS players
+    can lose a first-round game); schedule the first round. Returns the pairings keys
+    written. Raises ValueError for a name already in use, fewer than two
+    players, or a first round at or below a round with section pairings (the
+    knockout would share rinks with those games).
+    """
+    brackets = state.setdefault("brackets", {})
+    for n in (name, plate):
+        if n is not None and (not n or ":" in n or n in brackets or n in state.get("sections", [])):
+            raise ValueError(f"bracket name {n!r} is empty or already in use")
+    seeds = list(dict.fromkeys(int(p) for p in seeds if p))
+    if len(seeds) < 2:
+        raise ValueError("a knockout needs at least two players")
+    size = 1 << (len(seeds) - 1).bit_length()
+    first = int(first_round or int(state.get("rounds", 6)) + 1)
+    last_section_round = 0
+    for key, prs in state.get("pairings", {}).items():
+        sec, _, rnd = key.rpartition(":")
+        if prs and sec not in brackets and rnd.isdigit():
+            last_section_round = max(last_section_round, int(rnd))
+    if first <= last_section_round:
+        raise ValueError(f"the knockout must start after round {last_section_round}, the last round with pairings")
+    brackets[name] = {
+        "kind": "main", "size": size, "first_round": first, "plate": None,
+        "draw": [seeds[s - 1] if s <= len(seeds) else 0 for s in seed_order(size)],
+        "won": [None] * size, "slots": {}, "open": [],
+    }
+    if plate is not None and len(seeds) - size // 2 >= MIN_PLATE_ENTRANTS:  # first-round games with two players
+        brackets[name]["plate"] = plate
+        brackets[plate] = {
+            "kind": "plate", "size": size // 2, "first_round": first + 1, "source": name,
+            "draw": [None] * (size // 2), "won": [None] * (size // 2), "slots": {}, "open": [],
+        }
+    batch = _Batch()
+    for m in range(size // 2, size):
+        _resolve(state, name, m, batch)
+    return batch.keys
+
+
+def delete_bracket(state: Dict[str, Any], name: str) -> Set[str]:
+    """Remove a bracket (and its plate) with its pairings and scores. Returns the pairings keys removed."""
+    brackets = state.get("brackets") or {}
+    br = brackets.pop(name, None)
+    if br is None:
+        return set()
+    removed: Set[str] = set()
+    if br.get("plate") in brackets:
+        removed |= delete_bracket(state, br["plate"])
+    elif br.get("source") in brackets:
+        brackets[br["source"]]["plate"] = None
+    prefix = f"{name}:"
+    for key in [k for k in state.get("pairings", {}) if k.startswith(prefix)]:
+        del state["pairings"][key]
+        removed.add(key)
+    for store in ("scores", "scores_per_end"):
+        for key in [k for k in state.get(store, {}) if k.startswith(prefix)]:
+            del state[store][key]
+    return removed
+
+
+# ---------------- advancing ----------------
+
+class _Batch:
+    """What one create/sync call changed, plus the taken rink slots per event round it looked up."""
+    __slots__ = ("keys", "used", "low")
+
+    def __init__(self) -> None:
+        self.keys: Set[str] = set()
+        self.used: Dict[int, Set[Tuple[int, int]]] = {}
+        self.low: Dict[int, int] = {}  # event round -> lowest sitting that may have a free rink
+
+
+def _used_slots(state: Dict[str, Any], rnd: int, batch: _Batch) -> Set[Tuple[int, int]]:
+    used = batch.used.get(rnd)
+    if used is None:
+        used = batch.used[rnd] = set()
+        pairings = state.get("pairings", {})
+        for name in state.get("brackets", {}):
+            for pr in pairings.get(f"{name}:{rnd}", ()):
+                used.add((int(pr.get("rink") or 0), int(pr.get("sitting") or 1)))
+    return used
+
+
+def _free_slot(state: Dict[str, Any], rnd: int, batch: _Batch) -> Tuple[int, int]:
+    """First free (rink, sitting) in event round `rnd` across all brackets, centre rinks first."""
+    used = _used_slots(state, rnd, batch)
+    order = _preferred_rink_order(int(state.get("rinks", 0) or 0)) or [1]
+    sitting = batch.low.get(rnd, 1)
+    while True:
+        for rink in order:
+            if (rink, sitting) not in used:
+                used.add((rink, sitting))
+                batch.low[rnd] = sitting
+                return rink, sitting
+        sitting += 1
+
+
+def _schedule(state: Dict[str, Any], name: str, m: int, a: int, b: int, batch: _Batch) -> None:
+    br = state["brackets"][name]
+    rnd = event_round(br, m)
+    key = f"{name}:{rnd}"
+    rows = state.setdefault("pairings", {}).setdefault(key, [])
+    slot = br["slots"].get(str(m))
+    if slot is None:
+        rink, sitting = _free_slot(state, rnd, batch)
+        row: Dict[str, Any] = {"rink": rink, "a_id": a, "b_id": b}
+        if sitting > 1:
+            row["sitting"] = sitting
+        rows.append(row)
+        br["slots"][str(m)] = [rink, sitting]
+        br["open"].append(m)
+    else:
+        for row in rows:
+            if int(row.get("rink") or 0) == slot[0] and int(row.get("sitting") or 1) == slot[1]:
+                row["a_id"], row["b_id"] = a, b
+        if m not in br["open"]:
+            br["open"].append(m)
+    batch.keys.add(key)
+
+
+def _unschedule(state: Dict[str, Any], name: str, m: int, batch: _Batch) -> None:
+    br = state["brackets"][name]
+    slot = br["slots"].pop(str(m), None)
+    if slot is None:
+        return
+    rnd = event_round(br, m)
+    key = f"{name}:{rnd}"
+    rows = state.get("pairings", {}).get(key, [])
+    rows[:] = [r for r in rows
+               if (int(r.get("rink") or 0), int(r.get("sitting") or 1)) != (slot[0], slot[1])]
+    _used_slots(state, rnd, batch).discard((slot[0], slot[1]))
+    batch.low[rnd] = min(batch.low.get(rnd, 1), slot[1])
+    if m in br["open"]:
+        br["open"].remove(m)
+    batch.keys.add(key)
+
+
+def _resolve(state: Dict[str, Any], name: str, m: int, batch: _Batch) -> None:
+    """Re-evaluate match m after one of its sides changed."""
+    br = state["brackets"][name]
+    a, b = sides(br, m)
+    if a is None or b is None:
+        _unschedule(state, name, m, batch)
+        _set_winner(state, name, m, None, batch)
+    elif not a or not b:
+        _unschedule(state, name, m, batch)
+        _set_winner(state, name, m, a or b, batch)  # a bye (0 when both sides are byes)
+    else:
+        _schedule(state, name, m, a, b, batch)
+
+
+def _set_winner(state: Dict[str, Any], name: str, m: int, winner: Optional[int], batch: _Batch) -> None:
+    br = state["brackets"][name]
+    if br["won"][m] == winner:
+        return
+    br["won"][m] = winner
+    if m > 1:
+        _resolve(state, name, m // 2, batch)
+    plate = br.get("plate")
+    half = br["size"] // 2
+    if plate in state["brackets"] and m >= half:
+        a, b = sides(br, m)
+        loser = None if winner is None else (0 if not winner else (b if winner == a else a) or 0)
+        pb = state["brackets"][plate]
+        if pb["draw"][m - half] != loser:
+            pb["draw"][m - half] = loser
+            _resolve(state, plate, (pb["size"] + m - half) // 2, batch)
+
+
+def _result(state: Dict[str, Any], name: str, br: Dict[str, Any], m: int) -> Optional[int]:
+    """Winner of scheduled match m from its saved score; None if unplayed or drawn."""
+    slot = br["slots"].get(str(m))
+    if slot is None:
+        return None
+    sc = state.get("scores", {}).get(slot_key(f"{name}:{event_round(br, m)}", slot[0], slot[1]))
+    if not sc:
+        return None
+    try:
+        vir, teen = int(sc["a"].get("vir") or 0), int(sc["a"].get("teen") or 0)
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+    if vir == teen:
+        return None
+    a, b = sides(br, m)
+    return a if vir > teen else b
+
+
+def sync_brackets(state: Dict[str, Any], touched: Optional[Set[str]] = None) -> Set[str]:
+    """
+    Advance winners of the open matches from the saved scores. Returns the
+    pairings keys changed; they are also added to `touched` as they change, so
+    a caller still has them if this raises partway through.
+    """
+    batch = _Batch()
+    if touched is not None:
+        batch.keys = touched
+    brackets = state.get("brackets")
+    if not brackets:
+        return batch.keys
+    for name in list(brackets):
+        br = brackets.get(name)
+        if br is None:
+            continue
+        for m in list(br["open"]):
+            if str(m) in br["slots"]:
+                _set_winner(state, name, m, _result(state, name, br, m), batch)
+        # a result stays open until the winner's next match is scored (the final never locks)
+        br["open"] = [m for m in br["open"] if str(m) in br["slots"] and
+                      (m == 1 or br["won"][m] is None or br["won"][m // 2] is None
+                       or str(m // 2) not in br["slots"])]
+    return batch.keys
+
+
+# ---------------- display ----------------
+
+def bracket_rounds(state: Dict[str, Any], name: str) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """[(round label, [match rows]), ...] from the first round to the final."""
+    br = state["brackets"][name]
+    size = br["size"]
+    players = state.get("players", {})
+    scores = state.get("scores", {})
+
+    def label(pid: Optional[int]) -> str:
+        if pid is None:
+            return ""
+        return f"#{pid} {players.get(str(pid), {}).get('name', '')}".strip() if pid else "bye"
+
+    out = []
+    for r in range(1, _rounds(size) + 1):
+        rows = []
+        for m in range(size >> r, size >> (r - 1)):
+            a, b = sides(br, m)
+            slot = br["slots"].get(str(m))
+            rnd = event_round(br, m)
+            key = slot_key(f"{name}:{rnd}", slot[0], slot[1]) if slot else None
+            sc = (scores.get(key) or {}).get("a") if key else None
+            rows.append({
+                "match": m, "round": rnd, "a": a, "b": b, "A": label(a), "B": label(b),
+                "rink": slot[0] if slot else None, "sitting": slot[1] if slot else None, "key": key,
+                "score": f"{sc.get('vir', 0)}-{sc.get('teen', 0)}" if sc else "",
+                "winner": br["won"][m], "Winner": label(br["won"][m]),
+            })
+        out.append((round_label(size, r), rows))
+    return out
+
+
+__all__ = ["seed_order", "qualifiers", "round_label", "match_round", "event_round", "sides",
+           "create_knockout", "delete_bracket", "sync_brackets", "bracket_rounds"]
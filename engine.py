@@ -1,9 +1,13 @@
 # engine.py
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional, Set 
+from typing import Dict, List, NamedTuple, Tuple, Optional, Set
 import itertools
+import random
 from collections import defaultdict
 
+from event_model import as_event
+from ratings import player_rating
+
 @dataclass
 class PlayerStanding:
     player_id: int
@@ -12,6 +16,7 @@ class PlayerStanding:
     verskil: int = 0
     punte: int = 0
     bonus: int = 0
+    rating: float = 0.0
 
 def round_result(vir: int, teen: int, rules: Dict) -> Tuple[int, int, int]:
     """Return (verskil_delta, punte_delta, bonus_delta)."""
@@ -34,7 +39,7 @@ def sort_standings(rows: List[PlayerStanding], tiebreakers: List[str]) -> List[P
     """
     Sort by a variable-length list of tiebreakers.
     Supported keys:
-      - Total, Punte, Bonus, Verskil, Player#, Coinflip, Skips draw to Jack
+      - Total, Punte, Bonus, Verskil, Rating, Player#, Coinflip, Skips draw to Jack
     Notes:
       - Coinflip: deterministic pseudo-random by player_id (stable per event).
       - Skips draw to Jack: placeholder (0 for all) unless you later attach values.
@@ -58,6 +63,8 @@ def sort_standings(rows: List[PlayerStanding], tiebreakers: List[str]) -> List[P
                 parts.append(-r.bonus)
             elif tb == "Verskil":
                 parts.append(-r.verskil)
+            elif tb == "Rating":
+                parts.append(-r.rating)
             elif tb == "Player#":
                 parts.append(r.player_id)           # ascending
             elif tb == "Coinflip":
@@ -121,6 +128,52 @@ def round_robin_pairs(players: List[int]) -> List[List[Tuple[Optional[int], Opti
         ps = [ps[0]] + [ps[-1]] + ps[1:-1]
     return rounds
 
+def round_robin_round(
+    players: List[int],
+    round_no: int,
+    double: bool = False,
+    balanced: bool = False,
+) -> List[Tuple[Optional[int], Optional[int]]]:
+    """
+    One round of the circle-method schedule in O(n), without building the others.
+    By default this is exactly round_robin_pairs(players)[round_no - 1]: each
+    round turns the circle one place, so player ps[j] (j >= 1) sits at
+    position 1 + (j - 1 + r) % (n - 1) in round r + 1.
+      - double:   rounds n .. 2(n-1) replay the first leg with A and B swapped
+      - balanced: A/B alternate as evenly as the circle allows. Odd fields put
+                  the bye at the fixed position, so every player alternates
+                  round by round. In even fields nobody is A more than once
+                  more than B. Byes are returned as (player, None).
+    Rounds outside the schedule give [].
+    """
+    ps = list(players)
+    if len(ps) % 2:
+        ps = [None] + ps if balanced else ps + [None]
+    n = len(ps)
+    legs = n - 1
+    if legs < 1 or not 1 <= round_no <= legs * (2 if double else 1):
+        return []
+    r = (round_no - 1) % legs
+    second_leg = round_no > legs
+    tail = ps[1:]
+    # pair i is (position i, position n-1-i); position j >= 1 holds tail[(j - 1 - r) % legs]
+    pairs: List[Tuple[Optional[int], Optional[int]]] = [(ps[0], tail[(n - 2 - r) % legs])]
+    pairs.extend((tail[(i - 1 - r) % legs], tail[(n - 2 - i - r) % legs]) for i in range(1, n // 2))
+    if balanced:
+        # the fixed player alternates by round, the others by board
+        pairs = [(b, a) if (i == 0 and r % 2) or (i > 0 and i % 2) else (a, b)
+                 for i, (a, b) in enumerate(pairs)]
+        pairs = [(b, a) if a is None else (a, b) for a, b in pairs]
+    if second_leg:
+        pairs = [(a, b) if a is None or b is None else (b, a) for a, b in pairs]
+    return pairs
+
+def iter_round_robin(players: List[int], double: bool = False, balanced: bool = False):
+    """Lazily yield the rounds of round_robin_round, one O(n) round at a time."""
+    n = len(players) + len(players) % 2
+    for k in range(1, (n - 1) * (2 if double else 1) + 1):
+        yield round_robin_round(players, k, double, balanced)
+
 def rink_rotation(rinks: int, num_pairs: int, round_no: int) -> List[int]:
     """Return rink numbers for the pairs this round using cyclic rotation."""
     order = list(range(1, rinks+1))
@@ -137,60 +190,198 @@ def build_history(pairings_by_round: Dict[int, List[Dict]]) -> Dict[int, set]:
             hist[a].add(b); hist[b].add(a)
     return hist
 
-def compute_standings(state: Dict, section: str, rules: Dict, tiebreakers: List[str]) -> List[PlayerStanding]:
+def slot_key(pair_key: str, rink, sitting=1) -> str:
+    """
+    Score key for one game: "SEC:round:rink", plus ":sitting" from the second
+    sitting on (so events that fit their rinks keep their existing keys).
+    """
+    sitting = int(sitting or 1)
+    return f"{pair_key}:{rink}" if sitting <= 1 else f"{pair_key}:{rink}:{sitting}"
+
+def pair_slot_key(pair_key: str, pr: Dict) -> str:
+    """slot_key for a pairing row {rink, sitting?, a_id, b_id}."""
+    return slot_key(pair_key, pr.get("rink"), pr.get("sitting", 1))
+
+def parse_slot_key(key: str) -> Optional[Tuple[str, int, int, int]]:
+    """'SEKSIE 1:3:2' -> ('SEKSIE 1', 3, 2, 1); 'SEKSIE 1:3:2:2' -> (..., 2). None if malformed."""
+    bits = key.split(":")
+    if len(bits) not in (3, 4):
+        return None
+    try:
+        nums = [int(b) for b in bits[1:]]
+    except ValueError:
+        return None
+    return (bits[0], nums[0], nums[1], nums[2] if len(nums) == 3 else 1)
+
+def compute_standings(state, section: str, rules: Dict, tiebreakers: List[str]) -> List[PlayerStanding]:
     """
     Compute standings for one section, but read pairings from ALL sections.
     Only players whose home section == `section` are credited here.
     This handles cross-section finals stored under another section's pairings key.
+    `state` is the JSON state or an Event (event_model), parsed once either way.
     """
+    ev = as_event(state)
+    si = ev.section_ix.get(section)
     # init rows for this section's players only
     rows: Dict[int, PlayerStanding] = {}
-    section_players = set()
-    for pid_str, p in state["players"].items():
-        if p["section"] != section:
-            continue
-        pid = int(pid_str)
-        section_players.add(pid)
-        rows[pid] = PlayerStanding(player_id=pid, name=p["name"], section=section)
-
-    # aggregate across all sections, round by round
-    total_rounds = int(state.get("rounds", 6))
-    for r in range(1, total_rounds + 1):
-        # scan ALL pairings keys that match this round (e.g., "SEKSIE 1:3", "SEKSIE 2:3")
-        for key, prs in state.get("pairings", {}).items():
-            try:
-                sek_key, rnd_str = key.split(":")
-                if int(rnd_str) != r:
-                    continue
-            except Exception:
-                continue  # ignore malformed keys
+    for p in ev.players.values():
+        if p.section == si:
+            rows[p.id] = PlayerStanding(player_id=p.id, name=p.name, section=section,
+                                        rating=player_rating(ev.state, p.id))
 
-            for pr in prs:
-                a_id = pr.get("a_id"); b_id = pr.get("b_id"); rink = pr.get("rink")
-                if not a_id or not b_id or not rink:
-                    continue
+    # aggregate across all sections' pairings keys (finals may sit under another section)
+    for _, g, sc in ev.played():
+        # credit ONLY players who belong to the target `section`
+        ra, rb = rows.get(g.a), rows.get(g.b)
+        if ra is not None:
+            dv, dp, db = round_result(sc.a_vir, sc.a_teen, rules)
+            ra.verskil += dv; ra.punte += dp; ra.bonus += db
+        if rb is not None:
+            dv, dp, db = round_result(sc.b_vir, sc.b_teen, rules)
+            rb.verskil += dv; rb.punte += dp; rb.bonus += db
 
-                # scores are stored under the same section as the pairings key we are iterating
-                sc = state["scores"].get(f"{sek_key}:{r}:{rink}")
-                if not sc:
-                    continue
+    return sort_standings(list(rows.values()), tiebreakers)
 
-                va = int(sc.get("a", {}).get("vir", 0)); ta = int(sc.get("a", {}).get("teen", 0))
-                vb = int(sc.get("b", {}).get("vir", 0)); tb = int(sc.get("b", {}).get("teen", 0))
+def compute_all_standings(state, rules: Dict, tiebreakers: List[str]) -> Dict[str, List[PlayerStanding]]:
+    """
+    {section: standings} for every section in ONE pass over the pairings.
+    Same result as calling compute_standings per section (each player is credited
+    to their home section from whichever key the game is stored under), without
+    rescanning every section's games once per section. Takes a state or an Event.
+    """
+    ev = as_event(state)
+    rows: Dict[int, PlayerStanding] = {}
+    by_section: Dict[str, List[PlayerStanding]] = {sec: [] for sec in ev.sections[:ev.n_declared]}
+    for p in ev.players.values():
+        sec = ev.sections[p.section]
+        rows[p.id] = PlayerStanding(player_id=p.id, name=p.name, section=sec,
+                                    rating=player_rating(ev.state, p.id))
+        by_section.setdefault(sec, []).append(rows[p.id])
 
-                # Treat a 0-0 placeholder as "not played yet" (don't credit a draw)
-                if va == 0 and ta == 0 and vb == 0 and tb == 0:
-                    continue
+    for _, g, sc in ev.played():
+        # like compute_standings: players are credited from every key they appear under
+        ra, rb = rows.get(g.a), rows.get(g.b)
+        if ra is not None:
+            dv, dp, db = round_result(sc.a_vir, sc.a_teen, rules)
+            ra.verskil += dv; ra.punte += dp; ra.bonus += db
+        if rb is not None:
+            dv, dp, db = round_result(sc.b_vir, sc.b_teen, rules)
+            rb.verskil += dv; rb.punte += dp; rb.bonus += db
 
-                # credit ONLY players who belong to the target `section`
-                if a_id in section_players and a_id in rows:
-                    dv, dp, db = round_result(va, ta, rules)
-                    rows[a_id].verskil += dv; rows[a_id].punte += dp; rows[a_id].bonus += db
-                if b_id in section_players and b_id in rows:
-                    dv, dp, db = round_result(vb, tb, rules)
-                    rows[b_id].verskil += dv; rows[b_id].punte += dp; rows[b_id].bonus += db
+    return {sec: sort_standings(tbl, tiebreakers) for sec, tbl in by_section.items()}
 
-    return sort_standings(list(rows.values()), tiebreakers)
+def standings_tables(state) -> Dict[str, List[PlayerStanding]]:
+    """
+    {section: standings, ..., "Combined": standings} using the event's own rules,
+    from one pass over the games (see compute_all_standings).
+    """
+    ev = as_event(state)
+    rules = ev.rules
+    tiebreakers = rules.get("TIEBREAKERS", ["Total", "Verskil", "Player#"])
+    declared = set(ev.sections[:ev.n_declared])
+    out = {sec: tbl for sec, tbl in compute_all_standings(ev, rules, tiebreakers).items() if sec in declared}
+    out["Combined"] = sort_standings([r for tbl in out.values() for r in tbl], tiebreakers)
+    return out
+
+@dataclass
+class StandingsHistory:
+    """
+    Cumulative standings after every round, from one pass over the games
+    (see standings_history). Index r of each per-player list is the total
+    after rounds 1..r (index 0 = before round 1), so "as of round r",
+    position changes and position charts are lookups, not recomputations.
+    """
+    rounds: int
+    last_round: int                     # highest round with a played game (0 = none)
+    meta: Dict[int, Tuple[str, str, float]]    # pid -> (name, section, rating)
+    punte: Dict[int, List[int]]
+    bonus: Dict[int, List[int]]
+    verskil: Dict[int, List[int]]
+    order: Dict[str, List[List[int]]]   # group (section or "Combined") -> per round, ids best first
+    pos: Dict[str, List[Dict[int, int]]]  # group -> per round, {pid: position}
+
+    def _at(self, r: Optional[int]) -> int:
+        return self.rounds if r is None else max(0, min(int(r), self.rounds))
+
+    def row(self, pid: int, r: Optional[int] = None) -> PlayerStanding:
+        r = self._at(r)
+        name, section, rating = self.meta[pid]
+        return PlayerStanding(pid, name, section, self.verskil[pid][r], self.punte[pid][r],
+                              self.bonus[pid][r], rating)
+
+    def table(self, group: str, r: Optional[int] = None) -> List[PlayerStanding]:
+        """Standings of `group` as of round r (default: every round)."""
+        r = self._at(r)
+        return [self.row(pid, r) for pid in self.order.get(group, [[]] * (r + 1))[r]]
+
+    def position(self, group: str, pid: int, r: Optional[int] = None) -> Optional[int]:
+        return self.pos.get(group, [{}] * (self.rounds + 1))[self._at(r)].get(pid)
+
+    def movement(self, group: str, r: Optional[int] = None) -> Dict[int, int]:
+        """{pid: places gained in round r} (position after r-1 minus after r; + is up)."""
+        r = self._at(r)
+        if r < 1 or group not in self.pos:
+            return {}
+        before, now = self.pos[group][r - 1], self.pos[group][r]
+        return {pid: before[pid] - p for pid, p in now.items() if pid in before}
+
+    def position_history(self, group: str, pid: int) -> List[Optional[int]]:
+        """Position after rounds 1..last_round."""
+        return [self.position(group, pid, r) for r in range(1, self.last_round + 1)]
+
+
+def standings_history(state) -> StandingsHistory:
+    """
+    StandingsHistory for every section and "Combined" using the event's rules.
+    Games are credited exactly as compute_all_standings does, once, into the
+    round they belong to; cumulative sums and one sort per round and group
+    follow. The table after the last round equals standings_tables(state).
+    Takes a state or an Event.
+    """
+    ev = as_event(state)
+    rules = ev.rules
+    tiebreakers = rules.get("TIEBREAKERS", ["Total", "Verskil", "Player#"])
+    total_rounds = ev.rounds
+    sections = ev.sections[:ev.n_declared]
+    meta: Dict[int, Tuple[str, str, float]] = {
+        p.id: (p.name, ev.sections[p.section], player_rating(ev.state, p.id)) for p in ev.players.values()
+    }
+    width = total_rounds + 1
+    punte = {pid: [0] * width for pid in meta}
+    bonus = {pid: [0] * width for pid in meta}
+    verskil = {pid: [0] * width for pid in meta}
+
+    last = 0
+    for r, g, sc in ev.played():
+        last = max(last, r)
+        for pid, v, t in ((g.a, sc.a_vir, sc.a_teen), (g.b, sc.b_vir, sc.b_teen)):
+            if pid in meta:
+                dv, dp, db = round_result(v, t, rules)
+                verskil[pid][r] += dv; punte[pid][r] += dp; bonus[pid][r] += db
+
+    for series in (punte, bonus, verskil):
+        for vals in series.values():
+            for r in range(1, width):
+                vals[r] += vals[r - 1]
+
+    hist = StandingsHistory(total_rounds, last, meta, punte, bonus, verskil, {}, {})
+    groups: Dict[str, List[int]] = {sec: [] for sec in sections}
+    for pid, (_, sec, _) in meta.items():
+        if sec in groups:
+            groups[sec].append(pid)
+    groups["Combined"] = [pid for ids in list(groups.values()) for pid in ids]
+    for group, ids in groups.items():
+        hist.order[group], hist.pos[group] = [], []
+        for r in range(width):
+            if r > last:
+                # nothing played after `last`: same table, shared
+                hist.order[group].append(hist.order[group][-1])
+                hist.pos[group].append(hist.pos[group][-1])
+                continue
+            ranked = [row.player_id for row in sort_standings([hist.row(pid, r) for pid in ids], tiebreakers)]
+            hist.order[group].append(ranked)
+            hist.pos[group].append({pid: i + 1 for i, pid in enumerate(ranked)})
+    return hist
 
 # ---------------- New helpers (append to engine.py) ----------------
 
@@ -271,6 +462,58 @@ def assign_rinks_with_preferences(
             out.append({"rink": chosen, "a_id": a, "b_id": b})
     return out
 
+def rink_usage(state: Dict, section: str, round_no: int) -> Dict[int, int]:
+    """{rink -> games this section played on it} in rounds before `round_no`."""
+    out: Dict[int, int] = {}
+    for r in range(1, round_no):
+        for pr in state.get("pairings", {}).get(f"{section}:{r}", []):
+            rk = pr.get("rink")
+            if rk and pr.get("a_id") and pr.get("b_id"):
+                out[int(rk)] = out.get(int(rk), 0) + 1
+    return out
+
+def assign_rink_slots(
+    total_rinks: int,
+    pairs: List[Tuple[Optional[int], Optional[int]]],
+    last_rink: Dict[int, int],
+    usage: Optional[Dict[int, int]] = None,
+) -> List[Dict]:
+    """
+    Like assign_rinks_with_preferences, but when there are more games than rinks
+    the round is played in sittings: [{rink, sitting, a_id, b_id}, ...].
+      - Sittings = ceil(games / rinks), the minimum. Byes take no rink.
+      - Pairs keep their listed order, so the strongest play in sitting 1.
+      - Sittings are as even as possible (sizes differ by at most one), and the
+        rinks left idle in a short sitting are the ones used most so far
+        (`usage`, see rink_usage), which evens out rink wear over the event.
+      - Within a sitting, rinks are chosen as in assign_rinks_with_preferences.
+    When everything fits on the rinks the result is exactly that function's.
+    """
+    games = [(a, b) for a, b in pairs if a is not None and b is not None]
+    if total_rinks < 1 or len(games) <= total_rinks:
+        return assign_rinks_with_preferences(total_rinks, pairs, last_rink)
+    n_sit = -(-len(games) // total_rinks)
+    base, extra = divmod(len(games), n_sit)
+    usage = dict(usage or {})
+    pref_pos = {r: i for i, r in enumerate(_preferred_rink_order(total_rinks))}
+    out: List[Dict] = []
+    start = 0
+    for sitting in range(1, n_sit + 1):
+        size = base + (1 if sitting <= extra else 0)
+        # this sitting's rinks: least used first (centre breaks ties), then centre-first
+        rinks = sorted(range(1, total_rinks + 1), key=lambda r: (usage.get(r, 0), pref_pos[r]))[:size]
+        available = sorted(rinks, key=pref_pos.get)
+        for a, b in games[start:start + size]:
+            forbid = {last_rink.get(a), last_rink.get(b)}
+            chosen = next((r for r in available if r not in forbid), available[0])
+            available.remove(chosen)
+            usage[chosen] = usage.get(chosen, 0) + 1
+            out.append({"rink": chosen, "sitting": sitting, "a_id": a, "b_id": b})
+        start += size
+    # byes sit out without a rink
+    out.extend({"rink": 0, "a_id": a, "b_id": b} for a, b in pairs if (a is None) != (b is None))
+    return out
+
 def strong_vs_strong_pairs(
     standing_rows: List[PlayerStanding],
     history: Dict[int, set]
@@ -300,3 +543,384 @@ def strong_vs_strong_pairs(
             res.append((a, opponent))
             used.add(a); used.add(opponent)
     return res
+
+# Max candidates tried per player in the opposite half before giving up on them
+DUTCH_WINDOW = 32
+
+
+def _pair_greedy(ids: List[int], history: Dict[int, set], window: int, allow_repeats: bool
+                 ) -> Tuple[List[Tuple[int, int]], List[int]]:
+    """Pair ids in order with the first non-repeat among the next `window`; returns (pairs, unpaired)."""
+    pairs: List[Tuple[int, int]] = []
+    used: Set[int] = set()
+    for i, a in enumerate(ids):
+        if a in used:
+            continue
+        seen = 0
+        for b in ids[i + 1:]:
+            if b in used:
+                continue
+            if allow_repeats or b not in history.get(a, ()):
+                pairs.append((a, b)); used.add(a); used.add(b)
+                break
+            seen += 1
+            if seen >= window:
+                break
+    return pairs, [x for x in ids if x not in used]
+
+
+def dutch_swiss_pairs(
+    standing_rows: List[PlayerStanding],
+    history: Dict[int, set],
+    byes: Optional[Set[int]] = None,
+    window: int = DUTCH_WINDOW,
+) -> List[Tuple[Optional[int], Optional[int]]]:
+    """
+    Score-group (Dutch-style) Swiss pairing.
+
+      - Players are bucketed by Total (punte + bonus), highest group first; inside a
+        group they keep their standings order.
+      - Odd field: the lowest-ranked player without an earlier bye sits out.
+      - Each group (plus players floated down from above) is split in halves and
+        S1[i] meets S2[i]; on a repeat S2 is scanned onward (at most `window`
+        candidates). Players still unpaired try each other, then float down.
+      - Whatever floats out of the last group is paired avoiding repeats where
+        possible, then regardless.
+
+    Complexity: O(n log n) for the grouping plus O(n * window) set lookups for
+    pairing, so near-linear for large fields; repeats are avoided greedily, not
+    with a full matching, so a repeat can survive where a global search would
+    find a way around it.
+    """
+    order = [r.player_id for r in standing_rows]
+    rank = {pid: i for i, pid in enumerate(order)}
+    pairs: List[Tuple[Optional[int], Optional[int]]] = []
+
+    bye = None
+    if len(order) % 2:
+        byes = byes or set()
+        bye = next((pid for pid in reversed(order) if pid not in byes), order[-1])
+
+    groups: Dict[int, List[int]] = {}
+    for r in standing_rows:
+        if r.player_id != bye:
+            groups.setdefault(r.punte + r.bonus, []).append(r.player_id)
+
+    floaters: List[int] = []
+    for pts in sorted(groups, reverse=True):
+        pool = floaters + groups[pts]
+        half = len(pool) // 2
+        s1, s2 = pool[:half], pool[half:]
+        taken = [False] * len(s2)
+        left: List[int] = []
+        for i, a in enumerate(s1):
+            seen_a = history.get(a, ())
+            for step in range(min(window, len(s2))):
+                j = (i + step) % len(s2)
+                if not taken[j] and s2[j] not in seen_a:
+                    taken[j] = True
+                    pairs.append((a, s2[j]))
+                    break
+            else:
+                left.append(a)
+        left.extend(b for j, b in enumerate(s2) if not taken[j])
+        left.sort(key=rank.__getitem__)
+        more, floaters = _pair_greedy(left, history, window, allow_repeats=False)
+        pairs.extend(more)
+
+    if floaters:
+        more, rest = _pair_greedy(floaters, history, window, allow_repeats=False)
+        pairs.extend(more)
+        more, _ = _pair_greedy(rest, history, window, allow_repeats=True)
+        pairs.extend(more)
+    # strongest pairs first so assign_rinks_with_preferences gives them the centre rinks
+    pairs.sort(key=lambda p: min(rank[p[0]], rank[p[1]]))
+    if bye is not None:
+        pairs.append((bye, None))
+    return pairs
+
+# ---------------- Round generation (shared by the UI and the CLI) ----------------
+
+GEN_MODES = ("random", "seeded", "strong", "dutch", "roundrobin", "finals")
+
+
+def generate_round(
+    state: Dict,
+    section: str,
+    round_no: int,
+    mode: str,
+    rng: Optional[random.Random] = None,
+    table: Optional[List[PlayerStanding]] = None,
+) -> Dict[str, List[Dict]]:
+    """
+    Pairings for one round as {pairings_key: [{rink, a_id, b_id}, ...]}; rows get
+    a "sitting" when the section has more games than rinks (assign_rink_slots).
+    Does not modify `state`. `table` is the section's current standings when the
+    caller already has them (strong/dutch modes). Modes:
+      - random:     Round 1 style shuffle within the section
+      - seeded:     Round 1 by rating, top half vs bottom half (1 v n/2+1, ...)
+      - strong:     strong vs strong from current standings, avoiding repeats
+      - dutch:      score-group Swiss with floaters (see dutch_swiss_pairs)
+      - roundrobin: round `round_no` of the circle-method schedule (rules
+                    RR_DOUBLE / RR_BALANCED, see round_robin_round)
+      - finals:     strong vs strong over combined standings of ALL sections;
+                    the same pairs are returned under every section's key
+    """
+    rules = state.get("rules", {})
+    tiebreakers = rules.get("TIEBREAKERS", ["Total", "Verskil", "Player#"])
+    rinks_n = int(state.get("rinks", 7))
+    pairings = state.get("pairings", {})
+
+    if mode == "finals":
+        sections_all = state.get("sections", ["SEKSIE 1", "SEKSIE 2"])
+        all_rows: List[PlayerStanding] = []
+        tables = compute_all_standings(state, rules, tiebreakers)  # one parse and pass for every section
+        for s in sections_all:
+            all_rows.extend(tables[s] if s in tables else compute_standings(state, s, rules, tiebreakers))
+        combined = sort_standings(all_rows, tiebreakers)
+        prev_all: Dict[int, List[Dict]] = {}
+        for s in sections_all:
+            for rprev in range(1, round_no):
+                prev_all.setdefault(rprev, []).extend(pairings.get(f"{s}:{rprev}", []))
+        pairs = strong_vs_strong_pairs(combined, build_history(prev_all))
+        # combined last-rink map so the result is the same whichever section triggers it
+        lmap: Dict[int, int] = {}
+        usage: Dict[int, int] = {}
+        for s in sections_all:
+            lmap.update(last_rink_map(state, s, round_no))
+            for rk, n in rink_usage(state, s, round_no).items():
+                usage[rk] = usage.get(rk, 0) + n
+        new_pairs = assign_rink_slots(rinks_n, pairs, lmap, usage)
+        return {f"{s}:{round_no}": [dict(p) for p in new_pairs] for s in sections_all}
+
+    players = sorted(int(k) for k, v in state.get("players", {}).items() if v["section"] == section)
+    if mode == "random":
+        ids = players[:]
+        (rng or random).shuffle(ids)
+        pairs = [(ids[i], ids[i+1] if i+1 < len(ids) else None) for i in range(0, len(ids), 2)]
+    elif mode == "seeded":
+        ids = sorted(players, key=lambda pid: (-player_rating(state, pid), pid))
+        half = len(ids) // 2
+        pairs = [(ids[i], ids[i + half]) for i in range(half)]
+        if len(ids) % 2:
+            pairs.append((ids[-1], None))  # lowest rated sits out
+    elif mode == "strong":
+        table = table if table is not None else compute_standings(state, section, rules, tiebreakers)
+        prev = {r: pairings.get(f"{section}:{r}", []) for r in range(1, round_no)}
+        pairs = strong_vs_strong_pairs(table, build_history(prev))
+    elif mode == "dutch":
+        table = table if table is not None else compute_standings(state, section, rules, tiebreakers)
+        prev = {r: pairings.get(f"{section}:{r}", []) for r in range(1, round_no)}
+        byes = {int(pr["a_id"]) for prs in prev.values() for pr in prs if pr.get("a_id") and not pr.get("b_id")}
+        pairs = dutch_swiss_pairs(table, build_history(prev), byes)
+    elif mode == "roundrobin":
+        pairs = round_robin_round(players, round_no, bool(rules.get("RR_DOUBLE", False)),
+                                  bool(rules.get("RR_BALANCED", False)))
+    else:
+        raise ValueError(f"Unknown generation mode: {mode!r}")
+    lmap = last_rink_map(state, section, round_no)
+    usage = rink_usage(state, section, round_no)
+    return {f"{section}:{round_no}": assign_rink_slots(rinks_n, pairs, lmap, usage)}
+
+
+# Above this many players in total, sections are generated in worker processes
+# unless `workers` says otherwise (rolbal generate --workers, Tools → Generation).
+# bench.engine_bench's generate_all_sections(_pool) cases show the crossover per
+# machine; with one CPU the pool never wins (20,000 players: 1.7 s in-process,
+# 2.6 s pooled), so the automatic switch is kept for huge days only.
+PARALLEL_MIN_PLAYERS = 50000
+
+
+def _section_slice(state: Dict, section: str) -> Dict:
+    """The parts of `state` generate_round reads for one section (small to pickle)."""
+    pids = {k for k, v in state.get("players", {}).items() if v["section"] == section}
+    rt = state.get("ratings") or {}
+    prefix = f"{section}:"
+    return {
+        "players": {k: state["players"][k] for k in pids},
+        "pairings": {k: v for k, v in state.get("pairings", {}).items() if k.startswith(prefix)},
+        "rules": state.get("rules", {}),
+        "rinks": state.get("rinks", 7),
+        "rounds": state.get("rounds", 6),
+        "ratings": {"players": {k: v for k, v in rt.get("players", {}).items() if k in pids},
+                    "base": {k: v for k, v in rt.get("base", {}).items() if k in pids}},
+    }
+
+
+def _generate_task(args) -> Dict[str, List[Dict]]:
+    state, section, round_no, mode, seed, table = args
+    return generate_round(state, section, round_no, mode, random.Random(seed), table)
+
+
+def generate_all_sections(
+    state: Dict,
+    round_no: int,
+    mode: str,
+    rng: Optional[random.Random] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, List[Dict]]:
+    """
+    `generate_round` for every section at once, as one {pairings_key: pairs} dict.
+    Does not modify `state`. Finals already covers all sections in one call.
+
+    Standings for every section come from one compute_all_standings pass. Each
+    section gets its own seed drawn from `rng`, so the result is the same whether
+    sections run in this process or in a pool. The pool (workers get only their
+    section's slice of the state) is used when `workers` > 1, or by default when
+    the event has more than PARALLEL_MIN_PLAYERS players and more than one
+    section.
+    """
+    sections = list(state.get("sections", []) or [])
+    if mode == "finals" or not sections:
+        return generate_round(state, sections[0] if sections else "", round_no, mode, rng)
+    rng = rng or random.Random()
+    tables: Dict[str, List[PlayerStanding]] = {}
+    if mode in ("strong", "dutch"):
+        rules = state.get("rules", {})
+        tables = compute_all_standings(state, rules, rules.get("TIEBREAKERS", ["Total", "Verskil", "Player#"]))
+    if workers is None:
+        import os
+        big = len(state.get("players", {})) > PARALLEL_MIN_PLAYERS
+        workers = min(len(sections), os.cpu_count() or 1) if big else 1
+    parallel = workers > 1 and len(sections) > 1
+    tasks = [(_section_slice(state, sec) if parallel else state, sec, round_no, mode,
+              rng.randrange(2 ** 32), tables.get(sec)) for sec in sections]
+    out: Dict[str, List[Dict]] = {}
+    if parallel:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # spawn, not fork: the app calls this from a Streamlit server thread
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            for part in pool.map(_generate_task, tasks):
+                out.update(part)
+    else:
+        for t in tasks:
+            out.update(_generate_task(t))
+    return out
+
+
+class Issue(NamedTuple):
+    kind: str      # one of ISSUE_KINDS
+    key: str       # the pairings or score key it is about
+    message: str
+
+    def __str__(self) -> str:
+        return self.message
+
+ISSUE_KINDS = (
+    "double_booked",          # a player in two different games of the same round (any sections)
+    "repeat_opponent",        # two players meeting again (a second time allowed with RR_DOUBLE; not in knockouts)
+    "rink_zero",              # a game with two players but no rink
+    "pairing_without_score",  # a game with no result in a round before its section's latest scored round
+    "score_without_pairing",
+    "score_not_mirrored",     # A vir != B teen or A teen != B vir
+    "per_end_mismatch",       # per-end totals disagree with the stored score
+)
+SCORE_ISSUE_KINDS = ("score_without_pairing", "score_not_mirrored", "per_end_mismatch")
+
+def _slot_label(rink: int, sitting: int) -> str:
+    return f"rink {rink}" if sitting <= 1 else f"rink {rink}·{sitting}"
+
+def validate_event(state) -> List[Issue]:
+    """
+    Whole-event consistency checks (see ISSUE_KINDS) in one pass over the
+    pairings, one over the scores and one over the per-end rows, so the cost
+    is linear in the event's size. Takes a state or an Event.
+    Finals list the same game under every section's key; those copies are
+    one game here (not double-booked, scored if any copy is scored).
+    """
+    ev = as_event(state)
+    issues: List[Issue] = []
+    add = issues.append
+    scores = ev.scores
+    allowed_meetings = 2 if ev.rules.get("RR_DOUBLE", False) else 1
+    last_scored: Dict[int, int] = {}  # section -> latest round with a result (the round in progress)
+    for sk, sc in scores.items():
+        if (sc[0] or sc[1] or sc[2] or sc[3]) and sk[1] > last_scored.get(sk[0], 0):
+            last_scored[sk[0]] = sk[1]
+
+    paired: Set[Tuple[int, int, int, int]] = set()
+    booked: Dict[Tuple[int, int], Tuple[Tuple[int, int, int, int], str]] = {}  # (round, pid) -> (game, key)
+    met: Dict[Tuple[int, int], List[int]] = {}                                 # (lo, hi) -> rounds
+    unscored: Dict[Tuple[int, Tuple[int, int, int, int]], str] = {}             # (round, game) -> slot key
+    scored: Set[Tuple[int, Tuple[int, int, int, int]]] = set()
+    for (si, rnd), games in ev.pairings.items():
+        pk = ev.pair_key((si, rnd))
+        for g in games:
+            rink, sitting, a, b = g
+            lo, hi = (a, b) if a <= b else (b, a)
+            game = (rink, sitting, lo, hi)
+            if rink:
+                paired.add((si, rnd, rink, sitting))
+            if a and b and not rink:
+                add(Issue("rink_zero", pk, f"{pk}: #{a} v #{b} has no rink"))
+            if a and a == b:
+                add(Issue("double_booked", pk, f"{pk}: #{a} is paired against themselves"))
+            for pid in {a, b}:
+                if not pid:
+                    continue
+                prev = booked.get((rnd, pid))
+                if prev is None:
+                    booked[(rnd, pid)] = (game, pk)
+                elif prev[0] != game or prev[1] == pk:
+                    add(Issue("double_booked", pk, f"{pk}: #{pid} also plays {_slot_label(*prev[0][:2])} of {prev[1]}"))
+            if not a or not b or a == b:
+                continue
+            rounds = met.setdefault((lo, hi), []) if si not in ev.brackets else [rnd]  # knockouts may rematch
+            if rnd not in rounds:
+                rounds.append(rnd)
+                if len(rounds) > allowed_meetings:
+                    add(Issue("repeat_opponent", pk, f"{pk}: #{lo} and #{hi} already met in round {rounds[0]}"))
+            if rink:
+                sc = scores.get((si, rnd, rink, sitting))
+                if sc is not None and (sc[0] or sc[1] or sc[2] or sc[3]):
+                    scored.add((rnd, game))
+                elif rnd < last_scored.get(si, 0):  # the round in progress is still being scored
+                    unscored.setdefault((rnd, game), ev.score_key((si, rnd, rink, sitting)))
+    for gid, key in unscored.items():
+        if gid not in scored:
+            add(Issue("pairing_without_score", key, f"{key}: no score entered"))
+
+    for sk, sc in scores.items():
+        if sk not in paired:
+            key = ev.score_key(sk)
+            add(Issue("score_without_pairing", key, f"{key}: score without a pairing"))
+        if sc[0] != sc[3] or sc[1] != sc[2]:  # A vir / B teen, A teen / B vir
+            key = ev.score_key(sk)
+            add(Issue("score_not_mirrored", key, f"{key}: A/B scores do not mirror"))
+    for key in ev.raw_scores:
+        add(Issue("score_without_pairing", key, f"{key}: score without a pairing"))
+
+    for key, pe in (ev.state.get("scores_per_end") or {}).items():
+        parsed = parse_slot_key(key)
+        si = ev.section_ix.get(parsed[0]) if parsed else None
+        sc = scores.get((si,) + parsed[1:]) if si is not None else None
+        if sc is None:
+            continue
+        ends = pe.get("ends", [])
+        try:
+            ta = tb = 0
+            for e in ends:  # one loop, no int() per end: this is most of the validator's time
+                ta += e.get("a") or 0
+                tb += e.get("b") or 0
+        except TypeError:
+            try:
+                ta = sum(int(e.get("a") or 0) for e in ends)
+                tb = sum(int(e.get("b") or 0) for e in ends)
+            except (TypeError, ValueError, AttributeError):
+                add(Issue("per_end_mismatch", key, f"{key}: per-end rows are not numbers"))
+                continue
+        if (ta, tb) != (sc.a_vir, sc.a_teen):
+            add(Issue("per_end_mismatch", key, f"{key}: per-end totals {ta}-{tb} disagree with score"))
+    return issues
+
+def score_issues(state) -> List[str]:
+    """
+    Quick consistency checks on saved scores (human-readable messages):
+      - score stored for a rink that has no pairing
+      - A/B totals that don't mirror (A vir != B teen or A teen != B vir)
+      - per-end rows whose totals disagree with the stored score
+    The score-only subset of validate_event.
+    """
+    return [i.message for i in validate_event(state) if i.kind in SCORE_ISSUE_KINDS]
@@ -0,0 +1,235 @@
+"""
+Typed in-memory view of an event: sections by index, tuple keys and one
+interned record per player, parsed once from the JSON state.
+
+    ev = Event.from_state(state)
+    ev.section_ix["SEKSIE 1"]          # 0
+    ev.players[12]                     # Player(id=12, name="...", section=0)
+    ev.pairings[(0, 3)]                # [Game(rink=4, sitting=1, a=12, b=31), ...]
+    ev.scores[(0, 3, 4, 1)]            # Score(a_vir=15, a_teen=9, b_vir=9, b_teen=15)
+    for rnd, game, score in ev.played():  # scored games, no key strings involved
+        ...
+    state = ev.to_state()              # the JSON shape again (other keys carried through)
+
+The JSON format stays the storage format: "SEC:round" pairings keys,
+"SEC:round:rink[:sitting]" score keys and str player ids. Those strings are
+parsed here once. The standings functions in engine.py and the export take an
+Event (or a state, which they convert), so their loops work on ints and tuples
+instead of formatting and splitting keys for every game. Byes are stored as
+player 0.
+
+Keys that do not parse are kept as they are and written back unchanged.
+Sections that appear only in keys or player records get indices after the
+declared ones. Knockout brackets (bracket.py) are sections too, listed in
+`brackets`; `played()` and so the standings skip them. `to_state` writes "sitting" on every row of a round that has
+more than one sitting, as `assign_rink_slots` does.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+PairKey = Tuple[int, int]             # (section index, round)
+ScoreKey = Tuple[int, int, int, int]  # (section index, round, rink, sitting)
+
+
+class Player(NamedTuple):
+    id: int
+    name: str
+    section: int  # index into Event.sections
+
+
+class Game(NamedTuple):
+    rink: int
+    sitting: int
+    a: int  # 0 = empty side / bye
+    b: int
+
+
+class Score(NamedTuple):
+    a_vir: int
+    a_teen: int
+    b_vir: int
+    b_teen: int
+
+    @property
+    def played(self) -> bool:
+        # a 0-0 placeholder is "not played yet", as in compute_standings
+        return bool(self.a_vir or self.a_teen or self.b_vir or self.b_teen)
+
+
+def _int(v: Any) -> int:
+    try:
+        return int(v or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _split(key: str, parts: int) -> Optional[Tuple[str, List[int]]]:
+    bits = key.split(":")
+    if len(bits) not in parts:
+        return None
+    try:
+        return bits[0], [int(b) for b in bits[1:]]
+    except ValueError:
+        return None
+
+
+class Event:
+    __slots__ = ("state", "name", "sections", "section_ix", "n_declared", "rounds", "rinks", "rules",
+                 "players", "pairings", "scores", "raw_pairings", "raw_scores", "brackets")
+
+    def __init__(self) -> None:
+        self.state: Dict[str, Any] = {}  # the source state (ratings, per-end, audit, ... live there)
+        self.name = ""
+        self.sections: List[str] = []
+        self.section_ix: Dict[str, int] = {}
+        self.n_declared = 0               # sections[:n_declared] are state["sections"]
+        self.rounds = 0
+        self.rinks = 0
+        self.rules: Dict[str, Any] = {}
+        self.players: Dict[int, Player] = {}
+        self.pairings: Dict[PairKey, List[Game]] = {}
+        self.scores: Dict[ScoreKey, Score] = {}
+        self.raw_pairings: Dict[str, Any] = {}  # keys that did not parse, kept verbatim
+        self.raw_scores: Dict[str, Any] = {}
+        self.brackets: Set[int] = set()         # section indices of knockout brackets
+
+    # ---------------- JSON state -> Event ----------------
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "Event":
+        ev = cls()
+        ev.state = state
+        ev.name = state.get("event_name", "")
+        ev.rounds = _int(state.get("rounds", 6))
+        ev.rinks = _int(state.get("rinks", 0))
+        ev.rules = state.get("rules", {}) or {}
+        for sec in state.get("sections", []) or []:
+            ev.section(sec)
+        ev.n_declared = len(ev.sections)
+        ev.brackets = {ev.section(name) for name in state.get("brackets") or {}}
+
+        section, six = ev.section, ev.section_ix
+        new = tuple.__new__  # NamedTuple construction without the Python-level __new__
+        for pid_str, p in (state.get("players") or {}).items():
+            pid = int(pid_str)
+            ev.players[pid] = new(Player, (pid, sys.intern(str(p.get("name", ""))), section(p.get("section", ""))))
+
+        for key, prs in (state.get("pairings") or {}).items():
+            parsed = _split(key, (2,))
+            if parsed is None:
+                ev.raw_pairings[key] = prs
+                continue
+            try:
+                games = [new(Game, (int(pr.get("rink") or 0), int(pr.get("sitting") or 1),
+                                    int(pr.get("a_id") or 0), int(pr.get("b_id") or 0))) for pr in prs or ()]
+            except (TypeError, ValueError):
+                games = [Game(_int(pr.get("rink")), _int(pr.get("sitting")) or 1, _int(pr.get("a_id")),
+                              _int(pr.get("b_id"))) for pr in prs or ()]
+            ev.pairings[(section(parsed[0]), parsed[1][0])] = games
+
+        empty: Dict[str, Any] = {}
+        scores = ev.scores
+        for key, sc in (state.get("scores") or {}).items():
+            bits = key.split(":")
+            try:
+                if not 3 <= len(bits) <= 4 or not isinstance(sc, dict):
+                    raise ValueError(key)
+                si = six.get(bits[0])
+                if si is None:
+                    si = section(bits[0])
+                sk = (si, int(bits[1]), int(bits[2]), int(bits[3]) if len(bits) == 4 else 1)
+            except ValueError:
+                ev.raw_scores[key] = sc
+                continue
+            a, b = sc.get("a") or empty, sc.get("b") or empty
+            try:
+                scores[sk] = new(Score, (int(a.get("vir") or 0), int(a.get("teen") or 0),
+                                         int(b.get("vir") or 0), int(b.get("teen") or 0)))
+            except (TypeError, ValueError, AttributeError):
+                a, b = (x if isinstance(x, dict) else empty for x in (a, b))
+                scores[sk] = Score(_int(a.get("vir")), _int(a.get("teen")), _int(b.get("vir")), _int(b.get("teen")))
+        return ev
+
+    def section(self, name: str) -> int:
+        """Index of section `name`, adding it after the known ones if new."""
+        ix = self.section_ix.get(name)
+        if ix is None:
+            name = sys.intern(str(name))
+            ix = self.section_ix[name] = len(self.sections)
+            self.sections.append(name)
+        return ix
+
+    # ---------------- lookups ----------------
+
+    def score(self, si: int, rnd: int, game: Game) -> Optional[Score]:
+        return self.scores.get((si, rnd, game.rink, game.sitting))
+
+    def played(self, max_round: Optional[int] = None) -> Iterator[Tuple[int, Game, Score]]:
+        """(round, game, score) for every scored game with two players and a rink.
+
+        Finals list the same game under every section's key; like the standings
+        code it replaces, each key's copy is yielded. Knockout games are not.
+        """
+        last = self.rounds if max_round is None else max_round
+        scores, skip = self.scores, self.brackets
+        for (si, rnd), games in self.pairings.items():
+            if not 1 <= rnd <= last or si in skip:
+                continue
+            for g in games:
+                if not g[2] or not g[3] or not g[0]:  # a, b, rink
+                    continue
+                sc = scores.get((si, rnd, g[0], g[1]))
+                if sc is not None and (sc[0] or sc[1] or sc[2] or sc[3]):  # Score.played, inlined
+                    yield rnd, g, sc
+
+    def section_players(self, si: int) -> List[Player]:
+        return [p for p in self.players.values() if p.section == si]
+
+    # ---------------- Event -> JSON state ----------------
+
+    def pair_key(self, pk: PairKey) -> str:
+        return f"{self.sections[pk[0]]}:{pk[1]}"
+
+    def score_key(self, sk: ScoreKey) -> str:
+        base = f"{self.sections[sk[0]]}:{sk[1]}:{sk[2]}"
+        return base if sk[3] <= 1 else f"{base}:{sk[3]}"
+
+    def to_state(self) -> Dict[str, Any]:
+        """The event in the JSON format; keys this model does not cover come from the source state."""
+        out = dict(self.state)
+        out["event_name"] = self.name
+        out["sections"] = self.sections[:self.n_declared]
+        out["rounds"] = self.rounds
+        out["rinks"] = self.rinks
+        out["rules"] = self.rules
+        out["players"] = {str(p.id): {"name": p.name, "section": self.sections[p.section]}
+                          for p in self.players.values()}
+        pairings: Dict[str, Any] = {}
+        for pk, games in self.pairings.items():
+            sittings = any(g.sitting > 1 for g in games)
+            rows = []
+            for g in games:
+                row: Dict[str, Any] = {"rink": g.rink, "a_id": g.a or None, "b_id": g.b or None}
+                if sittings:
+                    row = {"rink": g.rink, "sitting": g.sitting, "a_id": row["a_id"], "b_id": row["b_id"]}
+                rows.append(row)
+            pairings[self.pair_key(pk)] = rows
+        pairings.update(self.raw_pairings)
+        out["pairings"] = pairings
+        scores: Dict[str, Any] = {self.score_key(sk): {"a": {"vir": s.a_vir, "teen": s.a_teen},
+                                                       "b": {"vir": s.b_vir, "teen": s.b_teen}}
+                                  for sk, s in self.scores.items()}
+        scores.update(self.raw_scores)
+        out["scores"] = scores
+        return out
+
+
+def as_event(state_or_event: Union[Dict[str, Any], Event]) -> Event:
+    """Accept either form at API boundaries that used to take the JSON state."""
+    return state_or_event if isinstance(state_or_event, Event) else Event.from_state(state_or_event)
+
+
+__all__ = ["Event", "Player", "Game", "Score", "PairKey", "ScoreKey", "as_event"]
@@ -0,0 +1,194 @@
+"""
+Excel import/export helpers for the Import/Export tab.
+
+Import: workbooks are opened with openpyxl in read-only (streaming) mode and
+only the id/name/section columns of the relevant sheets are pulled out, so
+large workbooks are never fully materialised. Clean-up is done column-wise in
+pandas and the result can be written into `state["players"]` in one update.
+
+Export: rows are written straight from the parsed event (event_model.Event)
+with xlsxwriter in constant-memory mode (one row in memory per sheet), no
+DataFrames involved.
+"""
+
+from __future__ import annotations
+
+import io
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    import pandas as pd
+
+ID_COLS = ("speler nr", "player #", "player id", "#")
+NAME_COLS = ("speler", "name")
+SEK_COLS = ("sek", "section", "seksie", "seksie 1/2")
+
+VALID_SECTIONS = ("SEKSIE 1", "SEKSIE 2")
+_SEK_MAP = {"SEKSIE1": "SEKSIE 1", "SEKSIE2": "SEKSIE 2", "SEK1": "SEKSIE 1", "SEK2": "SEKSIE 2"}
+
+_PUNTE_SEK1 = ("puntesek1", "seksie1", "sek1")
+_PUNTE_SEK2 = ("puntesek2", "seksie2", "sek2")
+
+
+def _pick(cols: Dict[str, int], names: Tuple[str, ...]) -> Optional[int]:
+    for n in names:
+        if n in cols:
+            return cols[n]
+    return None
+
+
+def _stream_columns(ws, want_sek: bool) -> Optional[Tuple[List, List, List]]:
+    """Read only the id/name(/section) columns of a worksheet, row by row."""
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None)
+    if not header:
+        return None
+    cols = {str(c).strip().lower(): i for i, c in enumerate(header) if c is not None}
+    idc, namec = _pick(cols, ID_COLS), _pick(cols, NAME_COLS)
+    sekc = _pick(cols, SEK_COLS) if want_sek else None
+    if idc is None or namec is None or (want_sek and sekc is None):
+        return None
+    ids, names, secs = [], [], []
+    for row in rows:
+        n = len(row)
+        ids.append(row[idc] if idc < n else None)
+        names.append(row[namec] if namec < n else None)
+        if want_sek:
+            secs.append(row[sekc] if sekc < n else None)
+    return ids, names, secs
+
+
+def parse_players_workbook(data: bytes) -> Tuple[List[str], Optional[pd.DataFrame]]:
+    """Return (sheet names, raw players frame) from .xlsx/.xlsm bytes.
+
+    Prefers a "Players" sheet (Speler nr | Speler | Sek); otherwise combines
+    "Punte Sek 1/2" style sheets. Each sheet is parsed at most once. The frame
+    has columns Speler nr, Speler, Sek and is not yet cleaned.
+    """
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        sheet_names = list(wb.sheetnames)
+        if "Players" in sheet_names:
+            got = _stream_columns(wb["Players"], want_sek=True)
+            if got:
+                ids, names, secs = got
+                return sheet_names, pd.DataFrame({"Speler nr": ids, "Speler": names, "Sek": secs})
+
+        frames = []
+        for sh in sheet_names:
+            low = sh.lower().replace(" ", "")
+            if not (any(k in low for k in _PUNTE_SEK1) or any(k in low for k in _PUNTE_SEK2)):
+                continue
+            got = _stream_columns(wb[sh], want_sek=False)
+            if not got:
+                continue
+            ids, names, _ = got
+            sek = "SEKSIE 2" if any(k in low for k in ("2",) + _PUNTE_SEK2) else "SEKSIE 1"
+            frames.append(pd.DataFrame({"Speler nr": ids, "Speler": names, "Sek": sek}))
+        if frames:
+            return sheet_names, pd.concat(frames, ignore_index=True)
+        return sheet_names, None
+    finally:
+        wb.close()
+
+
+def normalise_players(df: pd.DataFrame) -> pd.DataFrame:
+    """Vectorised clean-up: valid ids/names, section mapping, dedupe by Speler nr (last wins)."""
+    import pandas as pd
+
+    out = df.dropna(subset=["Speler", "Speler nr"]).copy()
+    out["Speler nr"] = pd.to_numeric(out["Speler nr"], errors="coerce")
+    out = out[out["Speler nr"].notna()]
+    out["Speler nr"] = out["Speler nr"].astype(int)
+    out["Speler"] = out["Speler"].astype(str).str.strip()
+    sek = out["Sek"].astype(str).str.upper().str.replace(" ", "", regex=False).replace(_SEK_MAP)
+    out["Sek"] = sek.where(sek.isin(VALID_SECTIONS), VALID_SECTIONS[0])
+    out = out[(out["Speler nr"] > 0) & (out["Speler"] != "")]
+    out = out.drop_duplicates(subset="Speler nr", keep="last")
+    return out.reset_index(drop=True)
+
+
+def players_records(df: pd.DataFrame) -> Dict[str, Dict[str, str]]:
+    """{str(pid): {"name", "section"}} ready for one `state["players"].update(...)`."""
+    return {
+        str(pid): {"name": name, "section": sek}
+        for pid, name, sek in zip(df["Speler nr"].tolist(), df["Speler"].tolist(), df["Sek"].tolist())
+    }
+
+
+# ---------------- Export ----------------
+
+def _write_sheet(wb, name: str, header: List[str], rows: Iterable[Iterable[Any]], bold) -> None:
+    ws = wb.add_worksheet(name[:31])
+    ws.write_row(0, 0, header, bold)
+    for i, row in enumerate(rows, start=1):
+        ws.write_row(i, 0, list(row))
+
+
+def _standing_rows(table, with_section: bool):
+    for i, r in enumerate(table):
+        row = [r.player_id, r.name]
+        if with_section:
+            row.append(r.section)
+        yield row + [r.verskil, r.punte, r.bonus, r.punte + r.bonus, i + 1]
+
+
+def build_export_workbook(state) -> bytes:
+    """Players, Pairings, Scores, Per-end, per-section Standings and Combined as .xlsx bytes.
+
+    `state` is the JSON state or an already parsed Event; keys are parsed once
+    and all sections' standings come from one pass over the games.
+    """
+    import xlsxwriter
+    from engine import compute_all_standings, parse_slot_key, sort_standings
+    from event_model import as_event
+
+    ev = as_event(state)
+    out = io.BytesIO()
+    wb = xlsxwriter.Workbook(out, {"constant_memory": True})
+    bold = wb.add_format({"bold": True})
+
+    players = sorted((p.id, p.name, ev.sections[p.section]) for p in ev.players.values())
+    _write_sheet(wb, "Players", ["Speler nr", "Speler", "Sek"], players, bold)
+
+    def pairing_rows():
+        for (si, rnd), games in ev.pairings.items():
+            sek = ev.sections[si]
+            for g in games:
+                yield [sek, rnd, g.rink or None, g.sitting, g.a or None, g.b or None]
+    _write_sheet(wb, "Pairings", ["Sek", "Round", "Rink", "Sitting", "A_id", "B_id"], pairing_rows(), bold)
+
+    def score_rows():
+        for (si, rnd, rink, sitting), sc in ev.scores.items():
+            yield [ev.sections[si], rnd, rink, sitting, sc.a_vir, sc.a_teen, sc.b_vir, sc.b_teen]
+    _write_sheet(wb, "Scores", ["Sek", "Round", "Rink", "Sitting", "A_vir", "A_teen", "B_vir", "B_teen"], score_rows(), bold)
+
+    def per_end_rows():
+        for key, pe in ev.state.get("scores_per_end", {}).items():
+            parsed = parse_slot_key(key)
+            if not parsed:
+                continue
+            for end_no, e in enumerate(pe.get("ends", []), start=1):
+                yield list(parsed) + [end_no, e.get("a", 0), e.get("b", 0)]
+    _write_sheet(wb, "Per-end", ["Sek", "Round", "Rink", "Sitting", "End", "A", "B"], per_end_rows(), bold)
+
+    rules = ev.rules
+    tiebreakers = rules.get("TIEBREAKERS", ["Total", "Verskil", "Player#"])
+    cols = ["#", "Speler", "Verskil", "Punte", "Bonus", "Total", "Posisie"]
+    tables = compute_all_standings(ev, rules, tiebreakers)
+    all_rows = []
+    for sek in ev.state.get("sections", ["SEKSIE 1", "SEKSIE 2"]):
+        tbl = tables.get(sek, [])
+        all_rows.extend(tbl)
+        _write_sheet(wb, f"Standings {sek}", cols, _standing_rows(tbl, False), bold)
+    combined = sort_standings(all_rows, tiebreakers)
+    _write_sheet(wb, "Combined", cols[:2] + ["Sek"] + cols[2:], _standing_rows(combined, True), bold)
+
+    wb.close()
+    return out.getvalue()
+
+
+__all__ = ["parse_players_workbook", "normalise_players", "players_records", "build_export_workbook"]
@@ -0,0 +1,144 @@
+"""
+Read-only leaderboard ("projector mode") shared by every viewer of an event.
+
+Usage (no sign-in, no editing UI):
+
+    streamlit run app.py  ->  http://host:8501/?view=leaderboard&event=<event_id>
+
+Leave out `event` (or pass `event=local`) to show the local `data/event.json`.
+
+All the expensive work sits behind process-wide Streamlit caches keyed on
+(event id, stored version), so N screens on the same event cost one load and
+one standings computation per change instead of N per refresh. Tables come
+from `engine.standings_history`, which also gives the "±" column (places
+gained or lost in the latest round).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+import streamlit as st
+
+from engine import StandingsHistory, standings_history
+from storage import DEFAULT_STATE
+
+LOCAL_EVENT = "local"
+LOCAL_PATH = os.getenv("ROLBAL_DATA_PATH", "data/event.json")  # same file the app writes
+
+# Version checks are shared between viewers for this long (seconds)
+_VERSION_TTL = 2
+
+# event id -> (version, state) of the last successful load, shown while a reload fails
+_LAST_GOOD: Dict[str, Any] = {}
+
+
+@st.cache_data(ttl=_VERSION_TTL, show_spinner=False)
+def event_version(event_id: str) -> Optional[str]:
+    """Cheap change marker (mtime or `updated_at`), one lookup per TTL per process."""
+    if event_id == LOCAL_EVENT:
+        try:
+            return str(os.stat(LOCAL_PATH).st_mtime_ns)
+        except OSError:
+            return None
+    from storage_supabase import SupabaseStore
+    return SupabaseStore.fetch_shared_version(event_id)
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _load_event(event_id: str, version: Optional[str]) -> Dict[str, Any]:
+    # `version` is part of the cache key only; a new version means a new entry.
+    # Failures raise, so they are not cached and the next tick tries again.
+    if event_id == LOCAL_EVENT:
+        try:
+            with open(LOCAL_PATH, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise LookupError(f"cannot read {LOCAL_PATH}: {e}") from e
+    from storage_supabase import SupabaseStore
+    state = SupabaseStore.fetch_shared(event_id)
+    if not state:
+        raise LookupError(f"event {event_id} is not available")
+    return state
+
+
+def load_event(event_id: str, version: Optional[str]):
+    """(version, state) to show: the cached load, else the last good one, else an empty event."""
+    try:
+        state = _load_event(event_id, version)
+    except LookupError:
+        return _LAST_GOOD.get(event_id) or ("default", DEFAULT_STATE.copy())
+    _LAST_GOOD[event_id] = (version, state)
+    return version, state
+
+
+def movement_label(delta: Optional[int]) -> str:
+    """Places gained (+) or lost (-) as an arrow: "▲2", "▼1", "=" (blank when unknown)."""
+    if delta is None:
+        return ""
+    return f"▲{delta}" if delta > 0 else f"▼{-delta}" if delta < 0 else "="
+
+
+def _row(pos: int, r, with_section: bool, move: Optional[int] = None) -> Dict[str, Any]:
+    row = {"Posisie": pos, "±": movement_label(move), "#": r.player_id, "Speler": r.name}
+    if with_section:
+        row["Sek"] = r.section
+    row.update({"Total": r.punte + r.bonus, "Punte": r.punte, "Bonus": r.bonus, "Verskil": r.verskil})
+    return row
+
+
+def standings_rows(hist: StandingsHistory, group: str, as_of: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Rows for `group` as of round `as_of` (default: everything played), with that round's movement."""
+    r = hist.last_round if as_of is None else int(as_of)
+    moves = hist.movement(group, r) if r >= 2 else {}  # after round 1 there is no earlier table
+    return [_row(i + 1, row, group == "Combined", moves.get(row.player_id))
+            for i, row in enumerate(hist.table(group, r))]
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _history(_state: Dict[str, Any], event_id: str, version: Optional[str]) -> StandingsHistory:
+    return standings_history(_state)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def standings_tables(_state: Dict[str, Any], event_id: str, version: Optional[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Standings for every section plus "Combined", computed once per (event, version).
+
+    `_state` is excluded from hashing; the event id and version identify it.
+    """
+    hist = _history(_state, event_id, version)
+    return {name: standings_rows(hist, name) for name in hist.order}
+
+
+def render_projector(event_id: Optional[str], view: Optional[str] = None, every_sec: int = 10) -> None:
+    """Render the read-only leaderboard and keep it live with a timed fragment."""
+    event_id = event_id or LOCAL_EVENT
+    fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment")
+
+    st.markdown(
+        """
+        <style>
+        [data-testid="stSidebar"], [data-testid="collapsedControl"] { display: none; }
+        [data-testid="stDataFrame"] { height: calc(100vh - 180px) !important; }
+        </style>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    @fragment(run_every=max(2, int(every_sec)))
+    def _board():
+        version, state = load_event(event_id, event_version(event_id))
+        tables = standings_tables(state, event_id, version)
+        st.title(f"{state.get('event_name', 'Event')} · Leaderboard")
+        names = ["Combined"] + [s for s in tables if s != "Combined"]
+        chosen = view if view in tables else None
+        if chosen is None:
+            chosen = st.radio("View", names, horizontal=True, key="pv_view", label_visibility="collapsed")
+        st.dataframe(tables.get(chosen, []), use_container_width=True, hide_index=True)
+
+    _board()
+
+
+__all__ = ["render_projector", "standings_tables", "standings_rows", "movement_label", "event_version"]
@@ -0,0 +1,194 @@
+"""
+Local write-through mirror of Supabase events, so a dropped mobile signal at
+the green never blanks the event or loses a save.
+
+Two files per (user_id, event_id) under `data/mirror/` (override with
+ROLBAL_MIRROR_DIR):
+
+    <user>__<event>.json        the state as last saved or loaded on this server
+    <user>__<event>.meta.json   {"updated_at", "name", "pending", "pending_since",
+                                 "attempts", "last_error"}
+
+`SupabaseStore` reads the mirror first (instant, and never an empty event) and
+only downloads the row when its `updated_at` differs from the mirror's. Every
+save writes the mirror before it tries the upsert; when the upsert fails the
+save stays queued in the meta file (`pending`) instead of raising. Saves are
+whole-state snapshots, so the outbox batches by construction: N queued saves
+go up as one upsert of the latest state. A daemon thread per event
+(`ensure_replayer`) retries with backoff and exits once the outbox is empty.
+
+After a failed call Supabase is treated as unreachable for OFFLINE_COOLDOWN_SEC
+(`is_offline()`), so reruns in that window use the mirror without waiting on
+network timeouts; the replay thread keeps probing meanwhile.
+
+    m = EventMirror(user_id, event_id)
+    m.read_state()                # mirrored state or None
+    m.write_state(state)
+    m.meta()                      # cached meta dict
+    m.set_meta(pending=0, updated_at="...")
+    EventMirror.list_for(user_id) # mirrored events, for the offline event list
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from storage_metrics import METRICS
+
+MIRROR_DIR = os.getenv("ROLBAL_MIRROR_DIR", "data/mirror")
+OFFLINE_COOLDOWN_SEC = 20.0
+REPLAY_BACKOFF_SEC = (2, 5, 10, 30, 60)  # then every 60 s until the outbox is empty
+
+_META_DEFAULT = {"updated_at": None, "name": None, "pending": 0, "pending_since": None,
+                 "attempts": 0, "last_error": ""}
+
+_GUARD = threading.Lock()
+_LOCKS: Dict[str, threading.RLock] = {}
+_META: Dict[str, Dict[str, Any]] = {}  # meta path -> cached meta (the file is the durable copy)
+_offline_until = 0.0
+
+
+def is_offline() -> bool:
+    return time.time() < _offline_until
+
+
+def mark_offline() -> None:
+    global _offline_until
+    _offline_until = time.time() + OFFLINE_COOLDOWN_SEC
+
+
+def mark_online() -> None:
+    global _offline_until
+    _offline_until = 0.0
+
+
+def _safe(part: Optional[str]) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(part)) if part else "default"
+
+
+def _write_json(path: str, data: Any) -> int:
+    # write-then-rename, as Store.save does
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        n = f.tell()
+    os.replace(tmp, path)
+    return n
+
+
+def _read_json(path: str) -> Any:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class EventMirror:
+    def __init__(self, user_id: str, event_id: Optional[str], base_dir: Optional[str] = None):
+        self.dir = base_dir or MIRROR_DIR
+        base = os.path.join(self.dir, f"{_safe(user_id)}__{_safe(event_id)}")
+        self.path, self.meta_path = f"{base}.json", f"{base}.meta.json"
+        with _GUARD:
+            self.lock = _LOCKS.setdefault(self.path, threading.RLock())  # shared by stores and the replayer
+
+    def read_state(self) -> Optional[Dict[str, Any]]:
+        with METRICS.timed("mirror.load"):
+            data = _read_json(self.path)
+        return data if isinstance(data, dict) else None
+
+    def write_state(self, state: Dict[str, Any]) -> None:
+        os.makedirs(self.dir, exist_ok=True)
+        with METRICS.timed("mirror.save"):
+            METRICS.incr("mirror.bytes_written", _write_json(self.path, state))
+
+    def meta(self) -> Dict[str, Any]:
+        with _GUARD:
+            cur = _META.get(self.meta_path)
+            if cur is None:
+                disk = _read_json(self.meta_path)
+                cur = _META[self.meta_path] = dict(_META_DEFAULT, **(disk if isinstance(disk, dict) else {}))
+            return dict(cur)
+
+    def set_meta(self, **changes: Any) -> Dict[str, Any]:
+        meta = dict(self.meta(), **changes)
+        if not meta["pending"]:
+            meta.update(pending=0, pending_since=None, attempts=0, last_error="")
+        os.makedirs(self.dir, exist_ok=True)
+        _write_json(self.meta_path, meta)
+        with _GUARD:
+            _META[self.meta_path] = meta
+        return dict(meta)
+
+    @classmethod
+    def list_for(cls, user_id: str, base_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Mirrored events of a user as `list_events_for` rows, newest first."""
+        out = []
+        for p in glob.glob(os.path.join(base_dir or MIRROR_DIR, f"{_safe(user_id)}__*.meta.json")):
+            meta = _read_json(p)
+            if not isinstance(meta, dict):
+                continue
+            eid = os.path.basename(p)[len(_safe(user_id)) + 2:-len(".meta.json")]
+            out.append({"event_id": None if eid == "default" else eid,
+                        "name": meta.get("name") or "Event", "updated_at": meta.get("updated_at")})
+        return sorted(out, key=lambda r: str(r.get("updated_at") or ""), reverse=True)
+
+
+# ---------------- background replay ----------------
+
+_REPLAYERS: Dict[str, "_Replayer"] = {}
+
+
+class _Replayer(threading.Thread):
+    def __init__(self, mirror: EventMirror, flush: Callable[[], bool]):
+        super().__init__(name=f"mirror-replay:{os.path.basename(mirror.path)}", daemon=True)
+        self.path, self.meta_path = mirror.path, mirror.meta_path
+        self.flush = flush  # pushes the outbox; True once it is empty
+
+    def _done(self) -> bool:
+        """Deregister if the outbox is still empty; one step under _GUARD, like ensure_replayer's check."""
+        with _GUARD:
+            # a save that failed after flush() returned saw this thread alive and left its entry to us
+            if (_META.get(self.meta_path) or {}).get("pending"):
+                return False
+            if _REPLAYERS.get(self.path) is self:
+                del _REPLAYERS[self.path]
+            return True
+
+    def run(self) -> None:
+        step = 0
+        try:
+            while True:
+                time.sleep(REPLAY_BACKOFF_SEC[min(step, len(REPLAY_BACKOFF_SEC) - 1)])
+                try:
+                    if self.flush() and self._done():
+                        return
+                except Exception:
+                    pass  # flush records its own failure; keep trying
+                step += 1
+        finally:
+            with _GUARD:
+                if _REPLAYERS.get(self.path) is self:
+                    del _REPLAYERS[self.path]
+
+
+def ensure_replayer(mirror: EventMirror, flush: Callable[[], bool]) -> None:
+    """Start the event's replay thread unless one is running; `flush` is swapped to the newest store's."""
+    with _GUARD:
+        cur = _REPLAYERS.get(mirror.path)
+        if cur is not None and cur.is_alive():
+            cur.flush = flush
+            return
+        cur = _REPLAYERS[mirror.path] = _Replayer(mirror, flush)
+    cur.start()
+    METRICS.incr("mirror.replayer_started")
+
+
+__all__ = ["EventMirror", "ensure_replayer", "is_offline", "mark_offline", "mark_online",
+           "MIRROR_DIR", "OFFLINE_COOLDOWN_SEC", "REPLAY_BACKOFF_SEC"]
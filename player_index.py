@@ -0,0 +1,141 @@
+"""
+Reverse index from players to the games they are paired in.
+
+    idx = PlayerIndex(state)
+    idx.games(12)     # [Slot(section="SEKSIE 1", round=2, rink=4, sitting=1, side="a"), ...]
+    idx.count(12)     # number of pairing rows the player is in
+
+Both stores build one lazily (`store.player_index()`) and keep it current
+through `store.set_pairings(key, pairs)`, so usage checks before removing a
+player, a player's game list and force-remove are lookups instead of scans
+over every pairing of every round. A store whose state is replaced wholesale
+(restore, event switch, reload) gets a fresh index on the next lookup.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from engine import slot_key
+
+
+class Slot(NamedTuple):
+    section: str      # the pairings key's section (finals list every section)
+    round: int
+    rink: int
+    sitting: int
+    side: str         # "a" or "b"
+
+    @property
+    def pair_key(self) -> str:
+        return f"{self.section}:{self.round}"
+
+    @property
+    def score_key(self) -> str:
+        return slot_key(self.pair_key, self.rink, self.sitting)
+
+
+def _slots(key: str, pairs: Iterable[Dict[str, Any]]) -> List[Tuple[int, Slot]]:
+    try:
+        section, rnd = key.rsplit(":", 1)
+        rnd_no = int(rnd)
+    except ValueError:
+        return []
+    out = []
+    for pr in pairs or []:
+        rink, sitting = int(pr.get("rink") or 0), int(pr.get("sitting") or 1)
+        for side in ("a", "b"):
+            pid = pr.get(f"{side}_id")
+            if pid:
+                out.append((int(pid), Slot(section, rnd_no, rink, sitting, side)))
+    return out
+
+
+class PlayerIndex:
+    def __init__(self, state: Optional[Dict[str, Any]] = None):
+        self.pairings: Optional[Dict[str, Any]] = None  # the dict this index reflects
+        self._by_player: Dict[int, Set[Slot]] = {}
+        self._by_key: Dict[str, List[Tuple[int, Slot]]] = {}
+        if state is not None:
+            self.rebuild(state)
+
+    def rebuild(self, state: Dict[str, Any]) -> None:
+        self.pairings = state.setdefault("pairings", {})
+        self._by_player, self._by_key = {}, {}
+        for key, pairs in self.pairings.items():
+            self._add(key, pairs)
+
+    def covers(self, state: Dict[str, Any]) -> bool:
+        return self.pairings is not None and self.pairings is state.get("pairings")
+
+    def _add(self, key: str, pairs) -> None:
+        entries = _slots(key, pairs)
+        self._by_key[key] = entries
+        for pid, slot in entries:
+            self._by_player.setdefault(pid, set()).add(slot)
+
+    def set_key(self, key: str, pairs) -> None:
+        """Re-index one pairings key after its rows were replaced."""
+        for pid, slot in self._by_key.pop(key, []):
+            bucket = self._by_player.get(pid)
+            if bucket is not None:
+                bucket.discard(slot)
+                if not bucket:
+                    del self._by_player[pid]
+        self._add(key, pairs)
+
+    def games(self, pid: int) -> List[Slot]:
+        return sorted(self._by_player.get(int(pid), ()), key=lambda s: (s.round, s.sitting, s.section, s.rink))
+
+    def count(self, pid: int) -> int:
+        return len(self._by_player.get(int(pid), ()))
+
+
+def player_games(state: Dict[str, Any], index: PlayerIndex, pid: int) -> List[Dict[str, Any]]:
+    """A player's games for display: round, rink, opponent and the saved score (from their side)."""
+    players, scores = state.get("players", {}), state.get("scores", {})
+    rows, seen = [], set()
+    for s in index.games(pid):
+        pr = next((p for p in state["pairings"].get(s.pair_key, [])
+                   if int(p.get("rink") or 0) == s.rink and int(p.get("sitting") or 1) == s.sitting
+                   and p.get(f"{s.side}_id") == pid), None)
+        if pr is None or (s.round, s.rink, s.sitting) in seen:
+            continue  # finals list the same game under every section's key
+        seen.add((s.round, s.rink, s.sitting))
+        opp = pr.get("b_id" if s.side == "a" else "a_id")
+        sc = (scores.get(s.score_key) or {}).get(s.side)
+        rows.append({
+            "Round": s.round, "Key": s.pair_key,
+            "Rink": s.rink if s.sitting <= 1 else f"{s.rink}·{s.sitting}", "Side": s.side.upper(),
+            "Opponent": f"#{opp} {players.get(str(opp), {}).get('name', '')}".strip() if opp else "bye",
+            "Vir": sc.get("vir") if sc else None, "Teen": sc.get("teen") if sc else None,
+        })
+    return rows
+
+
+def clear_player(state: Dict[str, Any], index: PlayerIndex, pid: int) -> Tuple[int, int]:
+    """Take `pid` out of every pairing and drop the scores of those games.
+
+    Returns (pairing rows changed, scores removed). Per-end rows of the same
+    games go too; ratings follow on the next save (sync_ratings reverts them).
+    """
+    rows = scores = 0
+    for key in sorted({s.pair_key for s in index.games(pid)}):
+        pairs = state["pairings"].get(key, [])
+        for pr in pairs:
+            hit = False
+            for side in ("a_id", "b_id"):
+                if pr.get(side) == pid:
+                    pr[side] = None
+                    hit = True
+            if hit:
+                rows += 1
+                sk = slot_key(key, pr.get("rink"), pr.get("sitting", 1))
+                if state.get("scores", {}).pop(sk, None) is not None:
+                    scores += 1
+                state.get("scores_per_end", {}).pop(sk, None)
+        index.set_key(key, pairs)
+    return rows, scores
+
+
+__all__ = ["PlayerIndex", "Slot", "player_games", "clear_player"]
@@ -0,0 +1,122 @@
+"""
+Per-rerun hot-path profiler, switched on with `?debug=1` (same switch as the
+auth diagnostics).
+
+Usage in app.py:
+
+    prof = RerunProfiler(enabled=want_debug)
+    with prof.span("auth gate"):
+        ...
+    compute_standings = prof.wrap("compute_standings", compute_standings)
+    ...
+    prof.finish()  # at the end of the script: records + renders the sidebar panel
+
+Runs that end early go through `prof.rerun()` / `prof.stop()` instead of
+`st.rerun()` / `st.stop()`: those record the run first (save-then-rerun
+paths included), then raise as usual.
+
+When disabled every call is a no-op (`span` returns a shared nullcontext and
+`wrap` returns the function unchanged), so normal sessions pay nothing.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Callable, Dict, List
+
+import streamlit as st
+
+_HISTORY_KEY = "_prof_history"
+_NULL = nullcontext()
+
+
+class RerunProfiler:
+    """Collects wall time per named span for one script run."""
+
+    def __init__(self, enabled: bool, history: int = 30):
+        self.enabled = enabled
+        self.history = history
+        self.t0 = time.perf_counter()
+        self.spans: Dict[str, List[float]] = {}  # name -> [calls, total_seconds]
+        self.done = False
+
+    def add(self, name: str, seconds: float) -> None:
+        agg = self.spans.setdefault(name, [0, 0.0])
+        agg[0] += 1
+        agg[1] += seconds
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NULL
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name: str):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t)
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        if not self.enabled:
+            return fn
+
+        @wraps(fn)
+        def timed(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - t)
+        return timed
+
+    def finish(self, end: str = "done") -> None:
+        """Push this rerun onto the rolling history and draw the sidebar panel (once per run)."""
+        if not self.enabled or self.done:
+            return
+        self.done = True
+        total = time.perf_counter() - self.t0
+        hist = st.session_state.setdefault(_HISTORY_KEY, [])
+        hist.append({
+            "ts": time.time(),
+            "total_ms": round(total * 1e3, 1),
+            "end": end,  # "done", or "rerun"/"stop" when the script was cut short
+            "spans": {k: round(v[1] * 1e3, 1) for k, v in self.spans.items()},
+        })
+        del hist[:-self.history]
+        if end != "rerun":  # a rerun discards this run's elements anyway
+            self._render(total, hist)
+
+    def rerun(self) -> None:
+        """`st.rerun()`, recording this run first."""
+        self.finish("rerun")
+        st.rerun()
+
+    def stop(self) -> None:
+        """`st.stop()`, recording (and showing) this run first."""
+        self.finish("stop")
+        st.stop()
+
+    def _render(self, total: float, hist: List[Dict]) -> None:
+        with st.sidebar.expander(f"⏱ Rerun profile · {total * 1e3:.0f} ms", expanded=True):
+            rows = sorted(self.spans.items(), key=lambda kv: kv[1][1], reverse=True)
+            st.table([{"Span": k, "Calls": int(c), "ms": round(s * 1e3, 1)} for k, (c, s) in rows])
+            cut = sum(1 for h in hist if h.get("end", "done") != "done")
+            st.caption(f"Last {len(hist)} reruns (ms)" + (f", {cut} ended by st.rerun/st.stop" if cut else ""))
+            st.line_chart([h["total_ms"] for h in hist], height=120)
+            names = sorted({k for h in hist for k in h["spans"]})
+            if names:
+                st.dataframe(
+                    [{"Span": k,
+                      "avg": round(sum(h["spans"].get(k, 0.0) for h in hist) / len(hist), 1),
+                      "max": max(h["spans"].get(k, 0.0) for h in hist)} for k in names],
+                    hide_index=True, use_container_width=True,
+                )
+            if st.button("Clear history", key="prof_clear"):
+                st.session_state[_HISTORY_KEY] = []
+
+
+__all__ = ["RerunProfiler"]
@@ -0,0 +1,324 @@
+"""
+Monte Carlo projections: each player's chance of finishing in each position of
+their section once the remaining rounds are played.
+
+    proj = project_section(state, "SEKSIE 1", sims=2000, seed=1)
+    proj.position_probs   # (players x positions) array, rows in current-standings order
+    proj.summary_rows()   # table rows for the UI
+
+Everything runs on NumPy arrays shaped (sims, players):
+
+  * current Punte/Bonus/Verskil come from `compute_standings`
+  * rounds that already have pairings replay those pairings (unscored rinks only)
+  * rounds without pairings are paired the way the section's rounds were last
+    generated (`section_mode`, from the audit log): round robin plays its fixed
+    schedule (`round_robin_round`); strong vs strong, and Dutch Swiss as its
+    approximation, pair down each simulation's own standings, skipping players
+    who already met like `strong_vs_strong_pairs`
+  * a game's shot difference is Normal(strength_a - strength_b, sigma), rounded;
+    strength is the player's shrunk mean difference per game and sigma is the
+    spread of margins played so far in the event
+  * points and bonus follow `round_result`, ordering follows `sort_standings`
+
+`workers > 1` splits the simulations over processes; it only pays off for very
+large fields or simulation counts.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from engine import PlayerStanding, compute_standings, pair_slot_key, round_robin_round
+
+DEFAULT_SIMS = 2000
+DEFAULT_SIGMA = 8.0   # shots; used until enough games are played to estimate it
+MIN_GAMES_FOR_SIGMA = 10
+SHRINK_GAMES = 2.0    # strength = verskil / (games + SHRINK_GAMES)
+
+
+@dataclass
+class Projection:
+    section: str
+    players: List[PlayerStanding]   # current standings order
+    position_probs: np.ndarray      # [i, p] = P(player i finishes in position p+1)
+    sims: int
+    remaining_rounds: List[int]
+
+    def expected_position(self) -> np.ndarray:
+        return self.position_probs @ np.arange(1, self.position_probs.shape[1] + 1)
+
+    def summary_rows(self, top: Sequence[int] = (1, 3)) -> List[Dict]:
+        exp = self.expected_position()
+        rows = []
+        for i, r in enumerate(self.players):
+            row = {"Posisie": i + 1, "#": r.player_id, "Speler": r.name, "Total": r.punte + r.bonus,
+                   "Verw. posisie": round(float(exp[i]), 1)}
+            for k in top:
+                row[f"P(top {k})" if k > 1 else "P(wen)"] = round(float(self.position_probs[i, :k].sum()), 3)
+            rows.append(row)
+        return rows
+
+
+# ---------------- inputs from the state ----------------
+
+def _game_margins(state: Dict) -> Tuple[Dict[int, int], List[int]]:
+    """(games played per player, all A-side margins) from scored section games.
+
+    Finals list one game under every section's key; like validate_event, the
+    copies count once. Knockout games are left out.
+    """
+    games: Dict[int, int] = {}
+    margins: List[int] = []
+    scores = state.get("scores", {})
+    brackets = state.get("brackets") or {}
+    seen = set()
+    for key, prs in state.get("pairings", {}).items():
+        sec, _, rnd = key.rpartition(":")
+        if sec in brackets:
+            continue
+        for pr in prs:
+            a, b, rink = pr.get("a_id"), pr.get("b_id"), pr.get("rink")
+            if not a or not b or not rink:
+                continue
+            game = (rnd, rink, pr.get("sitting", 1) or 1, min(a, b), max(a, b))
+            if game in seen:
+                continue
+            sc = scores.get(pair_slot_key(key, pr))
+            if not _is_played(sc):
+                continue
+            seen.add(game)
+            games[a] = games.get(a, 0) + 1
+            games[b] = games.get(b, 0) + 1
+            margins.append(int(sc["a"].get("vir", 0)) - int(sc["a"].get("teen", 0)))
+    return games, margins
+
+
+def _is_played(sc: Optional[Dict]) -> bool:
+    # same rule as compute_standings: missing or 0-0 everywhere is "not played yet"
+    if not sc:
+        return False
+    a, b = sc.get("a", {}), sc.get("b", {})
+    return any(int(x or 0) for x in (a.get("vir"), a.get("teen"), b.get("vir"), b.get("teen")))
+
+
+# audit actions of the per-section Generate buttons -> generate_round mode
+_GEN_ACTIONS = {"generate_r1_random": "random", "generate_r1_seeded": "seeded",
+                "generate_strong_vs_strong": "strong", "generate_dutch_swiss": "dutch",
+                "generate_roundrobin": "roundrobin"}
+
+
+def section_mode(state: Dict, section: str) -> str:
+    """The generate_round mode the section's rounds were last generated with (default "strong")."""
+    for entry in reversed(state.get("audit") or []):
+        payload = entry.get("payload") or {}
+        action = entry.get("action")
+        if action in _GEN_ACTIONS and payload.get("section") == section:
+            return _GEN_ACTIONS[action]
+        if action == "generate_all_sections" or (action == "cli_generate" and section in (payload.get("sections") or [])):
+            return payload.get("mode") or "strong"
+        if action == "generate_finals_mix_both":
+            return "finals"
+    return "strong"
+
+
+def _remaining(state: Dict, section: str, index: Dict[int, int],
+               mode: str) -> List[Tuple[int, Optional[np.ndarray]]]:
+    """[(round, fixed (k, 2) index pairs or None to pair by standings)] still to play."""
+    out = []
+    scores = state.get("scores", {})
+    rules = state.get("rules", {})
+    ids = sorted(index)  # generate_round's player order for the round robin
+    for rnd in range(1, int(state.get("rounds", 6)) + 1):
+        key = f"{section}:{rnd}"
+        prs = state.get("pairings", {}).get(key)
+        if not prs and mode == "roundrobin":
+            # the schedule is fixed: the same games in every simulation
+            games = [(index[a], index[b]) for a, b in round_robin_round(
+                ids, rnd, bool(rules.get("RR_DOUBLE", False)), bool(rules.get("RR_BALANCED", False))) if a and b]
+            if games:
+                out.append((rnd, np.array(games, dtype=np.int64)))
+            continue
+        if not prs:
+            out.append((rnd, None))
+            continue
+        pending = [(index[pr["a_id"]], index[pr["b_id"]]) for pr in prs
+                   if pr.get("a_id") in index and pr.get("b_id") in index and pr.get("rink")
+                   and not _is_played(scores.get(pair_slot_key(key, pr)))]
+        if pending:
+            out.append((rnd, np.array(pending, dtype=np.int64)))
+    return out
+
+
+# ---------------- vectorised rules and ordering ----------------
+
+def apply_rules(diff: np.ndarray, rules: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """Array version of `round_result`: (punte, bonus) for shot differences `diff`."""
+    pts = np.where(diff > 0, rules.get("POINTS_WIN", 2),
+                   np.where(diff == 0, rules.get("POINTS_DRAW", 1), rules.get("POINTS_LOSS", 0)))
+    if rules.get("BONUS_ENABLED", False):
+        bonus = (np.abs(diff) >= int(rules.get("BONUS_THRESHOLD", 10))) * int(rules.get("BONUS_POINTS", 1))
+    else:
+        bonus = np.zeros_like(diff)
+    return pts.astype(np.int64), bonus.astype(np.int64)
+
+
+def _order(punte: np.ndarray, bonus: np.ndarray, verskil: np.ndarray, pids: np.ndarray,
+           rating: np.ndarray, tiebreakers: Sequence[str]) -> np.ndarray:
+    """Per-simulation player order (best first), matching `sort_standings`."""
+    sims = punte.shape[0]
+    keys: List[np.ndarray] = []  # ascending is better, most significant first
+    for tb in tiebreakers:
+        if tb == "Total":
+            keys.append(-(punte + bonus))
+        elif tb == "Punte":
+            keys.append(-punte)
+        elif tb == "Bonus":
+            keys.append(-bonus)
+        elif tb == "Verskil":
+            keys.append(-verskil)
+        elif tb == "Rating":
+            keys.append(np.broadcast_to(-rating, punte.shape))
+        elif tb == "Player#":
+            keys.append(np.broadcast_to(pids, punte.shape))
+        elif tb == "Coinflip":
+            keys.append(np.broadcast_to((pids * 9301 + 49297) % 233280, punte.shape))
+    keys.append(np.broadcast_to(pids, punte.shape))
+
+    # Pack the keys into one int64 when their ranges allow it: a single argsort
+    # is several times faster than lexsort over (sims, players).
+    packed = np.zeros((sims, punte.shape[1]), dtype=np.int64)
+    span = 1
+    for k in reversed(keys):
+        lo, hi = int(k.min()), int(k.max())
+        width = hi - lo + 1
+        if span * width >= 2 ** 62:
+            return np.lexsort(tuple(reversed(keys)), axis=-1)
+        packed += (k - lo) * span
+        span *= width
+    return np.argsort(packed, axis=1, kind="stable")
+
+
+def _met(state: Dict, section: str, index: Dict[int, int]) -> np.ndarray:
+    """[i, j] = players i and j already have a game in the section's pairings (played or not)."""
+    met = np.zeros((len(index), len(index)), dtype=bool)
+    for key, prs in state.get("pairings", {}).items():
+        if key.rpartition(":")[0] != section:
+            continue
+        for pr in prs:
+            i, j = index.get(pr.get("a_id")), index.get(pr.get("b_id"))
+            if i is not None and j is not None:
+                met[i, j] = met[j, i] = True
+    return met
+
+
+def _pair_strong(order: np.ndarray, met: np.ndarray, opp: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """`strong_vs_strong_pairs` for every simulation at once.
+
+    Walking down each simulation's `order`, the best unpaired player takes the
+    next unpaired one they have not met (in `met` or in an earlier simulated
+    round's `opp`), else the next unpaired one. An odd field leaves the last
+    player out (bye).
+    """
+    sims, n = order.shape
+    rows = np.arange(sims)
+    free = np.ones((sims, n), dtype=bool)  # by position in `order`
+    a_out = np.empty((sims, n // 2), dtype=np.int64)
+    b_out = np.empty((sims, n // 2), dtype=np.int64)
+    for k in range(n // 2):
+        i = free.argmax(axis=1)  # the best player still unpaired
+        free[rows, i] = False
+        a = order[rows, i]
+        seen = met[a[:, None], order]
+        for o in opp:
+            seen |= o[rows, a][:, None] == order
+        fresh = free & ~seen
+        j = np.where(fresh.any(axis=1), fresh.argmax(axis=1), free.argmax(axis=1))
+        free[rows, j] = False
+        a_out[:, k], b_out[:, k] = a, order[rows, j]
+    return a_out, b_out
+
+
+# ---------------- simulation ----------------
+
+def _simulate(seed: int, sims: int, punte0, bonus0, verskil0, pids, rating, strength, sigma: float,
+              rounds, rules: Dict, tiebreakers: Sequence[str], met: np.ndarray) -> np.ndarray:
+    """Position counts [player, position] over `sims` completions."""
+    rng = np.random.default_rng(seed)
+    n = len(pids)
+    punte = np.repeat(punte0[None, :], sims, axis=0)
+    bonus = np.repeat(bonus0[None, :], sims, axis=0)
+    verskil = np.repeat(verskil0[None, :], sims, axis=0)
+    rows = np.arange(sims)[:, None]
+    opp: List[np.ndarray] = []  # [sim, player] = opponent in each paired-by-standings round, -1 if none
+
+    for _, fixed in rounds:
+        if fixed is not None:
+            a = np.broadcast_to(fixed[:, 0], (sims, len(fixed)))
+            b = np.broadcast_to(fixed[:, 1], (sims, len(fixed)))
+        else:
+            order = _order(punte, bonus, verskil, pids, rating, tiebreakers)
+            a, b = _pair_strong(order, met, opp)
+            o = np.full((sims, n), -1, dtype=np.int64)
+            o[rows, a], o[rows, b] = b, a
+            opp.append(o)
+        diff = np.rint(strength[a] - strength[b] + rng.normal(0.0, sigma, a.shape)).astype(np.int64)
+        pa, ba = apply_rules(diff, rules)
+        pb, bb = apply_rules(-diff, rules)
+        # each player appears at most once per round, so plain fancy-index adds are safe
+        punte[rows, a] += pa; punte[rows, b] += pb
+        bonus[rows, a] += ba; bonus[rows, b] += bb
+        verskil[rows, a] += diff; verskil[rows, b] -= diff
+
+    order = _order(punte, bonus, verskil, pids, rating, tiebreakers)
+    pos = np.broadcast_to(np.arange(n), order.shape)
+    return np.bincount((order * n + pos).ravel(), minlength=n * n).reshape(n, n)
+
+
+def project_section(state: Dict, section: str, sims: int = DEFAULT_SIMS, seed: Optional[int] = None,
+                    workers: int = 1, mode: Optional[str] = None) -> Projection:
+    """Simulate the rest of `section`'s rounds `sims` times.
+
+    `mode` is the generate_round mode for rounds without pairings (default:
+    `section_mode`); "roundrobin" plays the fixed schedule, any other pairs by
+    standings without repeats.
+    """
+    rules = state.get("rules", {})
+    tiebreakers = rules.get("TIEBREAKERS", ["Total", "Verskil", "Player#"])
+    table = compute_standings(state, section, rules, tiebreakers)
+    n = len(table)
+    if n == 0:
+        return Projection(section, table, np.zeros((0, 0)), sims, [])
+
+    pids = np.array([r.player_id for r in table], dtype=np.int64)
+    index = {int(p): i for i, p in enumerate(pids)}
+    punte0 = np.array([r.punte for r in table], dtype=np.int64)
+    bonus0 = np.array([r.bonus for r in table], dtype=np.int64)
+    verskil0 = np.array([r.verskil for r in table], dtype=np.int64)
+    # ratings only order players here; tenths keep the packed sort key integral
+    rating = np.rint(np.array([r.rating for r in table]) * 10).astype(np.int64)
+
+    games, margins = _game_margins(state)
+    played = np.array([games.get(int(p), 0) for p in pids], dtype=np.float64)
+    strength = verskil0 / (played + SHRINK_GAMES)
+    sigma = float(np.std(margins)) if len(margins) >= MIN_GAMES_FOR_SIGMA else DEFAULT_SIGMA
+    sigma = max(sigma, 1.0)
+
+    rounds = _remaining(state, section, index, mode or section_mode(state, section))
+    args = (punte0, bonus0, verskil0, pids, rating, strength, sigma, rounds, rules, tiebreakers,
+            _met(state, section, index))
+    seeds = np.random.SeedSequence(seed).spawn(max(1, workers))
+    if workers > 1 and sims >= 2 * workers:
+        chunks = [sims // workers + (1 if i < sims % workers else 0) for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futs = [pool.submit(_simulate, s.generate_state(1)[0], c, *args) for s, c in zip(seeds, chunks)]
+            counts = sum(f.result() for f in futs)
+    else:
+        counts = _simulate(seeds[0].generate_state(1)[0], sims, *args)
+    return Projection(section, table, counts / float(sims), sims, [r for r, _ in rounds])
+
+
+__all__ = ["Projection", "project_section", "section_mode", "apply_rules", "DEFAULT_SIMS"]
@@ -0,0 +1,250 @@
+"""
+Elo player ratings kept in the event state and updated as scores are saved.
+
+    state["ratings"] = {
+        "players": {"12": {"r": 1512.4, "n": 3}, ...},   # current rating, games rated
+        "base":    {"12": 1530.0, ...},                   # optional starting ratings (archive)
+        "applied": {"2:5:12": [a, b, vir, teen, delta_a], ...},
+    }
+
+`sync_ratings(state)` runs on every store save. It compares the played games
+with `applied` and only reverts/applies the games that are new, changed or
+gone, so a save costs one pass over the scores and reading ratings is
+O(players). Games are applied in the order they are saved; `rebuild_ratings`
+replays the event round by round instead (NumPy, one vector update per round)
+and is what the Tools tab and the CLI use.
+
+Across events players are matched by name (`rebuild_archive`), so an archive of
+past event files can seed a new event (`seed_from_archive`):
+
+    python -m ratings archive/*.json --out data/ratings.json
+    python -m ratings archive/*.json --seed data/event.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_RATING = 1500.0
+K_FACTOR = 24.0
+SCALE = 400.0
+
+# gid -> (round, a_id, b_id, a_vir, a_teen)
+Game = Tuple[int, int, int, int, int]
+
+
+def expected(ra: float, rb: float) -> float:
+    """Elo expected score of A against B."""
+    return 1.0 / (1.0 + 10.0 ** ((rb - ra) / SCALE))
+
+
+def _outcome(vir: int, teen: int) -> float:
+    return 1.0 if vir > teen else 0.5 if vir == teen else 0.0
+
+
+def _games(state: Dict[str, Any]) -> Dict[str, Game]:
+    """Played games keyed by "round:lo_id:hi_id".
+
+    Finals list the same pairs under every section's key; the first scored key
+    (in sorted order) stands for the game so it is rated once.
+    """
+    out: Dict[str, Game] = {}
+    scores = state.get("scores", {})
+    for key in sorted(state.get("pairings", {})):
+        try:
+            rnd = int(key.rsplit(":", 1)[1])
+        except (IndexError, ValueError):
+            continue
+        for pr in state["pairings"][key]:
+            a, b, rink = pr.get("a_id"), pr.get("b_id"), pr.get("rink")
+            if not a or not b or not rink:
+                continue
+            sitting = int(pr.get("sitting") or 1)
+            sc = scores.get(f"{key}:{rink}" if sitting <= 1 else f"{key}:{rink}:{sitting}")
+            if not sc:
+                continue
+            va, ta = int(sc.get("a", {}).get("vir", 0)), int(sc.get("a", {}).get("teen", 0))
+            vb, tb = int(sc.get("b", {}).get("vir", 0)), int(sc.get("b", {}).get("teen", 0))
+            if va == 0 and ta == 0 and vb == 0 and tb == 0:
+                continue  # 0-0 placeholder, as in compute_standings
+            gid = f"{rnd}:{min(a, b)}:{max(a, b)}"
+            out.setdefault(gid, (rnd, int(a), int(b), va, ta))
+    return out
+
+
+def _bucket(state: Dict[str, Any]) -> Dict[str, Any]:
+    rt = state.setdefault("ratings", {})
+    rt.setdefault("players", {})
+    rt.setdefault("base", {})
+    rt.setdefault("applied", {})
+    return rt
+
+
+def player_rating(state: Dict[str, Any], pid: int) -> float:
+    rt = state.get("ratings") or {}
+    cur = rt.get("players", {}).get(str(pid))
+    if cur is not None:
+        return float(cur["r"])
+    return float(rt.get("base", {}).get(str(pid), DEFAULT_RATING))
+
+
+def player_ratings(state: Dict[str, Any]) -> Dict[int, float]:
+    """{pid: rating} for every registered player (unrated players get their base/default)."""
+    return {int(pid): player_rating(state, int(pid)) for pid in state.get("players", {})}
+
+
+def sync_ratings(state: Dict[str, Any]) -> int:
+    """Apply score changes since the last sync; returns the number of games (re)rated."""
+    games = _games(state)
+    rt = _bucket(state)
+    if not games and not rt["applied"]:
+        return 0
+    players, applied = rt["players"], rt["applied"]
+
+    def entry(pid: int) -> Dict[str, Any]:
+        e = players.get(str(pid))
+        if e is None:
+            e = players[str(pid)] = {"r": float(rt["base"].get(str(pid), DEFAULT_RATING)), "n": 0}
+        return e
+
+    for gid in [g for g, sig in applied.items() if games.get(g, (None,))[1:] != tuple(sig[:4])]:
+        a, b, _, _, da = applied.pop(gid)
+        ea, eb = entry(a), entry(b)
+        ea["r"] -= da; ea["n"] -= 1
+        eb["r"] += da; eb["n"] -= 1
+
+    changed = 0
+    for gid, (_, a, b, va, ta) in sorted(games.items(), key=lambda kv: kv[1][0]):
+        if gid in applied:
+            continue
+        ea, eb = entry(a), entry(b)
+        da = K_FACTOR * (_outcome(va, ta) - expected(ea["r"], eb["r"]))
+        ea["r"] += da; ea["n"] += 1
+        eb["r"] -= da; eb["n"] += 1
+        applied[gid] = [a, b, va, ta, da]
+        changed += 1
+    return changed
+
+
+# ---------------- vectorised rebuilds ----------------
+
+def _replay(batches: Iterable[Tuple[List, List, List[float]]], initial: Dict[Any, float]):
+    """Replay batches of simultaneous games; each batch is (a ids, b ids, A outcomes).
+
+    Within a batch every player plays at most once (one round of one event), so
+    the whole batch is one vector update. Returns (ids, ratings, games, deltas per batch).
+    """
+    import numpy as np
+
+    ids: List[Any] = list(initial)
+    index = {k: i for i, k in enumerate(ids)}
+    r = np.array([initial[k] for k in ids], dtype=np.float64)
+    n = np.zeros(len(ids), dtype=np.int64)
+    deltas = []
+    for keys_a, keys_b, s in batches:
+        for k in list(keys_a) + list(keys_b):
+            if k not in index:
+                index[k] = len(ids); ids.append(k)
+        if len(ids) > len(r):
+            r = np.concatenate([r, np.full(len(ids) - len(r), DEFAULT_RATING)])
+            n = np.concatenate([n, np.zeros(len(ids) - len(n), dtype=np.int64)])
+        a = np.fromiter((index[k] for k in keys_a), dtype=np.int64, count=len(keys_a))
+        b = np.fromiter((index[k] for k in keys_b), dtype=np.int64, count=len(keys_b))
+        d = K_FACTOR * (np.asarray(s, dtype=np.float64) - 1.0 / (1.0 + 10.0 ** ((r[b] - r[a]) / SCALE)))
+        np.add.at(r, a, d); np.add.at(r, b, -d)
+        np.add.at(n, a, 1); np.add.at(n, b, 1)
+        deltas.append(d)
+    return ids, r, n, deltas
+
+
+def _round_batches(games: Dict[str, Game], ident) -> List[Tuple[List[str], List, List, List[float]]]:
+    by_round: Dict[int, List[Tuple[str, Game]]] = {}
+    for gid, g in games.items():
+        by_round.setdefault(g[0], []).append((gid, g))
+    out = []
+    for rnd in sorted(by_round):
+        gs = by_round[rnd]
+        out.append(([gid for gid, _ in gs], [ident(g[1]) for _, g in gs], [ident(g[2]) for _, g in gs],
+                    [_outcome(g[3], g[4]) for _, g in gs]))
+    return out
+
+
+def rebuild_ratings(state: Dict[str, Any]) -> int:
+    """Recompute the event's ratings from scratch in round order; returns games rated."""
+    rt = _bucket(state)
+    games = _games(state)
+    initial = {int(pid): float(rt["base"].get(str(pid), DEFAULT_RATING)) for pid in state.get("players", {})}
+    batches = _round_batches(games, int)
+    ids, r, n, deltas = _replay(((a, b, s) for _, a, b, s in batches), initial)
+    rt["players"] = {str(pid): {"r": float(r[i]), "n": int(n[i])} for i, pid in enumerate(ids)}
+    rt["applied"] = {}
+    for (gids, _, _, _), d in zip(batches, deltas):
+        for gid, da in zip(gids, d.tolist()):
+            _, a, b, va, ta = games[gid]
+            rt["applied"][gid] = [a, b, va, ta, da]
+    return len(games)
+
+
+def _name_key(name: str) -> str:
+    return " ".join(str(name).split()).lower()
+
+
+def rebuild_archive(states: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Ratings across events (oldest first), players matched by name, in one replay."""
+    batches, events, n_games = [], 0, 0
+    for state in states:
+        events += 1
+        names = {int(pid): _name_key(p.get("name", pid)) for pid, p in state.get("players", {}).items()}
+        games = _games(state)
+        n_games += len(games)
+        for _, a, b, s in _round_batches(games, lambda pid: names.get(pid, f"#{pid}")):
+            batches.append((a, b, s))
+    ids, r, n, _ = _replay(batches, {})
+    return {
+        "events": events, "games": n_games,
+        "players": {k: {"r": round(float(r[i]), 2), "n": int(n[i])} for i, k in enumerate(ids)},
+    }
+
+
+def seed_from_archive(state: Dict[str, Any], archive: Dict[str, Any]) -> int:
+    """Use archive ratings (by name) as this event's starting ratings; returns players matched."""
+    known = archive.get("players", {})
+    rt = _bucket(state)
+    rt["base"] = {}
+    for pid, p in state.get("players", {}).items():
+        hit = known.get(_name_key(p.get("name", "")))
+        if hit is not None:
+            rt["base"][str(pid)] = float(hit["r"])
+    rebuild_ratings(state)
+    return len(rt["base"])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="ratings", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("files", nargs="+", help="archived event JSON files, oldest first")
+    ap.add_argument("--out", help="write the archive ratings JSON here")
+    ap.add_argument("--seed", metavar="EVENT_JSON", help="seed this event's starting ratings from the archive")
+    args = ap.parse_args(argv)
+
+    from rolbal import load_event, save_event
+    archive = rebuild_archive(load_event(p) for p in args.files)
+    print(f"{archive['events']} event(s), {archive['games']} game(s), {len(archive['players'])} player(s)")
+    if args.out:
+        save_event(archive, args.out)
+    if args.seed:
+        state = load_event(args.seed)
+        matched = seed_from_archive(state, archive)
+        save_event(state, args.seed)
+        print(f"seeded {matched} of {len(state.get('players', {}))} player(s) in {args.seed}")
+    if not args.out and not args.seed:
+        top = sorted(archive["players"].items(), key=lambda kv: -kv[1]["r"])[:20]
+        for name, p in top:
+            print(f"{p['r']:>8.1f}  {p['n']:>4}  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
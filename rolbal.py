@@ -0,0 +1,253 @@
+"""
+Headless command line for batch engine operations on event files.
+
+Event files are the JSON the app stores (`data/event.json`) or the JSON
+backup downloaded from Tools. Every command accepts many files and runs them
+in a process pool (`--jobs`), so a multi-venue day can be prepared at once.
+
+    python -m rolbal generate data/*.json --round 2 --mode strong
+    python -m rolbal generate venue_a.json venue_b.json --all-rounds --mode roundrobin
+    python -m rolbal standings data/event.json [--section "SEKSIE 1"] [--as-of 3] [--json]
+    python -m rolbal validate data/*.json [--only double_booked,repeat_opponent]
+    python -m rolbal export data/*.json --out-dir exports/
+
+`generate` writes the file back in place (or into --out-dir) and appends
+one audit entry per file, like the Schedule tab does. Rounds that are
+locked or already have scores are left alone and listed as skipped, unless
+--force is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+
+from engine import (GEN_MODES, ISSUE_KINDS, generate_all_sections, generate_round, parse_slot_key,
+                    standings_history, standings_tables, validate_event)
+
+
+def load_event(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_event(state: Dict[str, Any], path: str) -> None:
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _target(path: str, out_dir: Optional[str], suffix: Optional[str] = None) -> str:
+    base = os.path.basename(path)
+    if suffix:
+        base = os.path.splitext(base)[0] + suffix
+    return os.path.join(out_dir, base) if out_dir else os.path.join(os.path.dirname(path), base)
+
+
+# ---------------- commands (one file each; run in worker processes) ----------------
+
+def _protected_keys(state: Dict[str, Any]) -> Set[str]:
+    """Pairings keys that are locked or have scores: regenerating them would move results to new pairs."""
+    keys = {k for k, on in (state.get("locks") or {}).items() if on}
+    for sk in state.get("scores") or {}:
+        parsed = parse_slot_key(sk)
+        if parsed:
+            keys.add(f"{parsed[0]}:{parsed[1]}")
+    return keys
+
+
+def cmd_generate(path: str, opts: Dict[str, Any]) -> Dict[str, Any]:
+    state = load_event(path)
+    sections = [opts["section"]] if opts.get("section") else list(state.get("sections", []))
+    rounds = range(1, int(state.get("rounds", 6)) + 1) if opts.get("all_rounds") else [int(opts["round"])]
+    rng = random.Random(opts.get("seed"))
+    mode = opts["mode"]
+    protected = set() if opts.get("force") else _protected_keys(state)
+    written, skipped = [], []
+    for rnd in rounds:
+        if opts.get("section"):
+            generated = generate_round(state, opts["section"], rnd, mode, rng)
+        else:
+            # files already run in a process pool; sections stay in this worker unless --workers
+            generated = generate_all_sections(state, rnd, mode, rng, workers=opts.get("workers", 1) or None)
+        held = sorted(k for k in generated if k in protected)
+        if held and mode == "finals":
+            held = sorted(generated)  # finals share one pairing list across sections: all or none
+        skipped.extend(held)
+        generated = {k: v for k, v in generated.items() if k not in held}
+        state.setdefault("pairings", {}).update(generated)
+        written.extend(generated)
+    state.setdefault("audit", []).append({
+        "ts": time.time(), "action": "cli_generate",
+        "payload": {"mode": mode, "rounds": list(rounds), "sections": sections, "skipped": skipped},
+    })
+    out = _target(path, opts.get("out_dir"))
+    if not opts.get("dry_run"):
+        save_event(state, out)
+    return {"file": path, "ok": True, "written": out, "keys": written, "skipped": skipped}
+
+
+def _standing_rows(table, with_section: bool) -> List[Dict[str, Any]]:
+    rows = []
+    for i, r in enumerate(table):
+        row = {"Posisie": i + 1, "#": r.player_id, "Speler": r.name}
+        if with_section:
+            row["Sek"] = r.section
+        row.update({"Total": r.punte + r.bonus, "Punte": r.punte, "Bonus": r.bonus, "Verskil": r.verskil})
+        rows.append(row)
+    return rows
+
+
+def cmd_standings(path: str, opts: Dict[str, Any]) -> Dict[str, Any]:
+    if opts.get("as_of"):
+        # "as of round r" plus each player's movement in that round ("±", + is up)
+        hist = standings_history(load_event(path))
+        r = int(opts["as_of"])
+        tables = {}
+        for name in hist.order:
+            moves = hist.movement(name, r) if r >= 2 else {}
+            tables[name] = _standing_rows(hist.table(name, r), name == "Combined")
+            for row in tables[name]:
+                row["±"] = moves.get(row["#"])
+    else:
+        tables = {
+            name: _standing_rows(tbl, name == "Combined")
+            for name, tbl in standings_tables(load_event(path)).items()
+        }
+    if opts.get("section"):
+        tables = {opts["section"]: tables.get(opts["section"], [])}
+    return {"file": path, "ok": True, "standings": tables}
+
+
+def cmd_validate(path: str, opts: Dict[str, Any]) -> Dict[str, Any]:
+    only = set(opts.get("only") or ISSUE_KINDS)
+    issues = [i for i in validate_event(load_event(path)) if i.kind in only]
+    counts = {k: sum(1 for i in issues if i.kind == k) for k in ISSUE_KINDS if k in only}
+    return {"file": path, "ok": not issues, "counts": counts, "issues": [i.message for i in issues]}
+
+
+def cmd_export(path: str, opts: Dict[str, Any]) -> Dict[str, Any]:
+    from excel_io import build_export_workbook
+    data = build_export_workbook(load_event(path))
+    out = _target(path, opts.get("out_dir"), ".xlsx")
+    d = os.path.dirname(out)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    with open(out, "wb") as f:
+        f.write(data)
+    return {"file": path, "ok": True, "written": out, "bytes": len(data)}
+
+
+COMMANDS = {
+    "generate": cmd_generate,
+    "standings": cmd_standings,
+    "validate": cmd_validate,
+    "export": cmd_export,
+}
+
+
+def _run_one(task) -> Dict[str, Any]:
+    name, path, opts = task
+    try:
+        return COMMANDS[name](path, opts)
+    except Exception as e:
+        return {"file": path, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def run_batch(name: str, paths: List[str], opts: Dict[str, Any], jobs: int) -> List[Dict[str, Any]]:
+    tasks = [(name, p, opts) for p in paths]
+    if jobs <= 1 or len(tasks) <= 1:
+        return [_run_one(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_run_one, tasks))
+
+
+def _print_human(name: str, results: List[Dict[str, Any]]) -> None:
+    for r in results:
+        if not r.get("ok") and r.get("error"):
+            print(f"✗ {r['file']}: {r['error']}")
+            continue
+        if name == "standings":
+            print(f"== {r['file']}")
+            for sec, rows in r["standings"].items():
+                print(f"-- {sec}")
+                for row in rows:
+                    move = row.get("±")
+                    move = "" if move is None else f"  {move:+d}" if move else "   ="
+                    print(f"{row['Posisie']:>4}  #{row['#']:<5} {row['Speler']:<28}"
+                          f" Total {row['Total']:>3}  Verskil {row['Verskil']:>4}{move}")
+        elif name == "validate":
+            counts = ", ".join(f"{k} {n}" for k, n in r["counts"].items() if n)
+            print(f"{'✓' if r['ok'] else '✗'} {r['file']}: {len(r['issues'])} issue(s)" + (f" ({counts})" if counts else ""))
+            for msg in r["issues"]:
+                print(f"    {msg}")
+        else:
+            extra = f" ({len(r['keys'])} pairing list(s))" if "keys" in r else ""
+            print(f"✓ {r['file']} -> {r['written']}{extra}")
+            if r.get("skipped"):
+                print(f"    skipped (locked or scored; --force to overwrite): {', '.join(r['skipped'])}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="rolbal", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    def common(p):
+        p.add_argument("files", nargs="+", help="event JSON files")
+        p.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+        p.add_argument("--json", action="store_true", help="print machine-readable results")
+
+    g = sub.add_parser("generate", help="generate pairings for a round or all rounds")
+    common(g)
+    which = g.add_mutually_exclusive_group(required=True)
+    which.add_argument("--round", type=int)
+    which.add_argument("--all-rounds", action="store_true")
+    g.add_argument("--mode", choices=GEN_MODES, default="strong")
+    g.add_argument("--section", help="only this section (default: all)")
+    g.add_argument("--seed", type=int, help="seed for the random mode")
+    g.add_argument("--out-dir", help="write here instead of in place")
+    g.add_argument("--dry-run", action="store_true")
+    g.add_argument("--force", action="store_true", help="also regenerate rounds that are locked or have scores")
+    g.add_argument("--workers", type=int, default=1,
+                   help="worker processes per file for the sections (0 = above engine.PARALLEL_MIN_PLAYERS players)")
+
+    s = sub.add_parser("standings", help="recompute standings")
+    common(s)
+    s.add_argument("--section", help="only this section (or Combined)")
+    s.add_argument("--as-of", type=int, metavar="ROUND", help="standings after this round, with movement")
+
+    v = sub.add_parser("validate", help="check the whole event: bookings, repeats, rinks and scores")
+    common(v)
+    v.add_argument("--only", type=lambda s: [k.strip() for k in s.split(",") if k.strip()],
+                   metavar="KINDS", help=f"comma-separated issue kinds ({', '.join(ISSUE_KINDS)})")
+
+    e = sub.add_parser("export", help="write the export workbook (.xlsx) per file")
+    common(e)
+    e.add_argument("--out-dir", help="directory for the .xlsx files (default: next to the input)")
+    return ap
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    opts = {k: v for k, v in vars(args).items() if k not in ("files", "jobs", "json", "command")}
+    results = run_batch(args.command, args.files, opts, args.jobs)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        _print_human(args.command, results)
+    return 0 if all(r.get("ok") for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Widget keys per view, and a bound on how many views keep keys in
+st.session_state.
+
+A view is one section/round screen of inputs: the score rows ("score"), the
+pairings editor ("sc") and the per-end editor ("pe"). Its widget keys are
+handed out under the view's prefix and recorded, so clearing a view is a
+lookup of its own keys instead of a scan over the whole session.
+
+    begin_run(st.session_state)                       # top of the script
+    k = view_keys(st.session_state, "score", sec, 3)  # marks the view as used
+    st.number_input(..., key=k("va_4"))               # "score_SEKSIE 1_3_va_4"
+    drop_view(st.session_state, "pe", sec, 3)         # forget its inputs
+    prune(st.session_state)                           # end of the script
+
+The registry is least-recently-used first. `prune` evicts views that were not
+rendered in this run until at most MAX_VIEWS are left, and pops their keys.
+Streamlit already discards the state of widgets that a completed run did not
+render. Keys set through the session-state API, and runs cut short by
+st.stop(), are not covered by that, so this is what keeps a long session
+bounded either way.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Iterable, MutableMapping, Optional, Set
+
+MAX_VIEWS = 12  # views rendered in the current run are kept even above this
+
+_REGISTRY = "_view_keys"  # OrderedDict: view prefix -> set of widget keys, oldest first
+_SEEN = "_views_this_run"
+
+
+def view_prefix(kind: str, section: Any, round_no: Any) -> str:
+    return f"{kind}_{section}_{int(round_no)}"
+
+
+class ViewKeys:
+    """Callable handing out (and recording) the widget keys of one view."""
+
+    __slots__ = ("prefix", "keys")
+
+    def __init__(self, prefix: str, keys: Set[str]):
+        self.prefix = prefix
+        self.keys = keys
+
+    def __call__(self, field: str) -> str:
+        key = f"{self.prefix}_{field}"
+        self.keys.add(key)
+        return key
+
+
+def begin_run(state: MutableMapping[str, Any]) -> None:
+    state[_SEEN] = set()
+
+
+def view_keys(state: MutableMapping[str, Any], kind: str, section: Any, round_no: Any) -> ViewKeys:
+    reg = state.get(_REGISTRY)
+    if reg is None:
+        reg = state[_REGISTRY] = OrderedDict()
+    prefix = view_prefix(kind, section, round_no)
+    keys = reg.pop(prefix, None)
+    reg[prefix] = keys = keys if keys is not None else set()  # most recent last
+    seen = state.get(_SEEN)
+    if seen is not None:
+        seen.add(prefix)
+    return ViewKeys(prefix, keys)
+
+
+def drop_view(state: MutableMapping[str, Any], kind: str, section: Any, round_no: Any,
+              fields: Optional[Iterable[str]] = None) -> int:
+    """Pop a view's widget keys (only those whose field starts with one of `fields`, if given)."""
+    keys = (state.get(_REGISTRY) or {}).get(view_prefix(kind, section, round_no))
+    if not keys:
+        return 0
+    prefix = view_prefix(kind, section, round_no)
+    starts = tuple(f"{prefix}_{f}" for f in fields) if fields is not None else None
+    gone = [k for k in keys if starts is None or k.startswith(starts)]
+    for k in gone:
+        keys.discard(k)
+        state.pop(k, None)
+    return len(gone)
+
+
+def prune(state: MutableMapping[str, Any], max_views: int = MAX_VIEWS) -> int:
+    """Evict the least recently used views not rendered this run, down to `max_views`. Returns keys popped."""
+    reg = state.get(_REGISTRY)
+    if not reg or len(reg) <= max_views:
+        return 0
+    seen = state.get(_SEEN) or set()
+    popped = 0
+    for prefix in [p for p in reg if p not in seen][:len(reg) - max_views]:
+        for k in reg.pop(prefix):
+            if state.pop(k, None) is not None:
+                popped += 1
+    return popped
+
+
+__all__ = ["MAX_VIEWS", "ViewKeys", "begin_run", "view_keys", "view_prefix", "drop_view", "prune"]
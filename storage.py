@@ -1,6 +1,12 @@
 # storage.py
-import json, os, time, hashlib
-from typing import Dict, Any
+import json, os, time, hashlib, threading
+from typing import Dict, Any, Set
+
+from bracket import sync_brackets
+from engine import validate_event
+from player_index import PlayerIndex
+from ratings import sync_ratings
+from storage_metrics import METRICS, note_save
 
 DEFAULT_STATE = {
     "event_name": "SISHEN BORGDAG",
@@ -8,8 +14,8 @@ DEFAULT_STATE = {
     "rinks": 7,
     "rounds": 6,
     "players": {},  # id -> {"name": str, "section": str}
-    "pairings": {}, # f"{section}:{round}" -> [{rink, a_id, b_id}]
-    "scores": {},   # f"{section}:{round}:{rink}" -> {"a": {"vir": int, "teen": int}, "b": {...}}
+    "pairings": {}, # f"{section}:{round}" -> [{rink, a_id, b_id}] (+ "sitting" when games > rinks)
+    "scores": {},   # f"{section}:{round}:{rink}" (+ f":{sitting}" from sitting 2) -> {"a": {"vir": int, "teen": int}, "b": {...}}
     "scores_per_end": {},  # f"{section}:{round}:{rink}" -> {"n": int, "ends": [{"a": int, "b": int}, ...]}
     "rules": {
         "POINTS_WIN": 2, "POINTS_DRAW": 1, "POINTS_LOSS": 0,
@@ -21,28 +27,81 @@ DEFAULT_STATE = {
     },
     "locks": {  # f"{section}:{round}" -> True/False
     },
+    "ratings": {},  # see ratings.py; kept in step with "scores" on every save
     "audit": []  # list of {ts, action, payload}
 }
 
+def sync_derived(state: Dict[str, Any]) -> Set[str]:
+    """
+    Bring data derived from the scores (knockout brackets, player ratings) up to
+    date before a write. Returns the pairings keys bracket advancement rewrote,
+    so the caller can re-index them.
+    """
+    touched: Set[str] = set()
+    try:
+        with METRICS.timed("brackets.sync"):
+            sync_brackets(state, touched)  # fills `touched` as it goes, so a failure still reports its rewrites
+    except Exception:
+        pass  # a bracket glitch must never block saving scores either
+    try:
+        with METRICS.timed("ratings.sync"):
+            sync_ratings(state)
+    except Exception:
+        pass  # a rating glitch must never block saving scores
+    return touched
+
+
+# Above this many scores the save-time check is skipped (Tools tab and `rolbal validate` still run it).
+VALIDATE_ON_SAVE_MAX_SCORES = 10000
+
+
+def check_event(state: Dict[str, Any]) -> None:
+    """Whole-event validation after a write, for the app's issue badge (best-effort, never blocks a save)."""
+    try:
+        if len(state.get("scores", {})) > VALIDATE_ON_SAVE_MAX_SCORES:
+            return
+        with METRICS.timed("validate"):
+            issues = validate_event(state)
+        import streamlit as st  # type: ignore
+        st.session_state["event_issues"] = issues
+    except Exception:
+        pass
+
+
 class Store:
     def __init__(self, path: str):
         self.path = path
         if not os.path.exists(os.path.dirname(path)):
             os.makedirs(os.path.dirname(path), exist_ok=True)
         self.state = None
+        self._index = None  # PlayerIndex, built on first use
+        self.updated_at = None
         self.load()
 
     def load(self):
         if os.path.exists(self.path):
-            with open(self.path, "r", encoding="utf-8") as f:
-                self.state = json.load(f)
+            with METRICS.timed("local.load"):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.state = json.load(f)
+                    METRICS.incr("local.bytes_read", f.tell())
+            self.updated_at = self.fetch_version()
         else:
             self.state = DEFAULT_STATE.copy()
             self.save()
 
     def save(self):
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        for key in sync_derived(self.state):
+            self.reindex(key)
+        with METRICS.timed("local.save"):
+            # write-then-rename so concurrent readers never see a half-written file
+            tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=2)
+                METRICS.incr("local.bytes_written", f.tell())
+            os.replace(tmp, self.path)
+        note_save()
+        check_event(self.state)
+        self.updated_at = self.fetch_version()
         # Update saved markers for local mode
         try:
             import streamlit as st  # type: ignore
@@ -52,12 +111,43 @@ class Store:
         except Exception:
             pass
 
+    def fetch_version(self):
+        """Cheap change marker for polling: the file's mtime (no JSON parse)."""
+        try:
+            return str(os.stat(self.path).st_mtime_ns)
+        except OSError:
+            return None
+
+    def has_changed(self) -> bool:
+        v = self.fetch_version()
+        return v is not None and v != self.updated_at
+
     def log(self, action: str, payload: Any):
+        METRICS.incr("local.log.calls")
         self.state["audit"].append({"ts": time.time(), "action": action, "payload": payload})
         self.save()
 
     def key_pair(self, section: str, round_no: int):
         return f"{section}:{round_no}"
 
-    def key_score(self, section: str, round_no: int, rink: int):
-        return f"{section}:{round_no}:{rink}"
+    @staticmethod
+    def key_score(section: str, round_no: int, rink: int, sitting: int = 1):
+        # later sittings of a round get their own key (engine.slot_key)
+        return f"{section}:{round_no}:{rink}" + (f":{sitting}" if int(sitting or 1) > 1 else "")
+
+    def player_index(self):
+        """Player -> pairing slots; rebuilt when the state was loaded or replaced."""
+        if self._index is None or not self._index.covers(self.state):
+            self._index = PlayerIndex(self.state)
+        return self._index
+
+    def set_pairings(self, key: str, pairs):
+        """Replace one round's pairings and keep the player index in step (no save)."""
+        self.state.setdefault("pairings", {})[key] = pairs
+        if self._index is not None and self._index.covers(self.state):
+            self._index.set_key(key, pairs)  # not built yet: the first lookup indexes everything
+
+    def reindex(self, key: str) -> None:
+        """Re-index one pairings key whose rows were changed in the state directly (brackets)."""
+        if self._index is not None and self._index.covers(self.state):
+            self._index.set_key(key, self.state.get("pairings", {}).get(key, []))
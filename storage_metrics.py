@@ -0,0 +1,211 @@
+"""
+Process-wide I/O metrics for `Store` and `SupabaseStore`.
+
+Counters, latency histograms (ms) and byte totals are kept in one registry
+shared by all sessions of the running app:
+
+    with METRICS.timed("local.save"):
+        ...
+    METRICS.incr("supabase.save.conflict_fallback")
+    METRICS.incr("local.bytes_written", n)
+
+`rerun_started()` is called once at the top of every app run; it folds the
+previous run's save count into the `saves_per_rerun` histogram and
+periodically dumps a snapshot to `data/storage_metrics.json`.
+
+CLI (reads that dump, or measures a local store directly):
+
+    python -m storage_metrics                     # print the last dump
+    python -m storage_metrics --probe data/event.json --n 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Sequence
+
+DUMP_PATH = "data/storage_metrics.json"
+DUMP_EVERY_SEC = 30
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21)
+
+_SAVES_KEY = "_io_saves_this_rerun"
+
+
+class Histogram:
+    """Fixed-bucket histogram; `counts[i]` holds values <= bounds[i], last slot is overflow."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.n += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound containing the q-quantile (max for the overflow bucket)."""
+        if not self.n:
+            return 0.0
+        target, seen = q * self.n, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return float(self.bounds[i]) if i < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "n": self.n,
+            "mean": round(self.total / self.n, 3) if self.n else 0.0,
+            "max": round(self.max, 3),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": {("le_%g" % b): c for b, c in zip(self.bounds, self.counts)} | {"inf": self.counts[-1]},
+        }
+
+
+class StorageMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters: Dict[str, int] = {}
+            self.histograms: Dict[str, Histogram] = {}
+            self.started = time.time()
+            self._last_dump = 0.0
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, value: float, bounds: Sequence[float] = LATENCY_BUCKETS_MS) -> None:
+        with self._lock:
+            h = self.histograms.get(name)
+            if h is None:
+                h = self.histograms[name] = Histogram(bounds)
+            h.observe(value)
+
+    @contextmanager
+    def timed(self, op: str):
+        """Count `<op>.calls`/`<op>.errors` and record latency under `<op>`."""
+        t = time.perf_counter()
+        self.incr(f"{op}.calls")
+        try:
+            yield
+        except BaseException as e:
+            # st.stop()/st.rerun() also travel as exceptions; only count real failures
+            if isinstance(e, Exception):
+                self.incr(f"{op}.errors")
+            raise
+        finally:
+            self.observe(op, (time.perf_counter() - t) * 1e3)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "since": self.started,
+                "taken": time.time(),
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {k: h.to_dict() for k, h in sorted(self.histograms.items())},
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def dump(self, path: str = DUMP_PATH) -> None:
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+        os.replace(tmp, path)
+        self._last_dump = time.time()
+
+
+METRICS = StorageMetrics()
+
+
+def note_save() -> None:
+    """Count a save against the current session's rerun (best-effort outside Streamlit)."""
+    try:
+        import streamlit as st  # type: ignore
+        st.session_state[_SAVES_KEY] = int(st.session_state.get(_SAVES_KEY, 0)) + 1
+    except Exception:
+        pass
+
+
+def rerun_started() -> None:
+    """Fold the previous rerun's save count into `saves_per_rerun`; dump now and then."""
+    try:
+        import streamlit as st  # type: ignore
+        prev = st.session_state.get(_SAVES_KEY)
+        if prev is not None:
+            METRICS.observe("saves_per_rerun", int(prev), COUNT_BUCKETS)
+        st.session_state[_SAVES_KEY] = 0
+    except Exception:
+        pass
+    if time.time() - METRICS._last_dump > DUMP_EVERY_SEC:
+        try:
+            METRICS.dump()
+        except OSError:
+            pass
+
+
+def _probe(path: str, n: int) -> Dict[str, Any]:
+    """Measure a local store by loading/saving a scratch copy of `path` n times."""
+    import shutil
+    import tempfile
+    from storage import Store
+    # Under `python -m` this file is __main__; the stores record into the imported module
+    from storage_metrics import METRICS as registry
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch = os.path.join(tmp, "event.json")
+        if os.path.exists(path):
+            shutil.copyfile(path, scratch)
+        store = Store(scratch)
+        for _ in range(n):
+            store.load()
+            store.save()
+        store.log("probe", {"n": n})
+    return registry.snapshot()
+
+
+def main(argv: List[str] = None) -> int:
+    ap = argparse.ArgumentParser(description="Print storage I/O metrics as JSON.")
+    ap.add_argument("--file", default=DUMP_PATH, help="snapshot written by the running app")
+    ap.add_argument("--probe", metavar="EVENT_JSON", help="measure a local store on a scratch copy instead")
+    ap.add_argument("--n", type=int, default=10, help="load/save cycles for --probe")
+    args = ap.parse_args(argv)
+
+    if args.probe:
+        print(json.dumps(_probe(args.probe, args.n), indent=2))
+        return 0
+    try:
+        with open(args.file, "r", encoding="utf-8") as f:
+            print(f.read())
+    except OSError:
+        print(f"No metrics snapshot at {args.file}; the app writes one every {DUMP_EVERY_SEC}s.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
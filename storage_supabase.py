@@ -3,12 +3,37 @@ from __future__ import annotations
 from typing import Any, Dict, List, Optional
 from datetime import datetime, timezone
 import json, hashlib
+import time
 import uuid
 
-from storage import DEFAULT_STATE
+from offline_mirror import EventMirror, ensure_replayer, is_offline, mark_offline, mark_online
+from player_index import PlayerIndex
+from storage import DEFAULT_STATE, check_event, sync_derived
+from storage_metrics import METRICS, note_save
 import auth_supabase as auth
 
 
+def _parse_ts(value: Optional[str]) -> Optional[datetime]:
+    # Postgres may echo timestamps in a slightly different ISO form than we sent
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _is_network_error(e: BaseException) -> bool:
+    """Connection or timeout failure, as opposed to Supabase rejecting the query itself."""
+    if isinstance(e, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        import httpx  # transport of the supabase client
+    except Exception:
+        return False
+    return isinstance(e, httpx.TransportError)
+
+
 class SupabaseStore:
     """Minimal Store-compatible wrapper backed by Supabase Postgres.
 
@@ -28,6 +53,9 @@ class SupabaseStore:
           for insert with check (auth.uid() = user_id);
         create policy "update own" on public.events
           for update using (auth.uid() = user_id);
+
+    Reads and writes go through a local mirror (offline_mirror.py): saves that
+    cannot reach Supabase are queued on disk and replayed in the background.
     """
 
     def __init__(self, user_id: str, event_id: Optional[str] = None):
@@ -35,6 +63,9 @@ class SupabaseStore:
         self.event_id = event_id  # None means legacy single-row mode
         self.state: Dict[str, Any] = {}
         self.updated_at: Optional[str] = None
+        self.offline = False  # last remote call failed; reads/writes are served by the mirror
+        self._index = None  # PlayerIndex, built on first use
+        self._mirror = EventMirror(user_id, event_id)
         self._sb = auth.get_client()
         if self._sb is None:
             raise RuntimeError("Supabase client not configured")
@@ -42,7 +73,62 @@ class SupabaseStore:
 
     # ------- compatibility API -------
     def load(self):
-        # Try read; if missing create with DEFAULT_STATE
+        with METRICS.timed("supabase.load"):
+            self._load()
+
+    def _load(self):
+        # Mirror first: instant, and the event never comes up empty when offline
+        with self._mirror.lock:
+            local = self._mirror.read_state()
+            meta = self._mirror.meta()
+        if local is not None:
+            METRICS.incr("mirror.load_hit")
+            self.state, self.updated_at = local, meta.get("updated_at")
+            if meta["pending"]:
+                # unsent saves win over the server copy (last write wins, as for online saves);
+                # within the offline cooldown the replayer and "Retry sync now" do the pushing
+                self.offline = is_offline() or not self.flush()
+                if self.offline:
+                    ensure_replayer(self._mirror, self.flush)
+                return
+        if is_offline():
+            self.offline = True
+            METRICS.incr("supabase.load.offline")
+            if local is None:
+                METRICS.incr("supabase.load.default_state_fallback")
+                self.state = DEFAULT_STATE.copy()
+            return
+        try:
+            if local is not None and _parse_ts(self._remote_version()) == _parse_ts(self.updated_at):
+                METRICS.incr("mirror.load_current")
+                self.offline = False
+                return  # mirror is current; skip the state download
+            row = self._fetch_row()
+        except Exception:
+            mark_offline()
+            self.offline = True
+            METRICS.incr("supabase.load.offline")
+            if local is None:
+                METRICS.incr("supabase.load.default_state_fallback")
+                self.state = DEFAULT_STATE.copy()
+            return
+        mark_online()
+        self.offline = False
+        if row is None:
+            self.state = DEFAULT_STATE.copy()
+            self.save()  # create row
+            return
+        self.state = row.get("state") or DEFAULT_STATE.copy()
+        self.updated_at = row.get("updated_at")
+        # keep event name in state if present
+        if row.get("name"):
+            self.state["event_name"] = row["name"]
+        with self._mirror.lock:
+            self._mirror.write_state(self.state)
+            self._mirror.set_meta(updated_at=self.updated_at, name=self.state.get("event_name"))
+
+    def _fetch_row(self) -> Optional[Dict[str, Any]]:
+        """The event's row, None when it does not exist yet; raises when Supabase is unreachable."""
         # Try new multi-event schema first: (user_id, event_id)
         if self.event_id:
             try:
@@ -52,69 +138,153 @@ class SupabaseStore:
                        .eq("event_id", self.event_id)
                        .execute())
                 data = getattr(res, "data", None) or []
-                if data:
-                    row = data[0]
-                    self.state = row.get("state") or DEFAULT_STATE.copy()
-                    self.updated_at = row.get("updated_at")
-                    # keep event name in state if present
-                    if row.get("name"):
-                        self.state["event_name"] = row["name"]
-                else:
-                    self.state = DEFAULT_STATE.copy()
-                    self.save()  # create row
-                return
-            except Exception:
+                return data[0] if data else None
+            except Exception as e:
+                if _is_network_error(e):
+                    raise  # unreachable, not a legacy schema; don't wait on a second timeout
                 # fall through to legacy mode
-                pass
+                METRICS.incr("supabase.load.legacy_fallback")
 
         # Legacy single-row mode per user
-        try:
-            res = self._sb.table("events").select("state,updated_at").eq("user_id", self.user_id).execute()
-            data = getattr(res, "data", None) or []
-            if data:
-                row = data[0]
-                self.state = row.get("state") or DEFAULT_STATE.copy()
-                self.updated_at = row.get("updated_at")
+        res = self._sb.table("events").select("state,updated_at").eq("user_id", self.user_id).execute()
+        data = getattr(res, "data", None) or []
+        return data[0] if data else None
+
+    def save(self):
+        for key in sync_derived(self.state):
+            self.reindex(key)
+        with METRICS.timed("supabase.save"):
+            self._save()
+        note_save()
+        check_event(self.state)
+
+    def _save(self):
+        snap = json.dumps(self.state, sort_keys=True, ensure_ascii=False)
+        with self._mirror.lock:
+            # write-through: the mirror and the outbox entry are on disk before the upsert
+            self._mirror.write_state(self.state)
+            meta = self._mirror.meta()
+            meta = self._mirror.set_meta(pending=meta["pending"] + 1, name=self.state.get("event_name"),
+                                         pending_since=meta["pending_since"] or time.time())
+            if is_offline():
+                METRICS.incr("supabase.save.queued")
+                self.offline = True
             else:
-                self.state = DEFAULT_STATE.copy()
-                self.save()  # create row
+                try:
+                    self.updated_at = self._push(self.state, snap)
+                except Exception as e:
+                    METRICS.incr("supabase.save.queued")
+                    mark_offline()
+                    self.offline = True
+                    self._mirror.set_meta(attempts=meta["attempts"] + 1, last_error=str(e)[:200])
+                else:
+                    mark_online()
+                    self.offline = False
+                    self._mirror.set_meta(pending=0, updated_at=self.updated_at)
+                    if meta["pending"] > 1:
+                        METRICS.incr("supabase.replay.batched_saves", meta["pending"] - 1)
+        if self.offline:
+            ensure_replayer(self._mirror, self.flush)
+        # Saved markers: the state is durable locally either way
+        try:
+            import streamlit as st  # type: ignore
+            st.session_state["last_saved_hash"] = hashlib.sha1(snap.encode("utf-8")).hexdigest()
+            st.session_state["last_saved_ts"] = datetime.now(timezone.utc).timestamp()
         except Exception:
-            self.state = DEFAULT_STATE.copy()
+            pass
 
-    def save(self):
+    def _push(self, state: Dict[str, Any], snap: Optional[str] = None) -> str:
+        """Upsert `state` as the event's row; returns the new `updated_at`, raises on failure."""
         now_iso = datetime.now(timezone.utc).isoformat()
+        if snap is None:
+            snap = json.dumps(state, sort_keys=True, ensure_ascii=False)
+        METRICS.incr("supabase.bytes_sent", len(snap.encode("utf-8")))
         if self.event_id:
-            name = self.state.get("event_name") or "Event"
+            name = state.get("event_name") or "Event"
             payload = {
                 "user_id": self.user_id,
                 "event_id": self.event_id,
                 "name": name,
-                "state": self.state,
+                "state": state,
                 "updated_at": now_iso,
             }
             try:
                 self._sb.table("events").upsert(payload, on_conflict="user_id,event_id").execute()
-            except Exception:
+            except Exception as e:
+                if _is_network_error(e):
+                    raise  # unreachable, not a schema problem; the fallback would only time out too
                 # Fallback if composite conflict target unsupported; try no conflict target
+                METRICS.incr("supabase.save.conflict_fallback")
                 self._sb.table("events").upsert(payload).execute()
         else:
             payload = {
                 "user_id": self.user_id,
-                "state": self.state,
+                "state": state,
                 "updated_at": now_iso,
             }
             self._sb.table("events").upsert(payload, on_conflict="user_id").execute()
-        # Update local metadata + saved markers
-        self.updated_at = now_iso
+        return now_iso
+
+    def flush(self) -> bool:
+        """Push queued saves as one upsert of the mirrored state; True when nothing is left queued."""
+        with self._mirror.lock:
+            meta = self._mirror.meta()
+            if not meta["pending"]:
+                return True
+            state = self._mirror.read_state()
+            if state is None:
+                self._mirror.set_meta(pending=0)
+                return True
+            try:
+                with METRICS.timed("supabase.replay"):
+                    updated_at = self._push(state)
+            except Exception as e:
+                mark_offline()
+                self._mirror.set_meta(attempts=meta["attempts"] + 1, last_error=str(e)[:200])
+                return False
+            mark_online()
+            self._mirror.set_meta(pending=0, updated_at=updated_at)
+            METRICS.incr("supabase.replay.batched_saves", meta["pending"])
+        self.offline = False
+        self.updated_at = updated_at
+        return True
+
+    def outbox(self) -> Dict[str, Any]:
+        """Offline status for the UI: queued saves, since when, failed attempts and last error."""
+        meta = self._mirror.meta()
+        return {"offline": self.offline or is_offline(), "pending": meta["pending"],
+                "since": meta["pending_since"], "attempts": meta["attempts"], "error": meta["last_error"]}
+
+    def _remote_version(self) -> Optional[str]:
+        q = self._sb.table("events").select("updated_at").eq("user_id", self.user_id)
+        if self.event_id:
+            q = q.eq("event_id", self.event_id)
+        with METRICS.timed("supabase.fetch_version"):
+            res = q.execute()
+        data = getattr(res, "data", None) or []
+        return data[0].get("updated_at") if data else None
+
+    def fetch_version(self) -> Optional[str]:
+        """Return the row's `updated_at` only (no state download), or None."""
+        if is_offline():
+            return None
         try:
-            import streamlit as st  # type: ignore
-            snap = json.dumps(self.state, sort_keys=True, ensure_ascii=False)
-            st.session_state["last_saved_hash"] = hashlib.sha1(snap.encode("utf-8")).hexdigest()
-            st.session_state["last_saved_ts"] = datetime.now(timezone.utc).timestamp()
+            return self._remote_version()
         except Exception:
-            pass
+            mark_offline()
+            return None
+
+    def has_changed(self) -> bool:
+        """True when another device saved since our last load/save."""
+        if self._mirror.meta()["pending"]:
+            return False  # our queued saves go up first; reloading now would only replay them
+        remote = self.fetch_version()
+        if not remote:
+            return False
+        return _parse_ts(remote) != _parse_ts(self.updated_at)
 
     def log(self, action: str, payload: Any):
+        METRICS.incr("supabase.log.calls")
         try:
             self.state.setdefault("audit", []).append({
                 "ts": datetime.now(timezone.utc).timestamp(),
@@ -128,8 +298,27 @@ class SupabaseStore:
     def key_pair(self, section: str, round_no: int) -> str:
         return f"{section}:{round_no}"
 
-    def key_score(self, section: str, round_no: int, rink: int) -> str:
-        return f"{section}:{round_no}:{rink}"
+    @staticmethod
+    def key_score(section: str, round_no: int, rink: int, sitting: int = 1) -> str:
+        # later sittings of a round get their own key (engine.slot_key)
+        return f"{section}:{round_no}:{rink}" + (f":{sitting}" if int(sitting or 1) > 1 else "")
+
+    def player_index(self) -> PlayerIndex:
+        """Player -> pairing slots; rebuilt when the state was loaded or replaced."""
+        if self._index is None or not self._index.covers(self.state):
+            self._index = PlayerIndex(self.state)
+        return self._index
+
+    def set_pairings(self, key: str, pairs) -> None:
+        """Replace one round's pairings and keep the player index in step (no save)."""
+        self.state.setdefault("pairings", {})[key] = pairs
+        if self._index is not None and self._index.covers(self.state):
+            self._index.set_key(key, pairs)  # not built yet: the first lookup indexes everything
+
+    def reindex(self, key: str) -> None:
+        """Re-index one pairings key whose rows were changed in the state directly (brackets)."""
+        if self._index is not None and self._index.covers(self.state):
+            self._index.set_key(key, self.state.get("pairings", {}).get(key, []))
 
     # ------- multi-event helpers -------
     @classmethod
@@ -137,6 +326,8 @@ class SupabaseStore:
         sb = auth.get_client()
         if sb is None:
             return []
+        if is_offline():
+            return EventMirror.list_for(user_id)
         # Try multi-event first
         try:
             res = sb.table("events").select("event_id,name,updated_at").eq("user_id", user_id).order("updated_at", desc=True).execute()
@@ -147,6 +338,7 @@ class SupabaseStore:
                 return events
         except Exception:
             pass
+        METRICS.incr("supabase.list_events.legacy_fallback")
         # Legacy: synthesize a single default event if a row exists
         try:
             res = sb.table("events").select("state,updated_at").eq("user_id", user_id).execute()
@@ -155,9 +347,43 @@ class SupabaseStore:
                 name = (rows[0].get("state") or {}).get("event_name") or "Default Event"
                 return [{"event_id": None, "name": name, "updated_at": rows[0].get("updated_at")}]  # type: ignore[dict-item]
         except Exception:
-            pass
+            # unreachable: offer the events mirrored on this server instead of an empty list
+            mark_offline()
+            METRICS.incr("supabase.list_events.offline")
+            return EventMirror.list_for(user_id)
         return []
 
+    @classmethod
+    def fetch_shared_version(cls, event_id: str) -> Optional[str]:
+        """`updated_at` of an event by id alone (read-only leaderboard mode)."""
+        sb = auth.get_client()
+        if sb is None:
+            return None
+        try:
+            res = sb.table("events").select("updated_at").eq("event_id", event_id).execute()
+            rows = getattr(res, "data", None) or []
+            return rows[0].get("updated_at") if rows else None
+        except Exception:
+            return None
+
+    @classmethod
+    def fetch_shared(cls, event_id: str) -> Optional[Dict[str, Any]]:
+        """State of an event by id alone; requires a read policy for shared events."""
+        sb = auth.get_client()
+        if sb is None:
+            return None
+        try:
+            res = sb.table("events").select("state,name").eq("event_id", event_id).execute()
+            rows = getattr(res, "data", None) or []
+            if not rows:
+                return None
+            state = rows[0].get("state") or DEFAULT_STATE.copy()
+            if rows[0].get("name"):
+                state["event_name"] = rows[0]["name"]
+            return state
+        except Exception:
+            return None
+
     @classmethod
     def create_event(cls, user_id: str, name: str) -> str:
         sb = auth.get_client()